@@ -8,9 +8,44 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
 
 import os
+from urllib.parse import urlparse
+from asgiref.wsgi import WsgiToAsgi
+from whitenoise import WhiteNoise
 
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'back.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+from back.place.clients import close_clients  # noqa: E402
+from back.schema import warm_up  # noqa: E402
+warm_up()
+
+# back.wsgi와 같이 collectstatic으로 모은 정적 파일은 WhiteNoise가 제공합니다. WhiteNoise는 WSGI 앱이므로
+# 정적 파일 경로만 스레드에서 실행하고, 나머지 요청은 Django로 바로 보냅니다.
+static_files = WhiteNoise(None, root=settings.STATIC_ROOT, prefix=urlparse(settings.STATIC_URL or '').path)
+serve_static = WsgiToAsgi(static_files)
+
+
+def is_static_path(path):
+    if static_files.autorefresh:
+        return static_files.find_file(path) is not None
+    return path in static_files.files
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and is_static_path(scope['path']):
+        return await serve_static(scope, receive, send)
+    # Django의 ASGIHandler는 lifespan을 처리하지 않으므로 여기서 받아, 종료할 때 외부 API 클라이언트를 닫습니다.
+    if scope['type'] != 'lifespan':
+        return await django_application(scope, receive, send)
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await close_clients()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
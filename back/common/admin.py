@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.forms import UserChangeForm, UserCreationForm
-from back.common.models import User, EmailVerification
+from back.common.models import User, EmailVerification, EmailOutbox
 
 class CustomUserChangeForm(UserChangeForm):
     class Meta:
@@ -47,4 +47,11 @@ class EmailVerificationAdmin(admin.ModelAdmin):
     return obj.is_expired()
   is_expired.boolean = True
   is_expired.short_description = 'Expired?'
-  
\ No newline at end of file
+  
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+  list_display = [field.name for field in EmailOutbox._meta.fields]
+  list_filter = ['status', 'created_at']
+  search_fields = ['to_email', 'subject']
+  ordering = ['-id']
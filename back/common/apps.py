@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.contrib.auth import get_user_model
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_init, post_save
 
 
 class CommonConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'back.common'
+
+    def ready(self):
+        from back.common import auth
+        from back.common.profiling import install_query_recorder
+        connection_created.connect(install_query_recorder, dispatch_uid='graphql_query_recorder')
+        User = get_user_model()
+        post_init.connect(auth.remember_username, sender=User, dispatch_uid='jwt_user_cache_loaded')
+        post_save.connect(auth.user_changed, sender=User, dispatch_uid='jwt_user_cache_saved')
+        post_delete.connect(auth.user_changed, sender=User, dispatch_uid='jwt_user_cache_deleted')
@@ -0,0 +1,77 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DEFAULT_DB_ALIAS
+
+JWT_USER_CACHE_TIMEOUT = getattr(settings, 'JWT_USER_CACHE_TIMEOUT', 60)
+JWT_USER_CACHE_FIELDS = ('name', 'is_active', 'is_staff', 'is_superuser')
+
+
+def user_cache():
+  """
+  JWT_USER_CACHE_ALIAS의 캐시. 사용자 변경 시 지운 캐시가 모든 워커에 반영되어야 하므로, 프로세스마다 따로인
+  캐시(LocMem, Dummy)면 None을 반환하고 캐시하지 않습니다.
+  """
+  cache = caches[getattr(settings, 'JWT_USER_CACHE_ALIAS', 'default')]
+  if isinstance(cache, (LocMemCache, DummyCache)):
+    return None
+  return cache
+
+
+def user_cache_key(username):
+  return 'jwt_user:' + hashlib.sha256((username or '').encode('utf-8')).hexdigest()
+
+
+def auth_fields(UserModel):
+  # 인증과 권한 확인에 필요한 필드만 캐시합니다. 비밀번호 해시 등 나머지 필드는 접근할 때 DB에서 읽습니다.
+  # from_db()가 값을 필드 순서대로 받으므로 모델의 필드 순서를 따릅니다.
+  names = {UserModel._meta.pk.attname, UserModel.USERNAME_FIELD, *JWT_USER_CACHE_FIELDS}
+  return [field.attname for field in UserModel._meta.concrete_fields if field.attname in names]
+
+
+def get_user_by_natural_key(username):
+  """
+  graphql_jwt의 JWT_GET_USER_BY_NATURAL_KEY_HANDLER. 토큰의 이메일로 찾은 사용자의 인증 필드를
+  JWT_USER_CACHE_TIMEOUT초 동안 캐시해, 같은 사용자의 연속된 요청이 users 테이블을 조회하지 않게 합니다.
+  반환하는 사용자는 나머지 필드가 지연 로드되므로 save()는 캐시된 필드만 씁니다. 값을 바꿀 때는 새로 읽은
+  인스턴스에 update_fields를 지정해 저장합니다.
+  """
+  UserModel = get_user_model()
+  fields = auth_fields(UserModel)
+  cache = user_cache()
+  key = user_cache_key(username)
+  values = cache.get(key) if cache is not None else None
+  if values is None:
+    values = (
+      UserModel._default_manager.filter(**{UserModel.USERNAME_FIELD: username})
+      .values_list(*fields).first()
+    )
+    if values is None:
+      return None
+    if cache is not None:
+      cache.set(key, values, JWT_USER_CACHE_TIMEOUT)
+  return UserModel.from_db(DEFAULT_DB_ALIAS, fields, values)
+
+
+def invalidate_user(username):
+  cache = user_cache()
+  if cache is not None and username:
+    cache.delete(user_cache_key(username))
+
+
+def remember_username(sender, instance, **kwargs):
+  # 이메일이 바뀌었을 때 이전 이메일로 캐시된 항목도 지울 수 있도록, 불러온 이메일을 기억해 둡니다.
+  instance._loaded_username = instance.__dict__.get(sender.USERNAME_FIELD)
+
+
+def user_changed(sender, instance, **kwargs):
+  username = instance.__dict__.get(sender.USERNAME_FIELD)
+  previous = getattr(instance, '_loaded_username', None)
+  invalidate_user(username)
+  if previous != username:
+    invalidate_user(previous)
+  instance._loaded_username = username
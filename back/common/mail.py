@@ -0,0 +1,160 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger('back.mail')
+
+EMAIL_OUTBOX_BATCH_SIZE = getattr(settings, 'EMAIL_OUTBOX_BATCH_SIZE', 50)
+EMAIL_OUTBOX_MAX_ATTEMPTS = getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 6)
+# 재시도 간격(초)은 EMAIL_OUTBOX_RETRY_BASE부터 두 배씩 늘어나며 EMAIL_OUTBOX_RETRY_MAX를 넘지 않습니다.
+EMAIL_OUTBOX_RETRY_BASE = getattr(settings, 'EMAIL_OUTBOX_RETRY_BASE', 30)
+EMAIL_OUTBOX_RETRY_MAX = getattr(settings, 'EMAIL_OUTBOX_RETRY_MAX', 60 * 60)
+# 가져간 메일을 다른 워커가 다시 가져가지 않는 시간(초). 워커가 보내는 도중 종료되면 이 시간 뒤에 다시 보냅니다.
+EMAIL_OUTBOX_LEASE = 5 * 60
+# 보냈거나 실패한 메일은 이 기간(일)이 지나면 삭제합니다.
+EMAIL_OUTBOX_RETENTION_DAYS = getattr(settings, 'EMAIL_OUTBOX_RETENTION_DAYS', 7)
+
+
+def verification_code_html(code):
+  return f'''
+<html>
+  <body style="margin:0; padding:0; font-family:Arial,sans-serif; background-color:#f3f4f6">
+    <table width="100%" cellpadding="0" cellspacing="0" bgcolor="#f3f4f6">
+      <tr>
+        <td align="center" style="padding:60px 0">
+          <table width="600" cellpadding="0" cellspacing="0" bgcolor="#ffffff"
+            style="border:1px solid #e2e8f0; border-radius:8px; overflow:hidden">
+            <tr>
+              <td align="center" bgcolor="#2f3437" style="padding:20px">
+                <h1 style="margin:0; color:#ffffff; font-size:26px">KOREAT</h1>
+              </td>
+            </tr>
+            <tr>
+              <td align="center" style="padding:40px">
+                <p style="margin:0 0 10px 0; color:#333333; font-size:18px">Verification Code</p>
+                <p style="margin:0; color:#000000; font-size:36px; font-weight:bold">
+                  {code}
+                </p>
+                <p style="margin:10px 0 0 0; color:#777777; font-size:14px">
+                  This code will expire in 5 minutes
+                </p>
+              </td>
+            </tr>
+            <tr>
+              <td style="padding:20px; border-top:1px solid #e2e8f0">
+                <p style="margin:0; color:#555555; font-size:12px">
+                  If you did not request this email, please ignore it.  
+                  For assistance, contact us at  
+                  <a href="mailto:hensin12@gmail.com" style="color:#2f3437; text-decoration:none">
+                    hensin12@gmail.com
+                  </a>
+                </p>
+              </td>
+            </tr>
+          </table>
+        </td>
+      </tr>
+    </table>
+  </body>
+</html>
+'''
+
+
+def enqueue_email(to_email, subject, text_body, html_body=''):
+  """
+  메일을 outbox에 저장합니다. 실제 발송은 send_outbox 워커가 하므로 요청은 SMTP를 기다리지 않습니다.
+  """
+  from back.common.models import EmailOutbox
+  return EmailOutbox.objects.create(to_email=to_email, subject=subject, text_body=text_body, html_body=html_body)
+
+
+def retry_delay(attempts):
+  return min(EMAIL_OUTBOX_RETRY_BASE * 2 ** max(attempts - 1, 0), EMAIL_OUTBOX_RETRY_MAX)
+
+
+def claim_batch(batch_size):
+  """
+  보낼 차례인 메일을 batch_size개까지 가져가고, EMAIL_OUTBOX_LEASE 동안 다른 워커가 가져가지 않도록 표시합니다.
+  """
+  from back.common.models import EmailOutbox
+
+  now = timezone.now()
+  with transaction.atomic():
+    batch = list(
+      EmailOutbox.objects
+      .select_for_update(skip_locked=True)
+      .filter(status=EmailOutbox.STATUS_PENDING, next_attempt_at__lte=now)
+      .order_by('next_attempt_at', 'id')[:batch_size]
+    )
+    for mail in batch:
+      mail.attempts += 1
+      mail.next_attempt_at = now + timedelta(seconds=EMAIL_OUTBOX_LEASE)
+    EmailOutbox.objects.bulk_update(batch, ['attempts', 'next_attempt_at'])
+  return batch
+
+
+def send_outbox(batch_size=None, connection=None):
+  """
+  outbox의 메일을 하나의 SMTP 연결로 보내고 (보낸 수, 실패한 수)를 반환합니다. 실패한 메일은 retry_delay 뒤에
+  다시 보내며, EMAIL_OUTBOX_MAX_ATTEMPTS번 실패하면 failed로 둡니다.
+  """
+  from back.common.models import EmailOutbox
+
+  batch = claim_batch(batch_size or EMAIL_OUTBOX_BATCH_SIZE)
+  if not batch:
+    return 0, 0
+
+  sent = failed = 0
+  connection = connection or get_connection()
+  try:
+    for mail in batch:
+      message = EmailMultiAlternatives(mail.subject, mail.text_body, to=[mail.to_email], connection=connection)
+      if mail.html_body:
+        message.attach_alternative(mail.html_body, 'text/html')
+      try:
+        # 연결이 열려 있으면 send_messages가 닫지 않으므로 배치 전체에서 재사용됩니다.
+        connection.open()
+        connection.send_messages([message])
+      except Exception as e:
+        logger.warning('Failed to send email %s to %s: %s', mail.id, mail.to_email, e)
+        # 끊긴 연결은 닫고 다음 메일에서 다시 엽니다.
+        connection.close()
+        mail.last_error = str(e)
+        if mail.attempts >= EMAIL_OUTBOX_MAX_ATTEMPTS:
+          mail.status = EmailOutbox.STATUS_FAILED
+        else:
+          mail.next_attempt_at = timezone.now() + timedelta(seconds=retry_delay(mail.attempts))
+        failed += 1
+      else:
+        mail.status = EmailOutbox.STATUS_SENT
+        mail.sent_at = timezone.now()
+        sent += 1
+      if mail.status != EmailOutbox.STATUS_PENDING:
+        # 더 보낼 일이 없는 메일의 본문(인증 코드)은 남기지 않습니다.
+        mail.text_body = mail.html_body = ''
+  finally:
+    connection.close()
+
+  EmailOutbox.objects.bulk_update(
+    batch, ['status', 'next_attempt_at', 'last_error', 'sent_at', 'text_body', 'html_body']
+  )
+  return sent, failed
+
+
+def purge_outbox(retention_days=None):
+  """
+  만든 지 retention_days(기본 EMAIL_OUTBOX_RETENTION_DAYS)일이 지난 sent/failed 메일을 삭제하고 삭제한 수를 반환합니다.
+  """
+  from back.common.models import EmailOutbox
+
+  if retention_days is None:
+    retention_days = EMAIL_OUTBOX_RETENTION_DAYS
+  cutoff = timezone.now() - timedelta(days=retention_days)
+  deleted, _ = EmailOutbox.objects.filter(
+    status__in=[EmailOutbox.STATUS_SENT, EmailOutbox.STATUS_FAILED], created_at__lt=cutoff
+  ).delete()
+  return deleted
@@ -0,0 +1,89 @@
+import json
+import secrets
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+LOGIN = 'mutation($email: String!, $password: String!) { login(email: $email, password: $password) { message } }'
+
+
+def percentile(values, percent):
+  ordered = sorted(values)
+  return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+class Command(BaseCommand):
+  help = (
+    'Simulates a credential-stuffing flood on the login mutation and measures the latency of regular '
+    'requests served alongside it.'
+  )
+
+  def add_arguments(self, parser):
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--attackers', type=int, default=8, help='Concurrent flooding threads.')
+    parser.add_argument('--attack-ips', type=int, default=4, help='Distinct client IPs used by the flood.')
+    parser.add_argument('--users', type=int, default=2, help='Concurrent legitimate request threads.')
+    parser.add_argument('--query', default='{ __typename }', help='Query sent by legitimate threads.')
+    parser.add_argument('--without-limits', action='store_true', help='Disable login rate limits for a baseline.')
+    parser.add_argument('--json', action='store_true', help='Print raw results as JSON.')
+
+  def handle(self, *args, **options):
+    host = next((h.lstrip('.') for h in settings.ALLOWED_HOSTS if h != '*'), 'localhost')
+
+    deadline = time.perf_counter() + options['seconds']
+    legit = []
+    attack = {'accepted': 0, 'rejected': 0}
+    lock = threading.Lock()
+
+    def post(client, query, variables=None):
+      started = time.perf_counter()
+      response = client.post(
+        '/graphql/', json.dumps({'query': query, 'variables': variables or {}}),
+        content_type='application/json', headers={'Host': host}
+      )
+      return json.loads(response.content), time.perf_counter() - started
+
+    def attacker(index):
+      client = Client(REMOTE_ADDR=f'203.0.113.{index % options["attack_ips"] + 1}', SERVER_NAME=host)
+      while time.perf_counter() < deadline:
+        result, _ = post(client, LOGIN, {'email': f'victim{secrets.randbelow(1000)}@example.com', 'password': 'x'})
+        throttled = any('Too many' in error['message'] for error in result.get('errors', []))
+        with lock:
+          attack['rejected' if throttled else 'accepted'] += 1
+
+    def legitimate(index):
+      client = Client(REMOTE_ADDR=f'198.51.100.{index + 1}', SERVER_NAME=host)
+      while time.perf_counter() < deadline:
+        result, elapsed = post(client, options['query'])
+        with lock:
+          legit.append((elapsed, not result.get('errors')))
+        time.sleep(0.05)
+
+    limits = override_settings(LOGIN_RATE_LIMIT_ENABLED=False) if options['without_limits'] else override_settings()
+    with limits, ThreadPoolExecutor(options['attackers'] + options['users']) as executor:
+      futures = [executor.submit(attacker, i) for i in range(options['attackers'])]
+      futures += [executor.submit(legitimate, i) for i in range(options['users'])]
+      for future in futures:
+        future.result()
+
+    latencies = [elapsed * 1000 for elapsed, _ in legit]
+    result = {
+      'limits': not options['without_limits'],
+      'legit_requests': len(legit),
+      'legit_failures': sum(1 for _, ok in legit if not ok),
+      'legit_p50_ms': statistics.median(latencies) if latencies else None,
+      'legit_p99_ms': percentile(latencies, 99) if latencies else None,
+      'attack_accepted': attack['accepted'],
+      'attack_rejected': attack['rejected'],
+    }
+    if options['json']:
+      self.stdout.write(json.dumps(result, indent=2))
+      return
+
+    for key, value in result.items():
+      self.stdout.write(f'{key:18} {value:.1f}' if isinstance(value, float) else f'{key:18} {value}')
@@ -0,0 +1,74 @@
+import json
+import statistics
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand
+
+# 새 인터프리터에서 워커 기동 과정을 재현합니다: 앱 로드(django.setup + ASGI 앱 + 스키마) 후 첫 응답까지.
+PROBE = r'''
+import json, os, sys, time
+start = time.perf_counter()
+from back.asgi import application
+loaded = time.perf_counter()
+
+import asyncio
+from django.conf import settings
+from django.test import AsyncClient
+
+host = next((h.lstrip('.') for h in settings.ALLOWED_HOSTS if h != '*'), 'localhost')
+body = json.dumps({'query': '{ __typename }'})
+
+async def request():
+  started = time.perf_counter()
+  response = await AsyncClient(SERVER_NAME=host).post(
+    '/graphql/', body, content_type='application/json', headers={'Host': host}
+  )
+  return response.status_code, time.perf_counter() - started
+
+async def main():
+  first_status, first = await request()
+  second_status, second = await request()
+  return first_status, first, second
+
+first_status, first, second = asyncio.run(main())
+print(json.dumps({
+  'import_ms': (loaded - start) * 1000,
+  'first_response_ms': first * 1000,
+  'second_response_ms': second * 1000,
+  'time_to_first_response_ms': (loaded - start + first) * 1000,
+  'status': first_status,
+  'modules': len(sys.modules),
+}))
+'''
+
+
+class Command(BaseCommand):
+  help = 'Measures app import time and time-to-first-response in fresh interpreters.'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help='Print raw results as JSON.')
+
+  def handle(self, *args, **options):
+    results = []
+    for _ in range(options['runs']):
+      completed = subprocess.run(
+        [sys.executable, '-c', PROBE], capture_output=True, text=True, check=False
+      )
+      if completed.returncode != 0:
+        self.stderr.write(completed.stderr)
+        raise SystemExit(completed.returncode)
+      results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    if options['json']:
+      self.stdout.write(json.dumps(results, indent=2))
+      return
+
+    for key in ('import_ms', 'first_response_ms', 'second_response_ms', 'time_to_first_response_ms'):
+      values = [result[key] for result in results]
+      self.stdout.write(
+        f'{key:28} median {statistics.median(values):8.1f}  min {min(values):8.1f}  max {max(values):8.1f}'
+      )
+    self.stdout.write(f'{"modules loaded":28} {results[-1]["modules"]}')
+    self.stdout.write(f'{"first response status":28} {results[-1]["status"]}')
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from back.common.verification import purge_expired
+
+
+class Command(BaseCommand):
+  help = 'Deletes expired email verification records from the database store.'
+
+  def handle(self, *args, **options):
+    self.stdout.write(f'Deleted {purge_expired()} expired verification record(s)')
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from back.common.mail import purge_outbox, send_outbox
+
+# --loop로 실행 중일 때 오래된 sent/failed 메일을 지우는 간격(초)
+PURGE_INTERVAL = 60 * 60
+
+
+class Command(BaseCommand):
+  help = 'Sends queued emails from the outbox over a reused SMTP connection.'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--batch-size', type=int, default=None, help='Maximum number of emails per connection.')
+    parser.add_argument('--loop', action='store_true', help='Keep running and poll for new emails.')
+    parser.add_argument('--interval', type=float, default=2, help='Seconds between empty polls with --loop.')
+    parser.add_argument(
+      '--retention-days', type=int, default=None,
+      help='Delete sent and failed emails older than this many days (default EMAIL_OUTBOX_RETENTION_DAYS).'
+    )
+
+  def purge(self, retention_days):
+    deleted = purge_outbox(retention_days)
+    if deleted:
+      self.stdout.write(f'Purged {deleted} old email(s)')
+    return time.monotonic()
+
+  def handle(self, *args, **options):
+    purged_at = self.purge(options['retention_days'])
+    while True:
+      sent, failed = send_outbox(options['batch_size'])
+      if sent or failed or not options['loop']:
+        self.stdout.write(f'Sent {sent} email(s), {failed} failed')
+      if not options['loop']:
+        break
+      if time.monotonic() - purged_at >= PURGE_INTERVAL:
+        purged_at = self.purge(options['retention_days'])
+      # 가득 찬 배치를 보냈으면 남은 메일이 있을 수 있으므로 바로 다음 배치를 가져갑니다.
+      if not sent and not failed:
+        time.sleep(options['interval'])
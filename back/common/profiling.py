@@ -0,0 +1,260 @@
+import logging
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+logger = logging.getLogger('back.profiling')
+
+SLOW_OPERATION_MS = getattr(settings, 'GRAPHQL_SLOW_OPERATION_MS', 1000)
+SLOW_OPERATION_QUERIES = getattr(settings, 'GRAPHQL_SLOW_OPERATION_QUERIES', 50)
+PROFILE_WINDOW = getattr(settings, 'GRAPHQL_PROFILE_WINDOW', 500)
+# operation 이름은 클라이언트가 정하므로 집계하는 이름 수를 제한하고, 넘치는 operation은 OTHER_OPERATION으로 모읍니다.
+PROFILE_MAX_OPERATIONS = getattr(settings, 'GRAPHQL_PROFILE_MAX_OPERATIONS', 200)
+OTHER_OPERATION = 'other'
+MAX_OPERATION_NAME_LENGTH = 100
+SLOW_LOG_MAX_STATEMENTS = 20
+
+DURATION_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+NAMED_OPERATION_RE = re.compile(r'^\s*(query|mutation|subscription)\s+(\w+)')
+FIRST_FIELD_RE = re.compile(r'^\s*(query|mutation|subscription)?[^{]*\{\s*(\w+)')
+
+_current_profile = ContextVar('graphql_operation_profile', default=None)
+_listeners = []
+
+
+class OperationProfile:
+  def __init__(self, name):
+    self.name = name
+    self.statements = []
+    self.db_time = 0.0
+    self.started_at = time.perf_counter()
+    self.wall_time = None
+    # 검증을 통과해 실행된 operation만 집계합니다 (back.views).
+    self.valid = True
+
+  @property
+  def query_count(self):
+    return len(self.statements)
+
+  @property
+  def db_ms(self):
+    return self.db_time * 1000
+
+  @property
+  def wall_ms(self):
+    return (self.wall_time or 0) * 1000
+
+
+class RollingStats:
+  """
+  operation 이름별 최근 PROFILE_WINDOW개의 측정값을 보관하고 조회 시 히스토그램으로 집계합니다.
+  워커 프로세스마다 따로 집계됩니다.
+  """
+
+  def __init__(self, window=PROFILE_WINDOW, max_names=PROFILE_MAX_OPERATIONS):
+    self.window = window
+    self.max_names = max_names
+    self.samples = {}
+    self.totals = {}
+    self.lock = threading.Lock()
+
+  def add(self, name, queries, db_ms, wall_ms):
+    name = name[:MAX_OPERATION_NAME_LENGTH]
+    with self.lock:
+      if name not in self.samples and len(self.samples) >= self.max_names:
+        name = OTHER_OPERATION
+      if name not in self.samples:
+        self.samples[name] = deque(maxlen=self.window)
+        self.totals[name] = 0
+      self.samples[name].append((queries, db_ms, wall_ms))
+      self.totals[name] += 1
+
+  def snapshot(self):
+    with self.lock:
+      samples = {name: list(values) for name, values in self.samples.items()}
+      totals = dict(self.totals)
+
+    return [
+      {
+        'name': name,
+        'total_count': totals[name],
+        'window_count': len(values),
+        'queries': summarize([v[0] for v in values], QUERY_COUNT_BUCKETS),
+        'db_ms': summarize([v[1] for v in values], DURATION_BUCKETS_MS),
+        'wall_ms': summarize([v[2] for v in values], DURATION_BUCKETS_MS),
+      }
+      for name, values in sorted(samples.items())
+    ]
+
+  def reset(self):
+    with self.lock:
+      self.samples.clear()
+      self.totals.clear()
+
+
+def summarize(values, buckets):
+  ordered = sorted(values)
+  histogram = {f'le_{bound}': 0 for bound in buckets}
+  histogram['inf'] = 0
+  for value in ordered:
+    for bound in buckets:
+      if value <= bound:
+        histogram[f'le_{bound}'] += 1
+        break
+    else:
+      histogram['inf'] += 1
+
+  def percentile(p):
+    if not ordered:
+      return None
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+  return {
+    'avg': sum(ordered) / len(ordered) if ordered else None,
+    'p50': percentile(0.5),
+    'p95': percentile(0.95),
+    'max': ordered[-1] if ordered else None,
+    'histogram': histogram,
+  }
+
+
+class RollingTimings:
+  """
+  외부 호출(S3 업로드 등)의 최근 소요 시간과 실패 횟수를 이름별로 보관합니다. 워커 프로세스마다 따로 집계됩니다.
+  """
+
+  def __init__(self, window=PROFILE_WINDOW):
+    self.window = window
+    self.samples = {}
+    self.totals = {}
+    self.failures = {}
+    self.lock = threading.Lock()
+
+  def add(self, name, ms, ok=True):
+    with self.lock:
+      if name not in self.samples:
+        self.samples[name] = deque(maxlen=self.window)
+        self.totals[name] = 0
+        self.failures[name] = 0
+      self.samples[name].append(ms)
+      self.totals[name] += 1
+      if not ok:
+        self.failures[name] += 1
+
+  def snapshot(self):
+    with self.lock:
+      samples = {name: list(values) for name, values in self.samples.items()}
+      totals = dict(self.totals)
+      failures = dict(self.failures)
+
+    return [
+      {
+        'name': name,
+        'total_count': totals[name],
+        'failure_count': failures[name],
+        'window_count': len(values),
+        'ms': summarize(values, DURATION_BUCKETS_MS),
+      }
+      for name, values in sorted(samples.items())
+    ]
+
+
+stats = RollingStats()
+timings = RollingTimings()
+
+
+@contextmanager
+def record_timing(name):
+  start = time.perf_counter()
+  ok = False
+  try:
+    yield
+    ok = True
+  finally:
+    timings.add(name, (time.perf_counter() - start) * 1000, ok)
+
+
+def operation_name_for(query, operation_name=None):
+  if operation_name:
+    return operation_name
+  if not query:
+    return 'anonymous'
+  match = NAMED_OPERATION_RE.match(query)
+  if match:
+    return match.group(2)
+  match = FIRST_FIELD_RE.match(query)
+  if match:
+    return f'{match.group(1) or "query"}:{match.group(2)}'
+  return 'anonymous'
+
+
+def record_query(execute, sql, params, many, context):
+  """
+  DB 연결의 execute wrapper. 현재 프로파일 중인 operation이 있으면 SQL과 실행 시간을 기록합니다.
+  """
+  profile = _current_profile.get()
+  if profile is None:
+    return execute(sql, params, many, context)
+
+  start = time.perf_counter()
+  try:
+    return execute(sql, params, many, context)
+  finally:
+    duration = time.perf_counter() - start
+    profile.db_time += duration
+    profile.statements.append((sql, duration))
+
+
+def install_query_recorder(sender, connection, **kwargs):
+  if record_query not in connection.execute_wrappers:
+    connection.execute_wrappers.append(record_query)
+
+
+def add_listener(callback):
+  _listeners.append(callback)
+
+
+def remove_listener(callback):
+  _listeners.remove(callback)
+
+
+@contextmanager
+def profile_operation(name):
+  profile = OperationProfile(name)
+  token = _current_profile.set(profile)
+  try:
+    yield profile
+  except BaseException:
+    profile.valid = False
+    raise
+  finally:
+    _current_profile.reset(token)
+    profile.wall_time = time.perf_counter() - profile.started_at
+    finish(profile)
+
+
+def finish(profile):
+  if profile.valid:
+    stats.add(profile.name, profile.query_count, profile.db_ms, profile.wall_ms)
+
+  if profile.wall_ms >= SLOW_OPERATION_MS or profile.query_count >= SLOW_OPERATION_QUERIES:
+    statements = '\n'.join(
+      f'  [{duration * 1000:.1f}ms] {sql}'
+      for sql, duration in profile.statements[:SLOW_LOG_MAX_STATEMENTS]
+    )
+    if profile.query_count > SLOW_LOG_MAX_STATEMENTS:
+      statements += f'\n  ... {profile.query_count - SLOW_LOG_MAX_STATEMENTS} more'
+    logger.warning(
+      'Slow GraphQL operation %s: %d queries, db %.1fms, wall %.1fms\n%s',
+      profile.name, profile.query_count, profile.db_ms, profile.wall_ms, statements
+    )
+
+  for listener in list(_listeners):
+    listener(profile)
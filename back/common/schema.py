@@ -1,15 +1,19 @@
 import re, random, secrets
 import graphene
 from django.contrib.auth import get_user_model, authenticate
-from django.core.mail import EmailMultiAlternatives
 from django.contrib.auth.password_validation import validate_password, ValidationError as PasswordValidationError
 from graphql_jwt.decorators import login_required
 from graphene_django import DjangoObjectType
+from graphene.types.generic import GenericScalar
 from rest_framework_simplejwt.tokens import RefreshToken
 import graphql_jwt
 from graphql_jwt.shortcuts import get_token
 
 from back.common.models import EmailVerification
+from back.common import profiling
+from back.common.mail import enqueue_email, verification_code_html
+from back.common.throttle import check_login_rate
+from back.common.verification import is_code_expired, verification_store
 
 User = get_user_model()
 EMAIL_REGEX = r'^[\w\.-]+@[\w\.-]+\.\w+$'
@@ -25,6 +29,23 @@ class EmailVerificationType(DjangoObjectType):
     model = EmailVerification
 
 
+class OperationProfileType(graphene.ObjectType):
+  name = graphene.String()
+  total_count = graphene.Int()
+  window_count = graphene.Int()
+  queries = GenericScalar()
+  db_ms = GenericScalar()
+  wall_ms = GenericScalar()
+
+
+class TimingMetricType(graphene.ObjectType):
+  name = graphene.String()
+  total_count = graphene.Int()
+  failure_count = graphene.Int()
+  window_count = graphene.Int()
+  ms = GenericScalar()
+
+
 class Register(graphene.Mutation):
   class Arguments:
     email = graphene.String(required=True)
@@ -41,24 +62,20 @@ class Register(graphene.Mutation):
     if User.objects.filter(email=email).exists():
       raise Exception('An account with this email already exists.')
 
-    try:
-      record = EmailVerification.objects.filter(email=email, purpose='register').latest('created_at')
-    except EmailVerification.DoesNotExist:
+    record = verification_store().get(email, 'register')
+    if record is None:
       raise Exception('No email verification request found.')
 
-    if record.token != token:
+    if not record['token'] or record['token'] != token:
       raise Exception('Invalid verification token.')
 
-    if record.purpose != 'register':
-      raise Exception('Invalid verification request.')
-
     try:
       validate_password(password)
     except PasswordValidationError as e:
       raise Exception(f'Password error: {" ".join(e.messages)}')
 
     user = User.objects.create_user(email=email, name=name, password=password)
-    record.delete()
+    verification_store().delete(email, 'register')
     return Register(message='Registration successful!')
 
 
@@ -78,6 +95,7 @@ class Login(graphene.Mutation):
     if not re.match(EMAIL_REGEX, email):
       raise Exception('Invalid email format.')
 
+    check_login_rate(info.context, email)
     user = authenticate(email=email, password=password)
     if not user:
       raise Exception('Incorrect email or password.')
@@ -108,60 +126,11 @@ class SendVerificationCode(graphene.Mutation):
       raise Exception('An account with this email already exists.')
 
     code = str(random.randint(100000, 999999))
-    EmailVerification.objects.filter(email=email, purpose='register').delete()
-    EmailVerification.objects.create(email=email, code=code, purpose='register')
+    verification_store().create(email, 'register', code)
 
     subject = '[KOREAT] Registration Verification Code'
-    body = f'''
-<html>
-  <body style="margin:0; padding:0; font-family:Arial,sans-serif; background-color:#f3f4f6">
-    <table width="100%" cellpadding="0" cellspacing="0" bgcolor="#f3f4f6">
-      <tr>
-        <td align="center" style="padding:60px 0">
-          <table width="600" cellpadding="0" cellspacing="0" bgcolor="#ffffff"
-            style="border:1px solid #e2e8f0; border-radius:8px; overflow:hidden">
-            <tr>
-              <td align="center" bgcolor="#2f3437" style="padding:20px">
-                <h1 style="margin:0; color:#ffffff; font-size:26px">KOREAT</h1>
-              </td>
-            </tr>
-            <tr>
-              <td align="center" style="padding:40px">
-                <p style="margin:0 0 10px 0; color:#333333; font-size:18px">Verification Code</p>
-                <p style="margin:0; color:#000000; font-size:36px; font-weight:bold">
-                  {code}
-                </p>
-                <p style="margin:10px 0 0 0; color:#777777; font-size:14px">
-                  This code will expire in 5 minutes
-                </p>
-              </td>
-            </tr>
-            <tr>
-              <td style="padding:20px; border-top:1px solid #e2e8f0">
-                <p style="margin:0; color:#555555; font-size:12px">
-                  If you did not request this email, please ignore it.  
-                  For assistance, contact us at  
-                  <a href="mailto:hensin12@gmail.com" style="color:#2f3437; text-decoration:none">
-                    hensin12@gmail.com
-                  </a>
-                </p>
-              </td>
-            </tr>
-          </table>
-        </td>
-      </tr>
-    </table>
-  </body>
-</html>
-'''
-
-    try:
-      message = EmailMultiAlternatives(subject, 'Registration verification code.', to=[email])
-      message.attach_alternative(body, "text/html")
-      message.send()
-      return SendVerificationCode(message='Verification code has been sent to your email.')
-    except Exception as e:
-      raise Exception(f'Failed to send email: {str(e)}')
+    enqueue_email(email, subject, 'Registration verification code.', verification_code_html(code))
+    return SendVerificationCode(message='Verification code has been sent to your email.')
 
 
 class VerifyEmailCode(graphene.Mutation):
@@ -173,20 +142,18 @@ class VerifyEmailCode(graphene.Mutation):
   token = graphene.String()
 
   def mutate(self, info, email, code):
-    try:
-      record = EmailVerification.objects.filter(email=email, purpose='register').latest('created_at')
-    except EmailVerification.DoesNotExist:
+    record = verification_store().get(email, 'register')
+    if record is None:
       raise Exception('No verification request record found.')
 
-    if record.is_expired():
+    if is_code_expired(record):
       raise Exception('Verification code has expired.')
 
-    if record.code != code:
+    if record['code'] != code:
       raise Exception('Incorrect verification code.')
 
     one_time_token = secrets.token_urlsafe(32)
-    record.token = one_time_token
-    record.save()
+    verification_store().set_token(email, 'register', one_time_token)
 
     return VerifyEmailCode(message='Email verification successful', token=one_time_token)
 
@@ -205,60 +172,11 @@ class SendResetCode(graphene.Mutation):
       raise Exception('No user registered with this email.')
 
     code = str(random.randint(100000, 999999))
-    EmailVerification.objects.filter(email=email, purpose='reset').delete()
-    EmailVerification.objects.create(email=email, code=code, purpose='reset')
+    verification_store().create(email, 'reset', code)
 
     subject = '[KOREAT] Password Reset Verification Code'
-    body = f'''
-<html>
-  <body style="margin:0; padding:0; font-family:Arial,sans-serif; background-color:#f3f4f6">
-    <table width="100%" cellpadding="0" cellspacing="0" bgcolor="#f3f4f6">
-      <tr>
-        <td align="center" style="padding:60px 0">
-          <table width="600" cellpadding="0" cellspacing="0" bgcolor="#ffffff"
-            style="border:1px solid #e2e8f0; border-radius:8px; overflow:hidden">
-            <tr>
-              <td align="center" bgcolor="#2f3437" style="padding:20px">
-                <h1 style="margin:0; color:#ffffff; font-size:26px">KOREAT</h1>
-              </td>
-            </tr>
-            <tr>
-              <td align="center" style="padding:40px">
-                <p style="margin:0 0 10px 0; color:#333333; font-size:18px">Verification Code</p>
-                <p style="margin:0; color:#000000; font-size:36px; font-weight:bold">
-                  {code}
-                </p>
-                <p style="margin:10px 0 0 0; color:#777777; font-size:14px">
-                  This code will expire in 5 minutes
-                </p>
-              </td>
-            </tr>
-            <tr>
-              <td style="padding:20px; border-top:1px solid #e2e8f0">
-                <p style="margin:0; color:#555555; font-size:12px">
-                  If you did not request this email, please ignore it.  
-                  For assistance, contact us at  
-                  <a href="mailto:hensin12@gmail.com" style="color:#2f3437; text-decoration:none">
-                    hensin12@gmail.com
-                  </a>
-                </p>
-              </td>
-            </tr>
-          </table>
-        </td>
-      </tr>
-    </table>
-  </body>
-</html>
-'''
-
-    try:
-      message = EmailMultiAlternatives(subject, 'Password reset verification code.', to=[email])
-      message.attach_alternative(body, "text/html")
-      message.send()
-      return SendResetCode(message='Verification code has been sent to your email.')
-    except Exception as e:
-      raise Exception(f'Failed to send email: {str(e)}')
+    enqueue_email(email, subject, 'Password reset verification code.', verification_code_html(code))
+    return SendResetCode(message='Verification code has been sent to your email.')
 
 
 class VerifyResetCode(graphene.Mutation):
@@ -270,20 +188,18 @@ class VerifyResetCode(graphene.Mutation):
   token = graphene.String()
 
   def mutate(self, info, email, code):
-    try:
-      record = EmailVerification.objects.filter(email=email, purpose='reset').latest('created_at')
-    except EmailVerification.DoesNotExist:
+    record = verification_store().get(email, 'reset')
+    if record is None:
       raise Exception('No password reset request found.')
 
-    if record.is_expired():
+    if is_code_expired(record):
       raise Exception('Verification code has expired.')
 
-    if record.code != code:
+    if record['code'] != code:
       raise Exception('Incorrect verification code.')
 
     one_time_token = secrets.token_urlsafe(32)
-    record.token = one_time_token
-    record.save()
+    verification_store().set_token(email, 'reset', one_time_token)
 
     return VerifyResetCode(message='Verification successful', token=one_time_token)
 
@@ -297,12 +213,11 @@ class ResetPassword(graphene.Mutation):
   message = graphene.String()
 
   def mutate(self, info, email, token, new_password):
-    try:
-      record = EmailVerification.objects.filter(email=email, purpose='reset').latest('created_at')
-    except EmailVerification.DoesNotExist:
+    record = verification_store().get(email, 'reset')
+    if record is None:
       raise Exception('No password reset request found.')
 
-    if record.token != token:
+    if not record['token'] or record['token'] != token:
       raise Exception('Invalid token.')
 
     try:
@@ -314,7 +229,7 @@ class ResetPassword(graphene.Mutation):
       user = User.objects.get(email=email)
       user.set_password(new_password)
       user.save()
-      record.delete()
+      verification_store().delete(email, 'reset')
       return ResetPassword(message='Password successfully changed.')
     except User.DoesNotExist:
       raise Exception('User not found.')
@@ -329,9 +244,10 @@ class UpdateUsername(graphene.Mutation):
 
   @login_required
   def mutate(self, info, name):
-    user = info.context.user
+    # 인증에 쓰인 사용자는 캐시에서 만든 것일 수 있으므로 새로 읽어 이름만 저장합니다.
+    user = User.objects.get(pk=info.context.user.pk)
     user.name = name
-    user.save()
+    user.save(update_fields=['name'])
     return UpdateUsername(message='Name successfully updated.', name=name)
 
 
@@ -340,11 +256,17 @@ class DeleteAccount(graphene.Mutation):
 
   @login_required
   def mutate(self, info):
-    user = info.context.user
-    user.delete()
+    User.objects.get(pk=info.context.user.pk).delete()
     return DeleteAccount(message='Account successfully deleted.')
 
 
+class ObtainJSONWebToken(graphql_jwt.ObtainJSONWebToken):
+  @classmethod
+  def mutate(cls, root, info, **kwargs):
+    check_login_rate(info.context, kwargs.get(User.USERNAME_FIELD))
+    return super().mutate(root, info, **kwargs)
+
+
 class Mutation(graphene.ObjectType):
   register = Register.Field()
   login = Login.Field()
@@ -355,14 +277,30 @@ class Mutation(graphene.ObjectType):
   reset_password = ResetPassword.Field()
   update_username = UpdateUsername.Field()
   delete_account = DeleteAccount.Field()
-  token_auth = graphql_jwt.ObtainJSONWebToken.Field()
+  token_auth = ObtainJSONWebToken.Field()
   verify_token = graphql_jwt.Verify.Field()
   refresh_token = graphql_jwt.Refresh.Field()
 
 
 class Query(graphene.ObjectType):
   me = graphene.Field(UserType)
+  operation_profiles = graphene.List(OperationProfileType)
+  timing_metrics = graphene.List(TimingMetricType)
 
   
   def resolve_me(self, info):
     return info.context.user
+
+  @login_required
+  def resolve_operation_profiles(self, info):
+    user = info.context.user
+    if not user.is_staff:
+      raise Exception("You are not authorized to view operation profiles")
+    return profiling.stats.snapshot()
+
+  @login_required
+  def resolve_timing_metrics(self, info):
+    user = info.context.user
+    if not user.is_staff:
+      raise Exception("You are not authorized to view timing metrics")
+    return profiling.timings.snapshot()
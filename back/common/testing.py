@@ -0,0 +1,41 @@
+from contextlib import contextmanager
+
+from back.common import profiling
+
+
+@contextmanager
+def capture_operations():
+  """
+  블록 안에서 실행된 GraphQL operation들의 프로파일을 수집합니다.
+  """
+  profiles = []
+  profiling.add_listener(profiles.append)
+  try:
+    yield profiles
+  finally:
+    profiling.remove_listener(profiles.append)
+
+
+@contextmanager
+def assert_max_queries(max_queries, operation_name=None):
+  """
+  블록 안에서 실행된 GraphQL operation의 SQL 쿼리 수가 max_queries를 넘으면 AssertionError를 발생시킵니다.
+  operation_name을 주면 해당 operation만 검사합니다. N+1 회귀를 테스트에서 잡는 용도입니다.
+
+    with assert_max_queries(3, 'userCategories'):
+      self.query('query userCategories { userCategories { savedPlaces { id } } }')
+  """
+  with capture_operations() as profiles:
+    yield profiles
+
+  checked = [p for p in profiles if operation_name is None or p.name == operation_name]
+  if operation_name is not None and not checked:
+    raise AssertionError(f'GraphQL operation {operation_name} was not executed')
+
+  for profile in checked:
+    if profile.query_count > max_queries:
+      statements = '\n'.join(f'  {sql}' for sql, duration in profile.statements)
+      raise AssertionError(
+        f'GraphQL operation {profile.name} executed {profile.query_count} queries '
+        f'(max {max_queries}):\n{statements}'
+      )
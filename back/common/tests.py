@@ -1,3 +1,499 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+from datetime import timedelta
+from smtplib import SMTPException
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.hashers import make_password
+from django.core.cache import caches
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from graphql_jwt.shortcuts import get_token
+
+from back.common import auth, mail, throttle, verification
+from back.common.models import EmailOutbox, EmailVerification, User
+from back.common.testing import assert_max_queries
+from back.place import clients
+from back.views import BATCH_MAX_OPERATIONS
+
+
+class FakeSMTPBackend(BaseEmailBackend):
+  """
+  실패시킬 수신자를 지정할 수 있는 SMTP 대역. 보낸 메시지와 연결을 연 횟수를 기록합니다.
+  """
+
+  def __init__(self, failing=(), **kwargs):
+    super().__init__(**kwargs)
+    self.failing = set(failing)
+    self.sent = []
+    self.opened = 0
+    self.is_open = False
+
+  def open(self):
+    if not self.is_open:
+      self.is_open = True
+      self.opened += 1
+
+  def close(self):
+    self.is_open = False
+
+  def send_messages(self, messages):
+    for message in messages:
+      if set(message.to) & self.failing:
+        raise SMTPException(f'550 rejected {message.to[0]}')
+      self.sent.append(message)
+    return len(messages)
+
+
+class BatchExecutionTests(TestCase):
+  def setUp(self):
+    self.user = User.objects.create_user('batch@example.com', 'batch', 'password')
+    self.headers = {'Authorization': f'JWT {get_token(self.user)}'}
+
+  def post(self, body):
+    response = self.client.post('/graphql/', json.dumps(body), content_type='application/json', headers=self.headers)
+    return response.status_code, json.loads(response.content)
+
+  def test_operations_run_in_order(self):
+    status, results = self.post([
+      {'query': 'mutation { createUserCategory(name: "first", color: "") { category { name } } }'},
+      {'query': 'query categories { userCategories { name } }', 'operationName': 'categories'},
+      {'query': 'mutation { createUserCategory(name: "second", color: "") { category { name } } }'},
+      {'query': 'query categories { userCategories { name } }', 'operationName': 'categories'},
+    ])
+
+    self.assertEqual(status, 200)
+    self.assertEqual(len(results), 4)
+    self.assertEqual([c['name'] for c in results[1]['data']['userCategories']], ['first'])
+    self.assertEqual([c['name'] for c in results[3]['data']['userCategories']], ['first', 'second'])
+
+  def test_errors_stay_in_their_entry(self):
+    status, results = self.post([
+      {'query': '{ noSuchField }'},
+      'not an object',
+      {'query': '{ me { email } }'},
+    ])
+
+    self.assertEqual(status, 200)
+    self.assertIn('errors', results[0])
+    self.assertEqual(results[1]['status'], 400)
+    self.assertEqual(results[2]['data']['me']['email'], 'batch@example.com')
+
+  def test_failed_operation_does_not_roll_back_earlier_ones(self):
+    # 배치의 operation은 savepoint로 격리되지 않으므로 앞선 mutation의 변경은 그대로 남습니다.
+    status, results = self.post([
+      {'query': 'mutation { createUserCategory(name: "dup", color: "") { category { name } } }'},
+      {'query': 'mutation { createUserCategory(name: "dup", color: "") { category { name } } }'},
+    ])
+
+    self.assertEqual(status, 200)
+    self.assertEqual(results[0]['data']['createUserCategory']['category']['name'], 'dup')
+    self.assertIn('already exists', results[1]['errors'][0]['message'])
+    self.assertEqual(list(self.user.userCategories.values_list('name', flat=True)), ['dup'])
+
+  def test_rejects_oversized_batch(self):
+    status, result = self.post([{'query': '{ me { email } }'}] * (BATCH_MAX_OPERATIONS + 1))
+
+    self.assertEqual(status, 400)
+    self.assertIn('at most', result['errors'][0]['message'])
+
+  def test_query_count_does_not_grow_with_categories(self):
+    for i in range(10):
+      self.user.userCategories.create(name=f'category {i}')
+
+    with assert_max_queries(5, 'categories'):
+      self.post([{'query': 'query categories { userCategories { name savedPlaces { id } } }'}])
+
+
+class FakeDeepL:
+  """
+  DeepL 응답을 흉내 내는 HTTP 클라이언트 대역. expected개의 요청이 모두 도착해야 응답하므로,
+  요청이 하나씩 처리되면 제한 시간 안에 끝나지 않습니다.
+  """
+
+  def __init__(self, expected):
+    self.expected = expected
+    self.requests = []
+    self.all_arrived = asyncio.Event()
+
+  async def post(self, url, data):
+    self.requests.append(data)
+    if len(self.requests) >= self.expected:
+      self.all_arrived.set()
+    await asyncio.wait_for(self.all_arrived.wait(), timeout=5)
+    return mock.Mock(json=lambda: {'translations': [{'text': text.upper()} for text in data['text']]})
+
+
+class AsyncGraphQLViewTests(TestCase):
+  async def translate(self, text):
+    response = await self.async_client.post(
+      '/graphql/',
+      json.dumps({'query': 'mutation { translateText(text: "%s", targetLanguage: "en") { translatedText } }' % text}),
+      content_type='application/json'
+    )
+    return json.loads(response.content)['data']['translateText']['translatedText']
+
+  async def test_upstream_calls_of_concurrent_requests_overlap(self):
+    deepl = FakeDeepL(expected=3)
+
+    with mock.patch.object(clients, 'get_http_client', return_value=deepl):
+      results = await asyncio.gather(self.translate('a'), self.translate('b'), self.translate('c'))
+
+    self.assertEqual(results, ['A', 'B', 'C'])
+    self.assertEqual(len(deepl.requests), 3)
+
+  async def test_clients_are_reused_per_loop_and_closed(self):
+    client = clients.get_http_client()
+    self.assertIs(clients.get_http_client(), client)
+
+    await clients.close_clients()
+
+    self.assertTrue(client.is_closed)
+    self.assertIsNot(clients.get_http_client(), client)
+    await clients.close_clients()
+
+  def test_wsgi_requests_close_their_loop_clients(self):
+    with mock.patch('back.views.close_clients') as close_clients:
+      self.client.post('/graphql/', json.dumps({'query': '{ __typename }'}), content_type='application/json')
+
+    close_clients.assert_called_once()
+
+
+class OutboxTests(TestCase):
+  def test_sends_pending_mail_over_one_connection(self):
+    for i in range(3):
+      mail.enqueue_email(f'user{i}@example.com', 'Subject', 'Body', '<p>Body</p>')
+    backend = FakeSMTPBackend()
+
+    self.assertEqual(mail.send_outbox(connection=backend), (3, 0))
+    self.assertEqual(len(backend.sent), 3)
+    self.assertEqual(backend.opened, 1)
+    self.assertFalse(EmailOutbox.objects.exclude(status=EmailOutbox.STATUS_SENT).exists())
+    self.assertEqual(mail.send_outbox(connection=backend), (0, 0))
+    # 보낸 메일에는 인증 코드가 담긴 본문을 남기지 않습니다.
+    self.assertFalse(EmailOutbox.objects.exclude(text_body='', html_body='').exists())
+
+  def test_failed_mail_is_retried_with_backoff(self):
+    bounced = mail.enqueue_email('bounce@example.com', 'Subject', 'Body')
+    delivered = mail.enqueue_email('ok@example.com', 'Subject', 'Body')
+    backend = FakeSMTPBackend(failing={'bounce@example.com'})
+
+    before = timezone.now()
+    with self.assertLogs('back.mail', 'WARNING'):
+      self.assertEqual(mail.send_outbox(connection=backend), (1, 1))
+
+    bounced.refresh_from_db()
+    delivered.refresh_from_db()
+    self.assertEqual(delivered.status, EmailOutbox.STATUS_SENT)
+    self.assertEqual(bounced.status, EmailOutbox.STATUS_PENDING)
+    self.assertEqual(bounced.attempts, 1)
+    self.assertIn('550', bounced.last_error)
+    self.assertGreaterEqual(bounced.next_attempt_at, before + timedelta(seconds=mail.retry_delay(1)))
+    # 다음 시도 시각 전에는 다시 가져가지 않습니다.
+    self.assertEqual(mail.send_outbox(connection=backend), (0, 0))
+
+  def test_mail_fails_after_max_attempts(self):
+    bounced = mail.enqueue_email('bounce@example.com', 'Subject', 'Body')
+    backend = FakeSMTPBackend(failing={'bounce@example.com'})
+
+    for _ in range(mail.EMAIL_OUTBOX_MAX_ATTEMPTS):
+      EmailOutbox.objects.filter(id=bounced.id).update(next_attempt_at=timezone.now())
+      with self.assertLogs('back.mail', 'WARNING'):
+        self.assertEqual(mail.send_outbox(connection=backend), (0, 1))
+
+    bounced.refresh_from_db()
+    self.assertEqual(bounced.status, EmailOutbox.STATUS_FAILED)
+    self.assertEqual(bounced.attempts, mail.EMAIL_OUTBOX_MAX_ATTEMPTS)
+    self.assertEqual((bounced.text_body, bounced.html_body), ('', ''))
+
+  def test_purges_old_sent_and_failed_mail(self):
+    old = timezone.now() - timedelta(days=mail.EMAIL_OUTBOX_RETENTION_DAYS + 1)
+    for status in (EmailOutbox.STATUS_SENT, EmailOutbox.STATUS_FAILED, EmailOutbox.STATUS_PENDING):
+      EmailOutbox.objects.filter(id=mail.enqueue_email('old@example.com', 'Subject', 'Body').id).update(
+        status=status, created_at=old, next_attempt_at=timezone.now() + timedelta(hours=1)
+      )
+    recent = mail.enqueue_email('recent@example.com', 'Subject', 'Body')
+    EmailOutbox.objects.filter(id=recent.id).update(status=EmailOutbox.STATUS_SENT)
+
+    call_command('send_outbox', stdout=io.StringIO())
+
+    self.assertEqual(
+      sorted(EmailOutbox.objects.values_list('to_email', 'status')),
+      [('old@example.com', EmailOutbox.STATUS_PENDING), ('recent@example.com', EmailOutbox.STATUS_SENT)],
+    )
+
+  def test_retry_delay_doubles_up_to_the_maximum(self):
+    delays = [mail.retry_delay(attempts) for attempts in range(1, 20)]
+
+    self.assertEqual(delays[0], mail.EMAIL_OUTBOX_RETRY_BASE)
+    self.assertEqual(delays[1], mail.EMAIL_OUTBOX_RETRY_BASE * 2)
+    self.assertEqual(delays, sorted(delays))
+    self.assertEqual(delays[-1], mail.EMAIL_OUTBOX_RETRY_MAX)
+
+
+@override_settings(
+  CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'throttle-tests'}},
+  LOGIN_RATE_LIMITS={'ip': (3, 60), 'email': None},
+)
+class LoginThrottleTests(TestCase):
+  def setUp(self):
+    caches['default'].clear()
+    self.request = RequestFactory().post('/graphql/', REMOTE_ADDR='203.0.113.1')
+
+  def attempt(self, now, email='victim@example.com'):
+    with mock.patch('back.common.throttle.time.time', return_value=now):
+      throttle.check_login_rate(self.request, email)
+
+  def test_blocks_after_limit_within_window(self):
+    for _ in range(3):
+      self.attempt(1200)
+
+    with self.assertRaisesMessage(Exception, 'Too many login attempts'):
+      self.attempt(1201)
+
+  def test_previous_window_is_weighted_by_elapsed_time(self):
+    for _ in range(3):
+      self.attempt(1200)
+
+    # 다음 구간의 절반이 지나면 직전 구간의 3회가 약 1.5회로 계산되어 두 번 더 허용됩니다.
+    self.attempt(1290)
+    self.attempt(1291)
+    with self.assertRaisesMessage(Exception, 'Too many login attempts'):
+      self.attempt(1292)
+
+    # 두 구간이 지나면 제한이 풀립니다.
+    self.attempt(1380)
+
+  def test_rejected_attempts_are_not_counted(self):
+    for _ in range(3):
+      self.attempt(1200)
+    for _ in range(5):
+      with self.assertRaises(Exception):
+        self.attempt(1210)
+
+    self.attempt(1290)
+
+  def test_limits_are_per_client(self):
+    for _ in range(3):
+      self.attempt(1200)
+
+    other = RequestFactory().post('/graphql/', REMOTE_ADDR='203.0.113.2')
+    with mock.patch('back.common.throttle.time.time', return_value=1200):
+      throttle.check_login_rate(other, 'victim@example.com')
+
+  @override_settings(LOGIN_RATE_LIMIT_PROXY_COUNT=1)
+  def test_client_ip_uses_trusted_proxy_count(self):
+    request = RequestFactory().post(
+      '/graphql/', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='198.51.100.7, 203.0.113.9'
+    )
+
+    self.assertEqual(throttle.client_ip(request), '203.0.113.9')
+
+  @override_settings(LOGIN_RATE_LIMIT_PROXY_COUNT=None)
+  def test_proxy_count_falls_back_to_environment(self):
+    request = RequestFactory().post(
+      '/graphql/', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='198.51.100.7, 203.0.113.9'
+    )
+
+    with mock.patch.dict('os.environ', {'LOGIN_RATE_LIMIT_PROXY_COUNT': '2'}):
+      self.assertEqual(throttle.client_ip(request), '198.51.100.7')
+
+  @override_settings(LOGIN_RATE_LIMIT_PROXY_COUNT=0)
+  def test_ip_scope_is_skipped_behind_an_unconfigured_proxy(self):
+    # 프록시 수를 모르면 모든 요청이 프록시 주소(REMOTE_ADDR)를 공유하므로 IP 기준 제한을 하지 않습니다.
+    self.request = RequestFactory().post('/graphql/', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='198.51.100.7')
+
+    for _ in range(5):
+      self.attempt(1200)
+
+
+@override_settings(
+  CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'auth-tests'},
+    'shared': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'auth_test_cache'},
+  },
+  JWT_USER_CACHE_ALIAS='shared',
+)
+class JWTUserCacheTests(TestCase):
+  @classmethod
+  def setUpTestData(cls):
+    call_command('createcachetable', 'auth_test_cache', verbosity=0)
+
+  def setUp(self):
+    caches['shared'].clear()
+    self.user = User.objects.create_user('cached@example.com', 'cached', 'password')
+
+  def test_second_lookup_does_not_query_users(self):
+    auth.get_user_by_natural_key('cached@example.com')
+
+    with self.assertNumQueries(1):  # 캐시 테이블 조회
+      user = auth.get_user_by_natural_key('cached@example.com')
+    self.assertEqual((user.pk, user.email, user.is_active), (self.user.pk, 'cached@example.com', True))
+
+  def test_password_hash_is_not_cached(self):
+    auth.get_user_by_natural_key('cached@example.com')
+
+    cached = caches['shared'].get(auth.user_cache_key('cached@example.com'))
+    self.assertNotIn(self.user.password, cached)
+    user = auth.get_user_by_natural_key('cached@example.com')
+    self.assertIn('password', user.get_deferred_fields())
+    self.assertTrue(user.check_password('password'))
+
+  def test_changes_invalidate_the_cache(self):
+    auth.get_user_by_natural_key('cached@example.com')
+    self.user.is_staff = True
+    self.user.save(update_fields=['is_staff'])
+    self.assertTrue(auth.get_user_by_natural_key('cached@example.com').is_staff)
+
+    self.user.email = 'renamed@example.com'
+    self.user.save()
+    self.assertIsNone(auth.get_user_by_natural_key('cached@example.com'))
+
+    auth.get_user_by_natural_key('renamed@example.com')
+    self.user.delete()
+    self.assertIsNone(auth.get_user_by_natural_key('renamed@example.com'))
+
+  def test_saving_does_not_read_the_previous_email(self):
+    user = User.objects.get(pk=self.user.pk)
+
+    with self.assertNumQueries(2):  # UPDATE, 캐시 삭제
+      user.save(update_fields=['last_login'])
+
+  def test_update_username_keeps_a_password_changed_elsewhere(self):
+    token = get_token(self.user)
+    self.client.post('/graphql/', json.dumps({'query': '{ me { email } }'}), content_type='application/json',
+                     headers={'Authorization': f'JWT {token}'})
+    # 다른 워커에서 비밀번호가 바뀌어도 캐시의 사용자로 이름을 바꿀 때 이전 해시를 다시 쓰지 않습니다.
+    User.objects.filter(pk=self.user.pk).update(password=make_password('changed'))
+
+    response = self.client.post(
+      '/graphql/', json.dumps({'query': 'mutation { updateUsername(name: "new") { name } }'}),
+      content_type='application/json', headers={'Authorization': f'JWT {token}'}
+    )
+
+    self.assertEqual(json.loads(response.content)['data']['updateUsername']['name'], 'new')
+    user = User.objects.get(pk=self.user.pk)
+    self.assertEqual(user.name, 'new')
+    self.assertTrue(user.check_password('changed'))
+
+  @override_settings(JWT_USER_CACHE_ALIAS='default')
+  def test_process_local_cache_is_not_used(self):
+    auth.get_user_by_natural_key('cached@example.com')
+
+    with self.assertNumQueries(1):
+      auth.get_user_by_natural_key('cached@example.com')
+
+
+class VerificationStoreTests:
+  """
+  두 저장소가 같게 동작하는지 확인하는 공통 테스트. store()를 구현한 TestCase와 함께 상속합니다.
+  """
+
+  def test_records_follow_the_code_flow(self):
+    store = self.store()
+    self.assertIsNone(store.get('a@example.com', 'register'))
+
+    store.create('a@example.com', 'register', '123456')
+    store.create('a@example.com', 'reset', '654321')
+    self.assertEqual(store.get('a@example.com', 'register')['code'], '123456')
+    self.assertIsNone(store.get('a@example.com', 'register')['token'])
+
+    store.set_token('a@example.com', 'register', 'token')
+    self.assertEqual(store.get('a@example.com', 'register')['token'], 'token')
+
+    # 코드를 다시 요청하면 이전 코드와 토큰은 무효가 됩니다.
+    store.create('a@example.com', 'register', '111111')
+    record = store.get('a@example.com', 'register')
+    self.assertEqual((record['code'], record['token']), ('111111', None))
+
+    store.delete('a@example.com', 'register')
+    self.assertIsNone(store.get('a@example.com', 'register'))
+    self.assertEqual(store.get('a@example.com', 'reset')['code'], '654321')
+
+  def test_records_expire(self):
+    store = self.store()
+    store.create('a@example.com', 'register', '123456')
+
+    later = timezone.now() + timedelta(seconds=verification.VERIFICATION_RECORD_TTL + 1)
+    # 데이터베이스 저장소는 timezone.now(), 캐시는 time.time()으로 만료를 판단합니다.
+    with mock.patch('django.utils.timezone.now', return_value=later), \
+         mock.patch('time.time', return_value=later.timestamp()):
+      self.assertIsNone(store.get('a@example.com', 'register'))
+
+
+class DatabaseVerificationStoreTests(VerificationStoreTests, TestCase):
+  def store(self):
+    return verification.DatabaseVerificationStore()
+
+  def test_purge_deletes_only_expired_rows(self):
+    store = self.store()
+    store.create('live@example.com', 'register', '123456')
+    store.create('expired@example.com', 'register', '123456')
+    EmailVerification.objects.filter(email='expired@example.com').update(expires_at=timezone.now())
+    EmailVerification.objects.create(email='legacy@example.com', purpose='register', code='123456')
+    EmailVerification.objects.filter(email='legacy@example.com').update(created_at=timezone.now() - timedelta(days=1))
+
+    self.assertEqual(verification.purge_expired(), 2)
+    self.assertEqual(list(EmailVerification.objects.values_list('email', flat=True)), ['live@example.com'])
+
+
+@override_settings(
+  CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'verification-tests'}}
+)
+class CacheVerificationStoreTests(VerificationStoreTests, TestCase):
+  def setUp(self):
+    caches['default'].clear()
+
+  def store(self):
+    return verification.CacheVerificationStore()
+
+
+class RegistrationFlowTests(TestCase):
+  def setUp(self):
+    patcher = mock.patch.object(verification, '_store', None)
+    patcher.start()
+    self.addCleanup(patcher.stop)
+
+  def mutate(self, query):
+    response = self.client.post('/graphql/', json.dumps({'query': query}), content_type='application/json')
+    result = json.loads(response.content)
+    if result.get('errors'):
+      return result['errors'][0]['message']
+    return next(iter(result['data'].values()))
+
+  def test_register_with_a_verified_email(self):
+    self.mutate('mutation { sendVerificationCode(email: "new@example.com") { message } }')
+    code = EmailVerification.objects.get(email='new@example.com').code
+    self.assertEqual(EmailOutbox.objects.get().to_email, 'new@example.com')
+
+    wrong = '000000' if code != '000000' else '111111'
+    self.assertEqual(
+      self.mutate('mutation { verifyEmailCode(email: "new@example.com", code: "%s") { token } }' % wrong),
+      'Incorrect verification code.'
+    )
+    token = self.mutate('mutation { verifyEmailCode(email: "new@example.com", code: "%s") { token } }' % code)['token']
+    self.assertEqual(self.mutate(
+      'mutation { register(email: "new@example.com", name: "new", password: "Correct-horse-9", token: "wrong") { message } }'
+    ), 'Invalid verification token.')
+    self.assertEqual(self.mutate(
+      'mutation { register(email: "new@example.com", name: "new", password: "Correct-horse-9", token: "%s") { message } }' % token
+    )['message'], 'Registration successful!')
+
+    self.assertTrue(User.objects.get(email='new@example.com').check_password('Correct-horse-9'))
+    self.assertFalse(EmailVerification.objects.exists())
+
+  def test_expired_code_is_rejected(self):
+    User.objects.create_user('reset@example.com', 'reset', 'password')
+    self.mutate('mutation { sendResetCode(email: "reset@example.com") { message } }')
+    record = EmailVerification.objects.get(email='reset@example.com', purpose='reset')
+    EmailVerification.objects.filter(id=record.id).update(
+      created_at=timezone.now() - timedelta(seconds=verification.VERIFICATION_CODE_TTL + 1)
+    )
+
+    self.assertEqual(
+      self.mutate('mutation { verifyResetCode(email: "reset@example.com", code: "%s") { token } }' % record.code),
+      'Verification code has expired.'
+    )
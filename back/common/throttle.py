@@ -0,0 +1,81 @@
+import hashlib
+import os
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+# (허용 횟수, 기간(초)). None이면 해당 기준으로는 제한하지 않습니다.
+DEFAULT_LOGIN_RATE_LIMITS = {
+  'ip': (30, 60),
+  'email': (10, 300),
+}
+
+
+def throttle_cache():
+  return caches[getattr(settings, 'LOGIN_RATE_LIMIT_CACHE_ALIAS', 'default')]
+
+
+def login_rate_limits():
+  if not getattr(settings, 'LOGIN_RATE_LIMIT_ENABLED', True):
+    return {}
+  return {**DEFAULT_LOGIN_RATE_LIMITS, **getattr(settings, 'LOGIN_RATE_LIMITS', {})}
+
+
+def proxy_count():
+  count = getattr(settings, 'LOGIN_RATE_LIMIT_PROXY_COUNT', None)
+  if count is None:
+    # 배포 환경(render.yaml)에서는 환경 변수로 지정합니다.
+    count = os.environ.get('LOGIN_RATE_LIMIT_PROXY_COUNT') or 0
+  return int(count)
+
+
+def client_ip(request):
+  """
+  요청한 클라이언트의 IP. 프록시 뒤에서는 LOGIN_RATE_LIMIT_PROXY_COUNT에 신뢰하는 프록시 수를 지정하면
+  X-Forwarded-For의 오른쪽에서 그만큼 건너뛴 주소를 씁니다. 프록시 수를 지정하지 않았는데 X-Forwarded-For가 있으면
+  REMOTE_ADDR이 프록시 주소라 모든 사용자가 한 카운터를 쓰게 되므로 빈 문자열을 반환해 IP 기준 제한을 건너뜁니다.
+  """
+  forwarded = [ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+  if forwarded:
+    count = proxy_count()
+    return forwarded[-min(count, len(forwarded))] if count else ''
+  return request.META.get('REMOTE_ADDR', '')
+
+
+def window_keys(scope, value, period, now):
+  digest = hashlib.sha256(value.encode('utf-8')).hexdigest()
+  bucket = int(now // period)
+  return f'login_rate:{scope}:{digest}:{bucket}', f'login_rate:{scope}:{digest}:{bucket - 1}', bucket
+
+
+def check_login_rate(request, email):
+  """
+  비밀번호 해시 전에 IP와 이메일별 로그인 시도 횟수를 검사합니다. 슬라이딩 윈도우는 현재와 직전 구간의 카운터를
+  경과 비율로 합쳐 계산합니다. 제한에 걸린 시도는 캐시 조회 한 번으로 거절하고 카운터를 올리지 않습니다.
+  """
+  limits = login_rate_limits()
+  subjects = [
+    (scope, value, limits[scope])
+    for scope, value in (('ip', client_ip(request)), ('email', (email or '').strip().lower()))
+    if value and limits.get(scope)
+  ]
+  if not subjects:
+    return
+
+  cache = throttle_cache()
+  now = time.time()
+  keys = [(window_keys(scope, value, period, now), limit, period) for scope, value, (limit, period) in subjects]
+  counts = cache.get_many([key for (current, previous, _), _, _ in keys for key in (current, previous)])
+  for (current, previous, bucket), limit, period in keys:
+    elapsed = now / period - bucket
+    if counts.get(previous, 0) * (1 - elapsed) + counts.get(current, 0) >= limit:
+      raise Exception('Too many login attempts. Please try again later.')
+
+  for (current, _, _), _, period in keys:
+    # 직전 구간 계산에도 쓰이므로 두 구간 동안 보관합니다.
+    cache.add(current, 0, period * 2)
+    try:
+      cache.incr(current)
+    except ValueError:
+      cache.set(current, 1, period * 2)
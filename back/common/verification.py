@@ -0,0 +1,110 @@
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+# 인증 코드가 유효한 시간(초)
+VERIFICATION_CODE_TTL = 5 * 60
+# 요청/인증 기록을 보관하는 시간(초). 코드 인증 후 발급한 토큰도 이 시간 동안만 쓸 수 있습니다.
+VERIFICATION_RECORD_TTL = getattr(settings, 'EMAIL_VERIFICATION_TTL', 60 * 60)
+
+_store = None
+
+
+def is_code_expired(record):
+  return timezone.now() > record['created_at'] + timedelta(seconds=VERIFICATION_CODE_TTL)
+
+
+class CacheVerificationStore:
+  """
+  이메일과 용도별 인증 기록을 캐시에 VERIFICATION_RECORD_TTL 동안 보관합니다. 만료된 기록은 캐시가 지웁니다.
+  워커 간에 공유되는 캐시(Redis 등)를 EMAIL_VERIFICATION_CACHE_ALIAS로 지정할 때만 사용합니다.
+  """
+
+  def __init__(self):
+    self.cache = caches[getattr(settings, 'EMAIL_VERIFICATION_CACHE_ALIAS', 'default')]
+
+  def key(self, email, purpose):
+    return f'email_verification:{purpose}:' + hashlib.sha256(email.encode('utf-8')).hexdigest()
+
+  def get(self, email, purpose):
+    return self.cache.get(self.key(email, purpose))
+
+  def create(self, email, purpose, code):
+    record = {'code': code, 'token': None, 'created_at': timezone.now()}
+    self.cache.set(self.key(email, purpose), record, VERIFICATION_RECORD_TTL)
+    return record
+
+  def set_token(self, email, purpose, token):
+    record = self.get(email, purpose)
+    if record is not None:
+      self.cache.set(self.key(email, purpose), {**record, 'token': token}, VERIFICATION_RECORD_TTL)
+
+  def delete(self, email, purpose):
+    self.cache.delete(self.key(email, purpose))
+
+
+class DatabaseVerificationStore:
+  """
+  EmailVerification 테이블에 보관합니다. (email, purpose) 인덱스로 조회하고, 만료된 행은
+  purge_email_verifications 명령으로 지웁니다.
+  """
+
+  def rows(self, email, purpose):
+    from back.common.models import EmailVerification
+    return EmailVerification.objects.filter(email=email, purpose=purpose)
+
+  def get(self, email, purpose):
+    return (
+      self.rows(email, purpose)
+      .filter(expires_at__gt=timezone.now())
+      .order_by('-created_at')
+      .values('code', 'token', 'created_at')
+      .first()
+    )
+
+  def create(self, email, purpose, code):
+    from back.common.models import EmailVerification
+
+    with transaction.atomic():
+      self.rows(email, purpose).delete()
+      record = EmailVerification.objects.create(
+        email=email, purpose=purpose, code=code,
+        expires_at=timezone.now() + timedelta(seconds=VERIFICATION_RECORD_TTL)
+      )
+    return {'code': record.code, 'token': record.token, 'created_at': record.created_at}
+
+  def set_token(self, email, purpose, token):
+    self.rows(email, purpose).update(token=token, expires_at=timezone.now() + timedelta(seconds=VERIFICATION_RECORD_TTL))
+
+  def delete(self, email, purpose):
+    self.rows(email, purpose).delete()
+
+
+def verification_store():
+  """
+  EMAIL_VERIFICATION_STORE(기본 DatabaseVerificationStore)에 지정한 인증 기록 저장소
+  """
+  global _store
+  if _store is None:
+    _store = import_string(getattr(settings, 'EMAIL_VERIFICATION_STORE', 'back.common.verification.DatabaseVerificationStore'))()
+  return _store
+
+
+def purge_expired():
+  """
+  EmailVerification 테이블에서 만료된 행과 만료 시각이 없는 이전 행을 지우고 지운 수를 반환합니다.
+  """
+  from back.common.models import EmailVerification
+
+  now = timezone.now()
+  count, _ = EmailVerification.objects.filter(
+    Q(expires_at__lte=now)
+    | Q(expires_at__isnull=True, created_at__lt=now - timedelta(seconds=VERIFICATION_RECORD_TTL))
+  ).delete()
+  return count
@@ -2,11 +2,17 @@ from django.contrib import admin
 from back.place.models import (
   Category, RegionName,
   CategoryLog, RegionLog,
-  PlaceInfo, PlaceLog,
-  UserCategory, SavedPlace,
+  Place, PlaceInfo, PlaceLog,
+  UserCategory, SavedPlace, MapPlace,
   PlaceInfoChangeRequest,
   PlaceReviewByUser,
-  PlaceInfoReviewByUserReport
+  PlaceReviewTranslation,
+  PlaceInfoReviewByUserReport,
+  PlaceRating,
+  PlaceSearchTerm,
+  ReviewImageGCCheckpoint,
+  SavedPlaceSyncState,
+  SavedPlaceTombstone
 )
 
 @admin.register(Category)
@@ -39,6 +45,13 @@ class RegionLogAdmin(admin.ModelAdmin):
   ordering = ['-id']
 
 
+@admin.register(Place)
+class PlaceAdmin(admin.ModelAdmin):
+  list_display = [field.name for field in Place._meta.fields]
+  search_fields = ['name', 'address', 'provider_place_id']
+  ordering = ['-id']
+
+
 @admin.register(PlaceInfo)
 class PlaceInfoAdmin(admin.ModelAdmin):
   list_display = [field.name for field in PlaceInfo._meta.fields]
@@ -60,10 +73,17 @@ class UserCategoryAdmin(admin.ModelAdmin):
   search_fields = ['name']
   ordering = ['-id']
 
+@admin.register(MapPlace)
+class MapPlaceAdmin(admin.ModelAdmin):
+  list_display = [field.name for field in MapPlace._meta.fields]
+  search_fields = ['place_id', 'place_name', 'payload_hash']
+  ordering = ['-id']
+
 @admin.register(SavedPlace)
 class SavedPlaceAdmin(admin.ModelAdmin):
   list_display = [field.name for field in SavedPlace._meta.fields]
-  search_fields = ['place_name']
+  search_fields = ['place_id', 'map_place__place_name']
+  list_select_related = ['category', 'map_place']
   ordering = ['-id']
 
 @admin.register(PlaceInfoChangeRequest)
@@ -78,8 +98,45 @@ class PlaceReviewByUserAdmin(admin.ModelAdmin):
   search_fields = ['user__email', 'place_info__name']
   ordering = ['-id']
 
+@admin.register(PlaceReviewTranslation)
+class PlaceReviewTranslationAdmin(admin.ModelAdmin):
+  list_display = [field.name for field in PlaceReviewTranslation._meta.fields]
+  search_fields = ['text']
+  list_filter = ['language']
+  ordering = ['-id']
+
 @admin.register(PlaceInfoReviewByUserReport)
 class PlaceInfoReviewByUserReportAdmin(admin.ModelAdmin):
   list_display = [field.name for field in PlaceInfoReviewByUserReport._meta.fields]
   search_fields = ['place_review__place_info__name']
-  ordering = ['-id']
\ No newline at end of file
+  ordering = ['-id']
+
+@admin.register(PlaceRating)
+class PlaceRatingAdmin(admin.ModelAdmin):
+  list_display = [field.name for field in PlaceRating._meta.fields]
+  search_fields = ['place__name']
+  ordering = ['-id']
+
+@admin.register(PlaceSearchTerm)
+class PlaceSearchTermAdmin(admin.ModelAdmin):
+  list_display = [field.name for field in PlaceSearchTerm._meta.fields]
+  search_fields = ['term']
+  ordering = ['-id']
+
+@admin.register(ReviewImageGCCheckpoint)
+class ReviewImageGCCheckpointAdmin(admin.ModelAdmin):
+  list_display = [field.name for field in ReviewImageGCCheckpoint._meta.fields]
+  ordering = ['-id']
+
+@admin.register(SavedPlaceSyncState)
+class SavedPlaceSyncStateAdmin(admin.ModelAdmin):
+  list_display = [field.name for field in SavedPlaceSyncState._meta.fields]
+  search_fields = ['user__email']
+  ordering = ['-id']
+
+@admin.register(SavedPlaceTombstone)
+class SavedPlaceTombstoneAdmin(admin.ModelAdmin):
+  list_display = [field.name for field in SavedPlaceTombstone._meta.fields]
+  search_fields = ['user__email']
+  list_filter = ['kind']
+  ordering = ['-id']
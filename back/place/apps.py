@@ -1,6 +1,21 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save, pre_save
 
 
 class PlaceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'back.place'
+
+    def ready(self):
+        from back.place import geo, ratings, search, sync, translations
+        from back.place.models import PlaceInfo, PlaceReviewByUser, SavedPlace, UserCategory
+        pre_save.connect(geo.saved_place_pre_save, sender=SavedPlace, dispatch_uid='saved_place_coordinates')
+        post_save.connect(ratings.review_saved, sender=PlaceReviewByUser, dispatch_uid='place_rating_review_saved')
+        post_delete.connect(ratings.review_deleted, sender=PlaceReviewByUser, dispatch_uid='place_rating_review_deleted')
+        post_save.connect(search.place_info_saved, sender=PlaceInfo, dispatch_uid='place_search_place_info_saved')
+        post_save.connect(search.review_saved, sender=PlaceReviewByUser, dispatch_uid='place_search_review_saved')
+        post_save.connect(translations.review_text_changed, sender=PlaceReviewByUser, dispatch_uid='place_review_translation_invalidated')
+        pre_save.connect(sync.stamp_version, sender=UserCategory, dispatch_uid='user_category_sync_version')
+        pre_save.connect(sync.stamp_version, sender=SavedPlace, dispatch_uid='saved_place_sync_version')
+        post_delete.connect(sync.record_deletion, sender=UserCategory, dispatch_uid='user_category_sync_tombstone')
+        post_delete.connect(sync.record_deletion, sender=SavedPlace, dispatch_uid='saved_place_sync_tombstone')
@@ -0,0 +1,95 @@
+import asyncio
+import weakref
+
+from django.conf import settings
+
+DEEPL_URL = 'https://api-free.deepl.com/v2/translate'
+PERPLEXITY_URL = 'https://api.perplexity.ai'
+
+# 비동기 HTTP 클라이언트는 생성된 이벤트 루프에 묶이므로 루프별로 하나씩 만들어 재사용합니다.
+# ASGI에서는 프로세스 전체에서 하나, WSGI(runserver)에서는 요청마다 새 루프와 함께 만들어집니다.
+# httpx, openai import와 클라이언트 생성은 처음 사용할 때 이뤄지므로 워커 기동 시간에 포함되지 않고,
+# gunicorn --preload로 fork되기 전의 마스터 프로세스에 커넥션 풀이 만들어지지도 않습니다.
+_http_clients = weakref.WeakKeyDictionary()
+_openai_clients = weakref.WeakKeyDictionary()
+_deepl_semaphores = weakref.WeakKeyDictionary()
+
+# 이벤트 루프(ASGI에서는 워커 프로세스) 하나에서 동시에 보내는 DeepL 요청 수의 상한
+DEEPL_MAX_CONCURRENCY = getattr(settings, 'DEEPL_MAX_CONCURRENCY', 4)
+
+
+def get_http_client():
+  loop = asyncio.get_running_loop()
+  client = _http_clients.get(loop)
+  if client is None:
+    import httpx
+    client = _http_clients[loop] = httpx.AsyncClient(
+      timeout=getattr(settings, 'UPSTREAM_TIMEOUT', 60)
+    )
+  return client
+
+
+def get_openai_client():
+  loop = asyncio.get_running_loop()
+  client = _openai_clients.get(loop)
+  if client is None:
+    from openai import AsyncOpenAI
+    client = _openai_clients[loop] = AsyncOpenAI(
+      api_key=settings.OPENAI_API_KEY,
+      base_url=PERPLEXITY_URL,
+      http_client=get_http_client()
+    )
+  return client
+
+
+def get_deepl_semaphore():
+  loop = asyncio.get_running_loop()
+  semaphore = _deepl_semaphores.get(loop)
+  if semaphore is None:
+    semaphore = _deepl_semaphores[loop] = asyncio.Semaphore(DEEPL_MAX_CONCURRENCY)
+  return semaphore
+
+
+async def close_clients():
+  """
+  현재 이벤트 루프에 만든 클라이언트의 커넥션을 닫습니다. ASGI에서는 lifespan 종료 시(back.asgi),
+  WSGI에서는 요청의 이벤트 루프가 끝날 때(AsyncGraphQLView) 호출됩니다.
+  """
+  loop = asyncio.get_running_loop()
+  openai_client = _openai_clients.pop(loop, None)
+  http_client = _http_clients.pop(loop, None)
+  if openai_client is not None:
+    await openai_client.close()
+  if http_client is not None:
+    await http_client.aclose()
+
+
+async def deepl_translate_many(texts: list, source_lang: str, target_lang: str) -> list:
+  """
+  여러 문장을 한 번의 DeepL 요청으로 번역합니다. 결과는 입력과 같은 순서입니다.
+  source_lang이 None이면 DeepL이 원문 언어를 감지합니다. 동시에 DEEPL_MAX_CONCURRENCY개까지만 요청하고
+  나머지는 기다립니다.
+  """
+  if not texts:
+    return []
+
+  data = {
+    'text': list(texts),
+    'target_lang': target_lang,
+    'auth_key': settings.DEEPL_API_KEY,
+  }
+  if source_lang:
+    data['source_lang'] = source_lang
+
+  try:
+    async with get_deepl_semaphore():
+      res = await get_http_client().post(DEEPL_URL, data=data)
+    res.raise_for_status()
+    return [translation['text'] for translation in res.json()['translations']]
+  except Exception as e:
+    raise RuntimeError(f'DeepL translation failed: {str(e)}')
+
+
+async def deepl_translate(text: str, source_lang: str, target_lang: str) -> str:
+  translated = await deepl_translate_many([text], source_lang, target_lang)
+  return translated[0]
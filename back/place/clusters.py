@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.db.models import Avg, Count, Min
+from django.db.models.functions import Substr
+
+from back.place.geo import GEOHASH_PRECISION, cell_size, in_bounds
+from back.place.sync import current_version, saved_place_cache
+
+# 이 줌 이상에서는 묶지 않고 장소를 하나씩 반환합니다.
+SAVED_PLACE_CLUSTER_MAX_ZOOM = getattr(settings, 'SAVED_PLACE_CLUSTER_MAX_ZOOM', 17)
+# 화면에서 한 클러스터가 차지하는 대략적인 크기(px)
+CLUSTER_CELL_PIXELS = 64
+CLUSTER_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def precision_for_zoom(zoom):
+  """
+  웹 메르카토르 줌 레벨에서 셀 하나가 약 CLUSTER_CELL_PIXELS 크기가 되는 geohash 자릿수
+  """
+  target = 360 * CLUSTER_CELL_PIXELS / (256 * 2 ** max(zoom, 0))
+  precision = 1
+  for candidate in range(1, GEOHASH_PRECISION + 1):
+    if cell_size(candidate)[1] < target:
+      break
+    precision = candidate
+  return precision
+
+
+def cell_counts(user, precision):
+  """
+  사용자의 저장한 장소를 geohash 앞 precision자리로 묶은 (셀, 개수, 평균 위도, 평균 경도, 대표 id) 목록.
+  사용자별 동기화 버전을 키에 넣어 캐시하므로, 장소가 바뀌면 다음 조회에서 다시 집계합니다.
+  """
+  from back.place.models import SavedPlace
+
+  version, _ = current_version(user.id)
+  cache = saved_place_cache()
+  key = f'saved_place_clusters:{user.id}:{version}:{precision}'
+  cells = cache.get(key)
+  if cells is None:
+    cells = list(
+      SavedPlace.objects
+      .filter(category__user=user, geohash__isnull=False)
+      .annotate(cell=Substr('geohash', 1, precision))
+      .values('cell')
+      .annotate(
+        count=Count('id'),
+        latitude=Avg('latitude'),
+        longitude=Avg('longitude'),
+        representative_id=Min('id')
+      )
+      .values_list('cell', 'count', 'latitude', 'longitude', 'representative_id')
+    )
+    cache.set(key, cells, CLUSTER_CACHE_TIMEOUT)
+  return cells
+
+
+def clusters(user, min_lat, min_lng, max_lat, max_lng, zoom):
+  """
+  지도 영역 안의 클러스터 목록을 반환합니다. 한 곳만 있는 셀과 SAVED_PLACE_CLUSTER_MAX_ZOOM 이상의 줌에서는
+  place에 저장한 장소를 채웁니다.
+  """
+  from back.place.models import SavedPlace
+
+  if min_lat > max_lat or min_lng > max_lng:
+    raise Exception("Invalid bounds")
+
+  if zoom >= SAVED_PLACE_CLUSTER_MAX_ZOOM:
+    places = in_bounds(
+      SavedPlace.objects.filter(category__user=user).select_related('map_place'),
+      min_lat, min_lng, max_lat, max_lng
+    )
+    return [
+      {'geohash': place.geohash, 'count': 1, 'latitude': place.latitude, 'longitude': place.longitude,
+       'representative_id': place.id, 'place': place}
+      for place in places
+    ]
+
+  # 셀 크기만큼 영역을 넓혀 화면 가장자리에 걸친 클러스터도 포함합니다.
+  lat_step, lng_step = cell_size(precision_for_zoom(zoom))
+  result = [
+    {'geohash': cell, 'count': count, 'latitude': latitude, 'longitude': longitude,
+     'representative_id': representative_id, 'place': None}
+    for cell, count, latitude, longitude, representative_id in cell_counts(user, precision_for_zoom(zoom))
+    if min_lat - lat_step <= latitude <= max_lat + lat_step and min_lng - lng_step <= longitude <= max_lng + lng_step
+  ]
+
+  singles = [cluster['representative_id'] for cluster in result if cluster['count'] == 1]
+  if singles:
+    places = SavedPlace.objects.filter(id__in=singles).select_related('map_place').in_bulk()
+    for cluster in result:
+      if cluster['count'] == 1:
+        cluster['place'] = places.get(cluster['representative_id'])
+  return result
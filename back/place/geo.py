@@ -0,0 +1,192 @@
+import math
+
+from django.db.models import Q
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9  # 약 5m x 5m
+EARTH_RADIUS_M = 6371000
+METERS_PER_DEGREE = 111320
+# 영역 조회 시 만들 geohash 범위 조건의 최대 개수
+MAX_COVER_CELLS = 32
+
+
+def parse_coordinate(value, low, high):
+  try:
+    number = float(value)
+  except (TypeError, ValueError):
+    return None
+  if math.isnan(number) or not low <= number <= high:
+    return None
+  return number
+
+
+def encode(lat, lng, precision=GEOHASH_PRECISION):
+  lat_range = [-90.0, 90.0]
+  lng_range = [-180.0, 180.0]
+  chars = []
+  bits = 0
+  value = 0
+  even = True
+  while len(chars) < precision:
+    target, bounds = (lng, lng_range) if even else (lat, lat_range)
+    mid = (bounds[0] + bounds[1]) / 2
+    value <<= 1
+    if target >= mid:
+      value |= 1
+      bounds[0] = mid
+    else:
+      bounds[1] = mid
+    even = not even
+    bits += 1
+    if bits == 5:
+      chars.append(GEOHASH_ALPHABET[value])
+      bits = 0
+      value = 0
+  return ''.join(chars)
+
+
+def cell_size(precision):
+  """
+  precision 자리 geohash 셀의 (위도, 경도) 크기(도)
+  """
+  lng_bits = math.ceil(precision * 5 / 2)
+  lat_bits = precision * 5 // 2
+  return 180 / 2 ** lat_bits, 360 / 2 ** lng_bits
+
+
+def prefix_range(prefix):
+  """
+  prefix로 시작하는 geohash의 [시작, 끝) 문자열 범위. LIKE 대신 범위 비교를 쓰면 DB의 collation과 관계없이
+  B-tree 인덱스를 사용할 수 있습니다.
+  """
+  chars = list(prefix)
+  while chars:
+    index = GEOHASH_ALPHABET.index(chars[-1])
+    if index + 1 < len(GEOHASH_ALPHABET):
+      chars[-1] = GEOHASH_ALPHABET[index + 1]
+      return prefix, ''.join(chars)
+    chars.pop()
+  return prefix, None
+
+
+def cells_covering(min_lat, min_lng, max_lat, max_lng, precision):
+  lat_step, lng_step = cell_size(precision)
+  cells = set()
+  lat = min_lat
+  while True:
+    lng = min_lng
+    while True:
+      cells.add(encode(min(lat, max_lat), min(lng, max_lng), precision))
+      if lng >= max_lng:
+        break
+      lng += lng_step
+    if lat >= max_lat:
+      break
+    lat += lat_step
+  return cells
+
+
+def cover(min_lat, min_lng, max_lat, max_lng, max_cells=MAX_COVER_CELLS):
+  """
+  영역을 덮는 geohash prefix 목록. 셀 수가 max_cells를 넘지 않는 가장 작은(정밀한) 셀을 고릅니다.
+  """
+  for precision in range(GEOHASH_PRECISION, 0, -1):
+    lat_step, lng_step = cell_size(precision)
+    estimate = (math.floor((max_lat - min_lat) / lat_step) + 2) * (math.floor((max_lng - min_lng) / lng_step) + 2)
+    if estimate <= max_cells * 4:
+      cells = cells_covering(min_lat, min_lng, max_lat, max_lng, precision)
+      if len(cells) <= max_cells:
+        return sorted(cells)
+  return ['']
+
+
+def distance_m(lat1, lng1, lat2, lng2):
+  lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+  a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+  return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def neighborhood(lat, lng, precision):
+  """
+  점이 속한 셀과 주변 8개 셀, 그리고 이 9개 셀 안에서 거리 순서가 보장되는 반경(m)
+  """
+  lat_step, lng_step = cell_size(precision)
+  cells = {
+    encode(max(-90, min(90, lat + dlat * lat_step)), (lng + dlng * lng_step + 180) % 360 - 180, precision)
+    for dlat in (-1, 0, 1) for dlng in (-1, 0, 1)
+  }
+  radius = min(lat_step * METERS_PER_DEGREE, lng_step * METERS_PER_DEGREE * math.cos(math.radians(lat)))
+  return cells, radius
+
+
+def apply_coordinates(saved_place):
+  """
+  문자열 좌표(lat/lng, 없으면 카카오맵의 y/x)로 숫자 좌표와 geohash를 채웁니다.
+  """
+  lat = parse_coordinate(saved_place.lat or saved_place.y, -90, 90)
+  lng = parse_coordinate(saved_place.lng or saved_place.x, -180, 180)
+  if lat is None or lng is None:
+    saved_place.latitude = saved_place.longitude = saved_place.geohash = None
+  else:
+    saved_place.latitude = lat
+    saved_place.longitude = lng
+    saved_place.geohash = encode(lat, lng)
+  return saved_place
+
+
+def saved_place_pre_save(sender, instance, raw=False, **kwargs):
+  if not raw:
+    apply_coordinates(instance)
+
+
+def prefix_condition(prefixes, field):
+  condition = Q()
+  for prefix in prefixes:
+    start, end = prefix_range(prefix)
+    if end:
+      condition |= Q(**{f'{field}__gte': start, f'{field}__lt': end})
+    else:
+      condition |= Q(**{f'{field}__gte': start})
+  return condition
+
+
+def in_bounds(queryset, min_lat, min_lng, max_lat, max_lng):
+  """
+  영역을 덮는 geohash 범위 조건으로 인덱스를 타고 후보를 고른 뒤, 숫자 좌표로 영역 밖의 후보를 걸러냅니다.
+  """
+  if min_lat > max_lat or min_lng > max_lng:
+    raise Exception("Invalid bounds")
+
+  return queryset.filter(
+    prefix_condition(cover(min_lat, min_lng, max_lat, max_lng), 'geohash'),
+    latitude__gte=min_lat, latitude__lte=max_lat,
+    longitude__gte=min_lng, longitude__lte=max_lng
+  )
+
+
+def nearest(queryset, lat, lng, k):
+  """
+  점에서 가까운 k개를 거리(m)와 함께 반환합니다. 작은 셀의 주변 9칸에서 시작해, k번째 후보까지의 거리가
+  순서가 보장되는 반경 안에 들어올 때까지 셀을 넓혀 가며 조회합니다.
+  """
+  candidates = []
+  for precision in range(7, 0, -1):
+    cells, radius = neighborhood(lat, lng, precision)
+    candidates = sorted(
+      (
+        (distance_m(lat, lng, place.latitude, place.longitude), place)
+        for place in queryset.filter(prefix_condition(cells, 'geohash'))
+      ),
+      key=lambda candidate: candidate[0]
+    )
+    if len(candidates) >= k and candidates[k - 1][0] <= radius:
+      return candidates[:k]
+
+  candidates = sorted(
+    (
+      (distance_m(lat, lng, place.latitude, place.longitude), place)
+      for place in queryset.filter(geohash__isnull=False)
+    ),
+    key=lambda candidate: candidate[0]
+  )
+  return candidates[:k]
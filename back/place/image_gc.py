@@ -0,0 +1,181 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from back.common.profiling import record_timing
+from back.place.images import REVIEW_IMAGE_VARIANTS, key_from_url, stripped_key, variant_key
+from back.place.storage import REVIEW_IMAGE_ROOT, get_s3_client
+
+logger = logging.getLogger(__name__)
+
+# DeleteObjects 한 번에 지울 수 있는 최대 키 수 (S3 제한)
+S3_DELETE_MAX_KEYS = 1000
+# 업로드 직후 아직 리뷰에 연결되지 않은 객체를 지우지 않도록 이 시간보다 오래된 객체만 정리합니다.
+REVIEW_IMAGE_GC_GRACE_HOURS = getattr(settings, 'REVIEW_IMAGE_GC_GRACE_HOURS', 24)
+
+
+class RateLimiter:
+  """
+  S3 요청 사이의 최소 간격을 지켜 초당 요청 수를 제한합니다.
+  """
+
+  def __init__(self, requests_per_second):
+    self.interval = 1 / requests_per_second if requests_per_second else 0
+    self.last = None
+
+  def wait(self):
+    if self.interval and self.last is not None:
+      remaining = self.interval - (time.monotonic() - self.last)
+      if remaining > 0:
+        time.sleep(remaining)
+    self.last = time.monotonic()
+
+
+def owner_of(key):
+  """
+  reviews/{place_info_id}/{user_id}/파일 형식의 키에서 (place_info_id, user_id)를 꺼냅니다. 형식이 다르면 None.
+  """
+  if not key.startswith(REVIEW_IMAGE_ROOT):
+    return None
+  parts = key[len(REVIEW_IMAGE_ROOT):].split('/')
+  if len(parts) != 3 or not parts[2] or not parts[0].isdigit() or not parts[1].isdigit():
+    return None
+  return int(parts[0]), int(parts[1])
+
+
+def referenced_keys(owners):
+  """
+  주어진 (place_info_id, user_id) 경로에 속한 리뷰들이 참조하는 키 집합. 처리된 이미지는 기록된 변형만 남기고,
+  아직 처리되지 않은 이미지는 업로드 원본과 image_variants에 기록되기 전일 수 있는 변형 키까지 포함합니다.
+  """
+  from back.place.models import PlaceReviewByUser
+
+  if not owners:
+    return set()
+
+  # 중복 PlaceInfo가 병합되면 리뷰의 place_info_id가 이미지 경로와 달라질 수 있으므로 사용자 기준으로만 찾습니다.
+  reviews = (
+    PlaceReviewByUser.objects
+    .filter(user_id__in={user_id for _, user_id in owners})
+    .values_list('images', 'image_variants')
+  )
+
+  keys = set()
+  for images, image_variants in reviews:
+    image_variants = image_variants or {}
+    for url in images or []:
+      key = key_from_url(url)
+      if key and url not in image_variants:
+        keys.add(key)
+        keys.add(stripped_key(key))
+        keys.update(variant_key(key, name) for name in ('original', *REVIEW_IMAGE_VARIANTS))
+    for variants in image_variants.values():
+      for url in (variants or {}).values():
+        key = key_from_url(url)
+        if key:
+          keys.add(key)
+  return keys
+
+
+def find_orphans(objects, cutoff):
+  """
+  S3 목록 한 페이지에서 어떤 리뷰도 참조하지 않고 cutoff보다 오래된 키를 고릅니다.
+  경로 형식을 알 수 없는 키는 지우지 않습니다.
+  """
+  candidates = []
+  owners = set()
+  for obj in objects:
+    owner = owner_of(obj['Key'])
+    if owner is None or obj['LastModified'] > cutoff:
+      continue
+    candidates.append(obj['Key'])
+    owners.add(owner)
+
+  keep = referenced_keys(owners)
+  return [key for key in candidates if key not in keep]
+
+
+def delete_keys(keys, limiter=None):
+  """
+  DeleteObjects로 최대 1000개씩 묶어 삭제하고 (삭제된 수, 실패 목록)을 반환합니다.
+  """
+  client = get_s3_client()
+  deleted = 0
+  errors = []
+  for start in range(0, len(keys), S3_DELETE_MAX_KEYS):
+    batch = keys[start:start + S3_DELETE_MAX_KEYS]
+    if limiter:
+      limiter.wait()
+    with record_timing('s3.delete_objects'):
+      response = client.delete_objects(
+        Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+        Delete={'Objects': [{'Key': key} for key in batch], 'Quiet': True}
+      )
+    batch_errors = response.get('Errors', [])
+    errors.extend(batch_errors)
+    deleted += len(batch) - len(batch_errors)
+  return deleted, errors
+
+
+def collect_review_images(checkpoint, page_size=S3_DELETE_MAX_KEYS, requests_per_second=None,
+                          grace_hours=REVIEW_IMAGE_GC_GRACE_HOURS, max_pages=None, dry_run=False,
+                          on_page=None):
+  """
+  reviews/ 아래 객체를 키 순서대로 훑으며 고아 객체를 삭제합니다. 페이지마다 checkpoint에 진행 위치를 저장하므로
+  중단되더라도 다음 실행에서 이어서 진행합니다. 끝까지 훑으면 checkpoint를 처음으로 되돌리고 True를 반환합니다.
+  dry_run이면 삭제하지 않고 진행 위치도 저장하지 않습니다.
+  """
+  client = get_s3_client()
+  limiter = RateLimiter(requests_per_second)
+  cutoff = timezone.now() - timedelta(hours=grace_hours)
+  start_after = checkpoint.last_key
+  pages = 0
+
+  if not start_after:
+    checkpoint.started_at = timezone.now()
+    checkpoint.finished_at = None
+    checkpoint.scanned_count = 0
+    checkpoint.deleted_count = 0
+
+  while True:
+    params = {
+      'Bucket': settings.AWS_STORAGE_BUCKET_NAME,
+      'Prefix': REVIEW_IMAGE_ROOT,
+      'MaxKeys': min(page_size, S3_DELETE_MAX_KEYS),
+    }
+    if start_after:
+      params['StartAfter'] = start_after
+
+    limiter.wait()
+    with record_timing('s3.list_objects'):
+      response = client.list_objects_v2(**params)
+    objects = response.get('Contents', [])
+
+    orphans = find_orphans(objects, cutoff)
+    deleted, errors = (0, []) if dry_run else delete_keys(orphans, limiter)
+    for error in errors:
+      logger.warning('Failed to delete %s: %s', error.get('Key'), error.get('Message'))
+
+    if objects:
+      start_after = objects[-1]['Key']
+    finished = not response.get('IsTruncated')
+    pages += 1
+
+    if on_page:
+      on_page(len(objects), orphans, deleted)
+
+    if not dry_run:
+      checkpoint.scanned_count += len(objects)
+      checkpoint.deleted_count += deleted
+      checkpoint.last_key = '' if finished else start_after
+      if finished:
+        checkpoint.finished_at = timezone.now()
+      checkpoint.save()
+
+    if finished:
+      return True
+    if max_pages and pages >= max_pages:
+      return False
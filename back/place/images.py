@@ -0,0 +1,200 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from back.common.profiling import record_timing
+from back.place.storage import get_s3_client, review_image_url
+
+logger = logging.getLogger(__name__)
+
+# 변형 이름 -> 긴 변의 최대 픽셀
+REVIEW_IMAGE_VARIANTS = getattr(settings, 'REVIEW_IMAGE_VARIANTS', {'thumbnail': 320, 'medium': 1080})
+REVIEW_IMAGE_VARIANT_FORMAT = getattr(settings, 'REVIEW_IMAGE_VARIANT_FORMAT', 'WEBP')
+REVIEW_IMAGE_VARIANT_QUALITY = getattr(settings, 'REVIEW_IMAGE_VARIANT_QUALITY', 80)
+REVIEW_IMAGE_WORKERS = getattr(settings, 'REVIEW_IMAGE_WORKERS', 2)
+
+VARIANT_FORMATS = {
+  'WEBP': ('webp', 'image/webp'),
+  'JPEG': ('jpeg', 'image/jpeg'),
+}
+ORIGINAL_FORMATS = {
+  'JPEG': 'image/jpeg',
+  'PNG': 'image/png',
+  'WEBP': 'image/webp',
+}
+
+_image_executor = None
+_lock = threading.Lock()
+
+
+def key_from_url(url):
+  prefix = f"https://{settings.AWS_S3_CUSTOM_DOMAIN}/"
+  if not url or not url.startswith(prefix):
+    return None
+  return url[len(prefix):]
+
+
+def variant_key(key, name):
+  ext, _ = VARIANT_FORMATS[REVIEW_IMAGE_VARIANT_FORMAT]
+  base = key.rsplit('.', 1)[0]
+  return f"{base}_{name}.{ext}"
+
+
+def stripped_key(key):
+  """
+  EXIF를 제거한 원본을 저장하는 키. 업로드된 원본은 immutable로 캐시되므로 같은 키에 덮어쓰지 않습니다.
+  """
+  base, dot, ext = key.rpartition('.')
+  return f"{base}_original.{ext}" if dot else f"{key}_original"
+
+
+def encode(image, image_format, quality):
+  buffer = BytesIO()
+  if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+    image = image.convert('RGB')
+  # exif를 넘기지 않으므로 저장된 파일에는 EXIF(위치 정보 등)가 남지 않습니다.
+  image.save(buffer, format=image_format, quality=quality, optimize=True)
+  buffer.seek(0)
+  return buffer
+
+
+def put_object(key, body, content_type):
+  with record_timing('s3.upload'):
+    get_s3_client().put_object(
+      Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+      Key=key,
+      Body=body,
+      ContentType=content_type,
+      CacheControl='public, max-age=31536000, immutable'
+    )
+
+
+def generate_variants(key):
+  """
+  S3의 원본 이미지로 크기별 변형을 만들어 업로드하고 {변형 이름: URL}을 반환합니다.
+  EXIF를 제거한 원본은 stripped_key에 저장해 'original' 변형으로 기록합니다. (방향 정보는 픽셀에 먼저 반영)
+  원본 형식으로 다시 저장할 수 없는 이미지는 변형 형식으로 바꿔 저장하므로 'original'은 항상 기록됩니다.
+  """
+  from PIL import Image, ImageOps
+
+  with record_timing('s3.get_object'):
+    original = get_s3_client().get_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=key)['Body'].read()
+
+  image = Image.open(BytesIO(original))
+  original_format = image.format
+  image = ImageOps.exif_transpose(image)
+
+  variants = {}
+  variant_format = REVIEW_IMAGE_VARIANT_FORMAT
+  _, content_type = VARIANT_FORMATS[variant_format]
+  if original_format in ORIGINAL_FORMATS:
+    key_for_original = stripped_key(key)
+    put_object(key_for_original, encode(image, original_format, 90), ORIGINAL_FORMATS[original_format])
+  else:
+    key_for_original = variant_key(key, 'original')
+    put_object(key_for_original, encode(image, variant_format, 90), content_type)
+  variants['original'] = review_image_url(key_for_original)
+
+  for name, max_size in REVIEW_IMAGE_VARIANTS.items():
+    resized = image.copy()
+    resized.thumbnail((max_size, max_size))
+    key_for_variant = variant_key(key, name)
+    put_object(key_for_variant, encode(resized, variant_format, REVIEW_IMAGE_VARIANT_QUALITY), content_type)
+    variants[name] = review_image_url(key_for_variant)
+
+  return variants
+
+
+def process_review_images(review_id):
+  """
+  리뷰의 이미지 중 아직 변형이 없는 이미지를 처리하고 image_variants에 기록합니다.
+  기록한 뒤에는 EXIF가 남아 있는 업로드 원본을 S3에서 지웁니다.
+  이미 처리된 이미지는 건너뛰므로 여러 번 실행해도 안전합니다. 처리한 이미지 수를 반환합니다.
+  """
+  from back.place.models import PlaceReviewByUser
+
+  review = PlaceReviewByUser.objects.filter(id=review_id).only('images', 'image_variants').first()
+  if review is None or not review.images:
+    return 0
+
+  image_variants = dict(review.image_variants or {})
+  processed = 0
+  changed = False
+  uploaded_keys = []
+  for url in review.images:
+    if url in image_variants:
+      continue
+    key = key_from_url(url)
+    if key is None:
+      continue
+    try:
+      image_variants[url] = generate_variants(key)
+      uploaded_keys.append(key)
+      processed += 1
+      changed = True
+    except Exception as e:
+      logger.exception('Failed to generate variants for %s', key)
+      if is_permanent_failure(e):
+        # 원본이 없거나 이미지가 아니면 다시 시도하지 않도록 표시합니다. 이 이미지는 응답에서 빠지고 GC가 지웁니다.
+        image_variants[url] = {}
+        changed = True
+
+  if changed:
+    PlaceReviewByUser.objects.filter(id=review_id).update(image_variants=image_variants)
+  if uploaded_keys:
+    delete_uploaded_originals(uploaded_keys)
+  return processed
+
+
+def delete_uploaded_originals(keys):
+  # 실패해도 변형은 이미 기록되었으므로, 남은 원본은 더 이상 참조되지 않아 이미지 GC가 지웁니다.
+  try:
+    with record_timing('s3.delete_objects'):
+      get_s3_client().delete_objects(
+        Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+        Delete={'Objects': [{'Key': key} for key in keys], 'Quiet': True}
+      )
+  except Exception:
+    logger.exception('Failed to delete uploaded originals %s', keys)
+
+
+def is_permanent_failure(error):
+  from botocore.exceptions import ClientError
+  from PIL import UnidentifiedImageError
+
+  if isinstance(error, UnidentifiedImageError):
+    return True
+  if isinstance(error, ClientError):
+    return error.response.get('Error', {}).get('Code') in ('NoSuchKey', '404')
+  return False
+
+
+def get_image_executor():
+  global _image_executor
+  if _image_executor is None:
+    with _lock:
+      if _image_executor is None:
+        _image_executor = ThreadPoolExecutor(max_workers=REVIEW_IMAGE_WORKERS, thread_name_prefix='review-images')
+  return _image_executor
+
+
+def _run_in_background(review_id):
+  close_old_connections()
+  try:
+    process_review_images(review_id)
+  except Exception:
+    logger.exception('Failed to process images for review %s', review_id)
+  finally:
+    close_old_connections()
+
+
+def schedule_review_image_processing(review_id):
+  """
+  요청 처리와 별개로 백그라운드 스레드에서 이미지 변형을 만듭니다.
+  워커가 재시작되어 놓친 리뷰는 process_review_images 명령으로 처리합니다.
+  """
+  get_image_executor().submit(_run_in_background, review_id)
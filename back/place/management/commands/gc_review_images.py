@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from back.place.image_gc import REVIEW_IMAGE_GC_GRACE_HOURS, S3_DELETE_MAX_KEYS, collect_review_images
+from back.place.models import ReviewImageGCCheckpoint
+
+
+class Command(BaseCommand):
+  help = 'Deletes review images in S3 that are no longer referenced by any review.'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--dry-run', action='store_true', help='Only report orphaned keys.')
+    parser.add_argument('--reset', action='store_true', help='Start from the beginning instead of the saved checkpoint.')
+    parser.add_argument('--page-size', type=int, default=S3_DELETE_MAX_KEYS, help='Keys to list per request (max 1000).')
+    parser.add_argument('--rate', type=float, default=5, help='Maximum S3 requests per second (0 for unlimited).')
+    parser.add_argument('--max-pages', type=int, default=None, help='Stop after this many pages; the next run resumes.')
+    parser.add_argument('--grace-hours', type=float, default=REVIEW_IMAGE_GC_GRACE_HOURS,
+                        help='Never delete objects newer than this.')
+
+  def handle(self, *args, **options):
+    checkpoint, _ = ReviewImageGCCheckpoint.objects.get_or_create(id=1)
+    if options['reset']:
+      checkpoint.last_key = ''
+      checkpoint.started_at = None
+    if checkpoint.last_key:
+      self.stdout.write(f'Resuming after {checkpoint.last_key}')
+
+    def on_page(scanned, orphans, deleted):
+      for key in orphans if options['dry_run'] else []:
+        self.stdout.write(f'  orphan {key}')
+      self.stdout.write(f'Scanned {scanned} key(s), {len(orphans)} orphaned, {deleted} deleted')
+
+    finished = collect_review_images(
+      checkpoint,
+      page_size=options['page_size'],
+      requests_per_second=options['rate'] or None,
+      grace_hours=options['grace_hours'],
+      max_pages=options['max_pages'],
+      dry_run=options['dry_run'],
+      on_page=on_page
+    )
+    if finished:
+      self.stdout.write(self.style.SUCCESS('Finished scanning reviews/'))
+    elif options['dry_run']:
+      self.stdout.write('Stopped (dry run, checkpoint unchanged)')
+    else:
+      self.stdout.write(f'Stopped; next run resumes after {checkpoint.last_key}')
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from back.place.images import process_review_images
+from back.place.models import PlaceReviewByUser
+
+
+class Command(BaseCommand):
+  help = 'Generates thumbnail/medium variants for review images that do not have them yet.'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--limit', type=int, default=None, help='Maximum number of reviews to process per pass.')
+    parser.add_argument('--loop', action='store_true', help='Keep running and poll for new reviews.')
+    parser.add_argument('--interval', type=float, default=30, help='Seconds between passes with --loop.')
+
+  def handle(self, *args, **options):
+    while True:
+      processed = self.run_pass(options['limit'])
+      self.stdout.write(f'Processed {processed} image(s)')
+      if not options['loop']:
+        break
+      time.sleep(options['interval'])
+
+  def run_pass(self, limit):
+    processed = 0
+    checked = 0
+    reviews = (
+      PlaceReviewByUser.objects
+      .filter(images__isnull=False)
+      .only('id', 'images', 'image_variants')
+      .order_by('-id')
+      .iterator()
+    )
+    for review in reviews:
+      variants = review.image_variants or {}
+      if all(url in variants for url in review.images or []):
+        continue
+      processed += process_review_images(review.id)
+      checked += 1
+      if limit and checked >= limit:
+        break
+    return processed
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from back.place.places import prune_map_places
+
+
+class Command(BaseCommand):
+  help = 'Deletes MapPlace rows that no saved place points to anymore.'
+
+  def handle(self, *args, **options):
+    count = prune_map_places()
+    self.stdout.write(self.style.SUCCESS(f'Deleted {count} map place(s)'))
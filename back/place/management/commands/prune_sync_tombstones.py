@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from back.place.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+  help = 'Deletes saved place sync tombstones older than SAVED_PLACE_TOMBSTONE_DAYS.'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--days', type=int, default=None, help='Retention in days (defaults to SAVED_PLACE_TOMBSTONE_DAYS)')
+
+  def handle(self, *args, **options):
+    count = prune_tombstones(options['days'])
+    self.stdout.write(self.style.SUCCESS(f'Deleted {count} tombstone(s)'))
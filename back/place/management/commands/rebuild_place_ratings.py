@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from back.place.ratings import rebuild_place_ratings
+
+
+class Command(BaseCommand):
+  help = 'Recomputes per-place rating aggregates from all reviews.'
+
+  def handle(self, *args, **options):
+    updated, removed = rebuild_place_ratings()
+    self.stdout.write(self.style.SUCCESS(f'Rebuilt {updated} place rating(s), removed {removed} stale row(s)'))
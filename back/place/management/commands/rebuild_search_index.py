@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from back.place.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+  help = 'Rebuilds the place search index from all place infos and reviews.'
+
+  def handle(self, *args, **options):
+    count = rebuild_search_index()
+    self.stdout.write(self.style.SUCCESS(f'Indexed {count} document(s)'))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 13:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0009_placereviewbyuser_placeinforeviewbyuserreport'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='placereviewbyuser',
+            name='image_variants',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-19 13:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0010_placereviewbyuser_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewImageGCCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_key', models.CharField(blank=True, default='', max_length=1024)),
+                ('scanned_count', models.IntegerField(default=0)),
+                ('deleted_count', models.IntegerField(default=0)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2 on 2026-10-19 13:12
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Q, Sum
+
+
+def backfill_ratings(apps, schema_editor):
+    PlaceRating = apps.get_model('place', 'PlaceRating')
+    PlaceReviewByUser = apps.get_model('place', 'PlaceReviewByUser')
+
+    rows = (
+        PlaceReviewByUser.objects
+        .values('place_info__name')
+        .annotate(
+            review_count=Count('id'),
+            rating_total=Sum('rating'),
+            latest=Max('created_at'),
+            **{f'rating_{r}': Count('id', filter=Q(rating=r)) for r in range(1, 6)}
+        )
+    )
+    PlaceRating.objects.bulk_create([
+        PlaceRating(
+            name=row['place_info__name'],
+            count=row['review_count'],
+            total=row['rating_total'] or 0,
+            latest_review_at=row['latest'],
+            **{f'rating_{r}': row[f'rating_{r}'] for r in range(1, 6)}
+        )
+        for row in rows
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0011_reviewimagegccheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlaceRating',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('count', models.IntegerField(default=0)),
+                ('total', models.IntegerField(default=0)),
+                ('rating_1', models.IntegerField(default=0)),
+                ('rating_2', models.IntegerField(default=0)),
+                ('rating_3', models.IntegerField(default=0)),
+                ('rating_4', models.IntegerField(default=0)),
+                ('rating_5', models.IntegerField(default=0)),
+                ('latest_review_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
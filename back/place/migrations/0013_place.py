@@ -0,0 +1,138 @@
+import hashlib
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Q, Sum
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def lookup_key(name, address):
+    normalize = lambda value: WHITESPACE_RE.sub(' ', value or '').strip().casefold()
+    return hashlib.sha256(f"{normalize(name)}\n{normalize(address)}".encode('utf-8')).hexdigest()
+
+
+def backfill_places(apps, schema_editor):
+    Place = apps.get_model('place', 'Place')
+    PlaceInfo = apps.get_model('place', 'PlaceInfo')
+    PlaceReviewByUser = apps.get_model('place', 'PlaceReviewByUser')
+    SavedPlace = apps.get_model('place', 'SavedPlace')
+
+    PlaceInfoChangeRequest = apps.get_model('place', 'PlaceInfoChangeRequest')
+
+    # 공백이나 대소문자만 다른 PlaceInfo는 같은 장소가 됩니다. 같은 장소에 같은 언어의 PlaceInfo가 이미 있으면
+    # (place, language) 유일 제약을 지킬 수 있도록 먼저 만들어진 행으로 합칩니다.
+    places = {}
+    kept_infos = {}
+    for place_info in PlaceInfo.objects.order_by('id').iterator():
+        key = lookup_key(place_info.name, place_info.address)
+        if key not in places:
+            places[key] = Place.objects.create(name=place_info.name, address=place_info.address, lookup_key=key)
+        kept_id = kept_infos.get((key, place_info.language)) if place_info.language is not None else None
+        if kept_id is None:
+            kept_infos[(key, place_info.language)] = place_info.id
+            PlaceInfo.objects.filter(id=place_info.id).update(place=places[key])
+        else:
+            PlaceReviewByUser.objects.filter(place_info_id=place_info.id).update(place_info_id=kept_id)
+            PlaceInfoChangeRequest.objects.filter(place_info_id=place_info.id).update(place_info_id=kept_id)
+            PlaceInfo.objects.filter(id=place_info.id).delete()
+
+    # 리뷰는 작성한 PlaceInfo의 장소를 따릅니다.
+    for place_info_id, place_id in PlaceInfo.objects.values_list('id', 'place_id'):
+        PlaceReviewByUser.objects.filter(place_info_id=place_info_id).update(place_id=place_id)
+
+    # 저장한 장소의 카카오맵 id로 장소 제공자 id를 채웁니다.
+    saved_places = SavedPlace.objects.values_list('place_id', 'place_name', 'road_address_name', 'address_name')
+    for provider_place_id, place_name, road_address_name, address_name in saved_places.iterator():
+        for address in (road_address_name, address_name):
+            place = places.get(lookup_key(place_name, address))
+            if place is not None and place.provider_place_id is None:
+                if not Place.objects.filter(provider_place_id=provider_place_id).exists():
+                    place.provider_place_id = provider_place_id
+                    place.save(update_fields=['provider_place_id'])
+                break
+
+
+def backfill_ratings(apps, schema_editor):
+    PlaceRating = apps.get_model('place', 'PlaceRating')
+    PlaceReviewByUser = apps.get_model('place', 'PlaceReviewByUser')
+
+    rows = (
+        PlaceReviewByUser.objects
+        .filter(place__isnull=False)
+        .values('place')
+        .annotate(
+            review_count=Count('id'),
+            rating_total=Sum('rating'),
+            latest=Max('created_at'),
+            **{f'rating_{r}': Count('id', filter=Q(rating=r)) for r in range(1, 6)}
+        )
+    )
+    PlaceRating.objects.bulk_create([
+        PlaceRating(
+            place_id=row['place'],
+            count=row['review_count'],
+            total=row['rating_total'] or 0,
+            latest_review_at=row['latest'],
+            **{f'rating_{r}': row[f'rating_{r}'] for r in range(1, 6)}
+        )
+        for row in rows
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0012_placerating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Place',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider_place_id', models.CharField(blank=True, max_length=100, null=True, unique=True)),
+                ('name', models.CharField(max_length=255)),
+                ('address', models.CharField(blank=True, max_length=255, null=True)),
+                ('lookup_key', models.CharField(max_length=64, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='placeinfo',
+            name='place',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='placeInfos', to='place.place'),
+        ),
+        migrations.AddField(
+            model_name='placereviewbyuser',
+            name='place',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='placeReviews', to='place.place'),
+        ),
+        migrations.RunPython(backfill_places, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='placeinfo',
+            unique_together={('place', 'language')},
+        ),
+        # 이름별 집계를 장소별 집계로 바꿉니다.
+        migrations.DeleteModel(
+            name='PlaceRating',
+        ),
+        migrations.CreateModel(
+            name='PlaceRating',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.IntegerField(default=0)),
+                ('total', models.IntegerField(default=0)),
+                ('rating_1', models.IntegerField(default=0)),
+                ('rating_2', models.IntegerField(default=0)),
+                ('rating_3', models.IntegerField(default=0)),
+                ('rating_4', models.IntegerField(default=0)),
+                ('rating_5', models.IntegerField(default=0)),
+                ('latest_review_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('place', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='rating', to='place.place')),
+            ],
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
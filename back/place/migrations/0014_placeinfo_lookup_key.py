@@ -0,0 +1,154 @@
+import hashlib
+import re
+import unicodedata
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Q, Sum
+
+# 이 마이그레이션을 만들 때의 back.place.places 정규화 함수들. 이후 규칙이 바뀌어도 결과가 같도록 복사해 둡니다.
+IGNORED_CHARS_RE = re.compile(r'[\s\-_·・.,()\[\]{}（）]+')
+
+LANGUAGE_ALIASES = {
+    'EN': ('EN', 'English', '영어'),
+    'KO': ('KO', 'KR', '한국어'),
+    'JA': ('JA', 'JP', '日本語', '일본어'),
+    'ZH-CN': ('ZH-CN', '中文（简体）', '중국어(간체)'),
+    'ZH-TW': ('ZH-TW', '中文（繁體）', '중국어(번체)'),
+    'ES': ('ES', 'Español', '스페인어'),
+    'FR': ('FR', 'Français', '프랑스어'),
+    'DE': ('DE', 'Deutsch', '독일어'),
+}
+
+
+def normalize_text(value):
+    value = unicodedata.normalize('NFKC', value or '').casefold()
+    return IGNORED_CHARS_RE.sub('', value)
+
+
+LANGUAGE_CODES = {
+    normalize_text(alias): code
+    for code, aliases in LANGUAGE_ALIASES.items()
+    for alias in aliases
+}
+
+
+def canonical_language(language):
+    code = LANGUAGE_CODES.get(normalize_text(language))
+    if code is not None:
+        return code
+    return unicodedata.normalize('NFKC', language or '').strip()
+
+
+def digest(*parts):
+    return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+
+def place_lookup_key(name, address=None):
+    return digest(normalize_text(name), normalize_text(address))
+
+
+def place_info_lookup_key(name, address=None, language=None):
+    return digest(normalize_text(name), normalize_text(address), canonical_language(language))
+
+
+def merge_duplicates(apps, schema_editor):
+    Place = apps.get_model('place', 'Place')
+    PlaceInfo = apps.get_model('place', 'PlaceInfo')
+    PlaceReviewByUser = apps.get_model('place', 'PlaceReviewByUser')
+    PlaceInfoChangeRequest = apps.get_model('place', 'PlaceInfoChangeRequest')
+    PlaceRating = apps.get_model('place', 'PlaceRating')
+
+    # 1. 새 정규화 기준으로 같은 장소가 된 Place들을 가장 먼저 만들어진 Place로 합칩니다.
+    groups = defaultdict(list)
+    for place in Place.objects.order_by('id'):
+        groups[place_lookup_key(place.name, place.address)].append(place)
+
+    for key, places in groups.items():
+        kept, duplicates = places[0], places[1:]
+        for duplicate in duplicates:
+            PlaceInfo.objects.filter(place=duplicate).update(place=kept)
+            PlaceReviewByUser.objects.filter(place=duplicate).update(place=kept)
+            provider_place_id = duplicate.provider_place_id
+            duplicate.delete()
+            if provider_place_id and not kept.provider_place_id:
+                kept.provider_place_id = provider_place_id
+                kept.save(update_fields=['provider_place_id'])
+
+    for key, places in groups.items():
+        Place.objects.filter(id=places[0].id).update(lookup_key=key)
+
+    # 2. 같은 장소, 같은 언어 코드의 PlaceInfo를 가장 먼저 만들어진 행으로 합칩니다.
+    infos = defaultdict(list)
+    for place_info in PlaceInfo.objects.order_by('id'):
+        infos[(place_info.place_id, canonical_language(place_info.language))].append(place_info)
+
+    for (place_id, language), place_infos in infos.items():
+        if place_id is None:
+            continue
+        kept, duplicates = place_infos[0], place_infos[1:]
+        for duplicate in duplicates:
+            PlaceReviewByUser.objects.filter(place_info=duplicate).update(place_info=kept)
+            PlaceInfoChangeRequest.objects.filter(place_info=duplicate).update(place_info=kept)
+            duplicate.delete()
+
+    # 3. 남은 PlaceInfo의 언어를 코드로 바꾸고 조회 키를 채웁니다.
+    used_keys = set()
+    for place_info in PlaceInfo.objects.order_by('id'):
+        language = canonical_language(place_info.language)
+        key = place_info_lookup_key(place_info.name, place_info.address, language)
+        if key in used_keys:
+            key = None
+        used_keys.add(key)
+        PlaceInfo.objects.filter(id=place_info.id).update(language=language, lookup_key=key)
+
+    # 4. 합쳐진 장소의 별점 집계를 다시 계산합니다.
+    PlaceRating.objects.all().delete()
+    rows = (
+        PlaceReviewByUser.objects
+        .filter(place__isnull=False)
+        .values('place')
+        .annotate(
+            review_count=Count('id'),
+            rating_total=Sum('rating'),
+            latest=Max('created_at'),
+            **{f'rating_{r}': Count('id', filter=Q(rating=r)) for r in range(1, 6)}
+        )
+    )
+    PlaceRating.objects.bulk_create([
+        PlaceRating(
+            place_id=row['place'],
+            count=row['review_count'],
+            total=row['rating_total'] or 0,
+            latest_review_at=row['latest'],
+            **{f'rating_{r}': row[f'rating_{r}'] for r in range(1, 6)}
+        )
+        for row in rows
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+    # 병합 중에는 (place, language) 유일 제약을 잠시 풀어야 합니다.
+    # PostgreSQL에서 데이터 변경과 같은 트랜잭션에서 테이블을 변경할 수 없으므로 작업마다 따로 커밋합니다.
+    atomic = False
+
+    dependencies = [
+        ('place', '0013_place'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='placeinfo',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='placeinfo',
+            name='lookup_key',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop, atomic=True),
+        migrations.AlterUniqueTogether(
+            name='placeinfo',
+            unique_together={('place', 'language')},
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-19 13:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0014_placeinfo_lookup_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlaceSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=8)),
+                ('weight', models.FloatField()),
+                ('place', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='searchTerms', to='place.place')),
+                ('place_info', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='searchTerms', to='place.placeinfo')),
+                ('review', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='searchTerms', to='place.placereviewbyuser')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['term', 'place'], name='place_place_term_44a076_idx')],
+            },
+        ),
+    ]
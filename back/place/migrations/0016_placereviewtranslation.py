@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-19 13:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0015_placesearchterm'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlaceReviewTranslation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(max_length=16)),
+                ('source_hash', models.CharField(max_length=64)),
+                ('text', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('review', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='translations', to='place.placereviewbyuser')),
+            ],
+            options={
+                'unique_together': {('review', 'language')},
+            },
+        ),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 5.2 on 2026-10-19 13:20
+
+import math
+
+from django.db import migrations, models
+
+# 이 마이그레이션을 만들 때의 back.place.geo 함수들. 이후 코드가 바뀌어도 결과가 같도록 복사해 둡니다.
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9
+
+
+def parse_coordinate(value, low, high):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(number) or not low <= number <= high:
+        return None
+    return number
+
+
+def encode(lat, lng, precision=GEOHASH_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        target, bounds = (lng, lng_range) if even else (lat, lat_range)
+        mid = (bounds[0] + bounds[1]) / 2
+        value <<= 1
+        if target >= mid:
+            value |= 1
+            bounds[0] = mid
+        else:
+            bounds[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits = 0
+            value = 0
+    return ''.join(chars)
+
+
+def apply_coordinates(saved_place):
+    lat = parse_coordinate(saved_place.lat or saved_place.y, -90, 90)
+    lng = parse_coordinate(saved_place.lng or saved_place.x, -180, 180)
+    if lat is None or lng is None:
+        saved_place.latitude = saved_place.longitude = saved_place.geohash = None
+    else:
+        saved_place.latitude = lat
+        saved_place.longitude = lng
+        saved_place.geohash = encode(lat, lng)
+    return saved_place
+
+
+def fill_coordinates(apps, schema_editor):
+    SavedPlace = apps.get_model('place', 'SavedPlace')
+    batch = []
+    for saved_place in SavedPlace.objects.only('id', 'x', 'y', 'lat', 'lng').iterator(chunk_size=1000):
+        batch.append(apply_coordinates(saved_place))
+        if len(batch) >= 1000:
+            SavedPlace.objects.bulk_update(batch, ['latitude', 'longitude', 'geohash'])
+            batch = []
+    if batch:
+        SavedPlace.objects.bulk_update(batch, ['latitude', 'longitude', 'geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0016_placereviewtranslation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='savedplace',
+            name='geohash',
+            field=models.CharField(blank=True, max_length=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='savedplace',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='savedplace',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='savedplace',
+            index=models.Index(fields=['category', 'geohash'], name='place_saved_categor_da2714_idx'),
+        ),
+        migrations.RunPython(fill_coordinates, migrations.RunPython.noop),
+    ]
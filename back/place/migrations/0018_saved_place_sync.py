@@ -0,0 +1,67 @@
+# Generated by Django 5.2 on 2026-10-19 13:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0017_savedplace_coordinates'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedPlaceSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField(default=0)),
+                ('pruned_version', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SavedPlaceTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('category', 'UserCategory'), ('place', 'SavedPlace')], max_length=16)),
+                ('object_id', models.BigIntegerField()),
+                ('version', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='savedplace',
+            name='version',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='usercategory',
+            name='version',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='savedplace',
+            index=models.Index(fields=['category', 'version'], name='place_saved_categor_e8f0cf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usercategory',
+            index=models.Index(fields=['user', 'version'], name='place_userc_user_id_3f6020_idx'),
+        ),
+        migrations.AddField(
+            model_name='savedplacesyncstate',
+            name='user',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='savedPlaceSyncState', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='savedplacetombstone',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='savedPlaceTombstones', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='savedplacetombstone',
+            index=models.Index(fields=['user', 'version'], name='place_saved_user_id_d94d8e_idx'),
+        ),
+    ]
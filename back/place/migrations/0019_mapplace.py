@@ -0,0 +1,128 @@
+import hashlib
+import json
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# 이 마이그레이션을 만들 때의 MapPlace.PAYLOAD_FIELDS와 back.place.places.map_place_payload
+PAYLOAD_FIELDS = (
+    'place_name', 'address_name', 'road_address_name', 'road_address_name_en', 'phone',
+    'category_name', 'category_name_en', 'place_url', 'category_group_code', 'x', 'y', 'lat', 'lng',
+)
+BATCH_SIZE = 1000
+
+
+def payload_hash(place_id, row):
+    parts = [place_id, json.dumps([row[field] for field in PAYLOAD_FIELDS])]
+    return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+
+def move_payloads(apps, schema_editor):
+    MapPlace = apps.get_model('place', 'MapPlace')
+    SavedPlace = apps.get_model('place', 'SavedPlace')
+
+    # 저장한 장소마다 자기 내용을 그대로 옮기고, 내용이 같은 행만 하나의 MapPlace를 함께 씁니다.
+    map_place_ids = {}
+    rows = SavedPlace.objects.order_by('id').values('id', 'place_id', *PAYLOAD_FIELDS)
+    batch = []
+    for row in rows.iterator(chunk_size=BATCH_SIZE):
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            repoint(MapPlace, SavedPlace, batch, map_place_ids)
+            batch = []
+    if batch:
+        repoint(MapPlace, SavedPlace, batch, map_place_ids)
+
+
+def repoint(MapPlace, SavedPlace, rows, map_place_ids):
+    hashes = {row['id']: payload_hash(row['place_id'], row) for row in rows}
+    missing = {}
+    for row in rows:
+        if hashes[row['id']] not in map_place_ids:
+            missing.setdefault(hashes[row['id']], MapPlace(
+                place_id=row['place_id'], payload_hash=hashes[row['id']],
+                **{field: row[field] for field in PAYLOAD_FIELDS}
+            ))
+    MapPlace.objects.bulk_create(missing.values())
+    map_place_ids.update(MapPlace.objects.filter(payload_hash__in=list(missing)).values_list('payload_hash', 'id'))
+    SavedPlace.objects.bulk_update(
+        [SavedPlace(id=row['id'], map_place_id=map_place_ids[hashes[row['id']]]) for row in rows], ['map_place']
+    )
+
+
+def restore_payloads(apps, schema_editor):
+    SavedPlace = apps.get_model('place', 'SavedPlace')
+    batch = []
+    for saved_place in SavedPlace.objects.select_related('map_place').iterator(chunk_size=BATCH_SIZE):
+        for field in PAYLOAD_FIELDS:
+            setattr(saved_place, field, getattr(saved_place.map_place, field))
+        batch.append(saved_place)
+        if len(batch) >= BATCH_SIZE:
+            SavedPlace.objects.bulk_update(batch, PAYLOAD_FIELDS)
+            batch = []
+    if batch:
+        SavedPlace.objects.bulk_update(batch, PAYLOAD_FIELDS)
+
+
+class Migration(migrations.Migration):
+    # PostgreSQL에서 데이터 변경과 같은 트랜잭션에서 테이블을 변경할 수 없으므로 작업마다 따로 커밋합니다.
+    atomic = False
+
+    dependencies = [
+        ('place', '0018_saved_place_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MapPlace',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('place_id', models.CharField(db_index=True, max_length=100)),
+                ('payload_hash', models.CharField(max_length=64, unique=True)),
+                ('place_name', models.CharField(max_length=255)),
+                ('address_name', models.CharField(blank=True, max_length=255, null=True)),
+                ('road_address_name', models.CharField(blank=True, max_length=255, null=True)),
+                ('road_address_name_en', models.CharField(blank=True, max_length=255, null=True)),
+                ('phone', models.CharField(blank=True, max_length=50, null=True)),
+                ('category_name', models.CharField(blank=True, max_length=255, null=True)),
+                ('category_name_en', models.CharField(blank=True, max_length=255, null=True)),
+                ('place_url', models.URLField(blank=True, null=True)),
+                ('category_group_code', models.CharField(blank=True, max_length=50, null=True)),
+                ('x', models.CharField(blank=True, max_length=50, null=True)),
+                ('y', models.CharField(blank=True, max_length=50, null=True)),
+                ('lat', models.CharField(blank=True, max_length=50, null=True)),
+                ('lng', models.CharField(blank=True, max_length=50, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        # 되돌릴 때 place_name 열을 빈 값으로 다시 만든 뒤 채울 수 있도록 잠시 null을 허용합니다.
+        migrations.AlterField(
+            model_name='savedplace',
+            name='place_name',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='savedplace',
+            name='map_place',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='savedPlaces', to='place.mapplace'),
+        ),
+        migrations.RunPython(move_payloads, restore_payloads, atomic=True),
+        migrations.AlterField(
+            model_name='savedplace',
+            name='map_place',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='savedPlaces', to='place.mapplace'),
+        ),
+        migrations.RemoveField(model_name='savedplace', name='place_name'),
+        migrations.RemoveField(model_name='savedplace', name='address_name'),
+        migrations.RemoveField(model_name='savedplace', name='road_address_name'),
+        migrations.RemoveField(model_name='savedplace', name='road_address_name_en'),
+        migrations.RemoveField(model_name='savedplace', name='phone'),
+        migrations.RemoveField(model_name='savedplace', name='category_name'),
+        migrations.RemoveField(model_name='savedplace', name='category_name_en'),
+        migrations.RemoveField(model_name='savedplace', name='place_url'),
+        migrations.RemoveField(model_name='savedplace', name='category_group_code'),
+        migrations.RemoveField(model_name='savedplace', name='x'),
+        migrations.RemoveField(model_name='savedplace', name='y'),
+        migrations.RemoveField(model_name='savedplace', name='lat'),
+        migrations.RemoveField(model_name='savedplace', name='lng'),
+    ]
@@ -0,0 +1,88 @@
+import math
+import re
+import unicodedata
+from collections import Counter
+
+from django.db import migrations
+
+# 이 마이그레이션을 만들 때의 back.place.search 색인 함수들. 이후 규칙이 바뀌어도 결과가 같도록 복사해 둡니다.
+WORD_RE = re.compile(r'\w+')
+TITLE_WEIGHT = 3.0
+CATEGORY_WEIGHT = 2.0
+MENU_WEIGHT = 2.0
+REVIEW_WEIGHT = 1.0
+BATCH_SIZE = 1000
+
+
+def tokenize(text):
+    text = unicodedata.normalize('NFKC', text or '').casefold()
+    terms = []
+    for word in WORD_RE.findall(text):
+        if len(word) == 1:
+            terms.append(word)
+        else:
+            terms.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return terms
+
+
+def weigh(fields):
+    weights = Counter()
+    for text, field_weight in fields:
+        for term, count in Counter(tokenize(text)).items():
+            weights[term] += field_weight * (1 + math.log(count))
+    return weights
+
+
+def place_info_fields(place_info):
+    fields = [(place_info.title, TITLE_WEIGHT), (place_info.name, TITLE_WEIGHT), (place_info.category, CATEGORY_WEIGHT)]
+    for item in place_info.menu_or_ticket_info or []:
+        if isinstance(item, dict):
+            fields.append((str(item.get('name') or ''), MENU_WEIGHT))
+    for review in place_info.translated_reviews or []:
+        fields.append((str(review), REVIEW_WEIGHT))
+    return fields
+
+
+def fill_search_terms(apps, schema_editor):
+    PlaceInfo = apps.get_model('place', 'PlaceInfo')
+    PlaceReviewByUser = apps.get_model('place', 'PlaceReviewByUser')
+    PlaceSearchTerm = apps.get_model('place', 'PlaceSearchTerm')
+
+    # 0015 이후 저장 시그널로 이미 색인된 행은 건너뛰고, 그 전에 만들어진 행만 색인합니다.
+    terms = []
+    place_infos = PlaceInfo.objects.filter(place__isnull=False, searchTerms__isnull=True).order_by('id')
+    for place_info in place_infos.iterator(chunk_size=BATCH_SIZE):
+        terms.extend(
+            PlaceSearchTerm(term=term, weight=weight, place_id=place_info.place_id, place_info_id=place_info.id)
+            for term, weight in weigh(place_info_fields(place_info)).items()
+        )
+        if len(terms) >= BATCH_SIZE:
+            PlaceSearchTerm.objects.bulk_create(terms, batch_size=BATCH_SIZE)
+            terms = []
+
+    reviews = (
+        PlaceReviewByUser.objects.filter(place__isnull=False, searchTerms__isnull=True)
+        .only('id', 'place_id', 'text').order_by('id')
+    )
+    for review in reviews.iterator(chunk_size=BATCH_SIZE):
+        terms.extend(
+            PlaceSearchTerm(term=term, weight=weight, place_id=review.place_id, review_id=review.id)
+            for term, weight in weigh([(review.text, REVIEW_WEIGHT)]).items()
+        )
+        if len(terms) >= BATCH_SIZE:
+            PlaceSearchTerm.objects.bulk_create(terms, batch_size=BATCH_SIZE)
+            terms = []
+
+    if terms:
+        PlaceSearchTerm.objects.bulk_create(terms, batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0019_mapplace'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_search_terms, migrations.RunPython.noop),
+    ]
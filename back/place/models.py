@@ -31,7 +31,20 @@ class RegionLog(models.Model):
     def __str__(self):
         return f"{self.english} at {self.called_at}"
 
+class Place(models.Model):
+    # 언어와 무관한 실제 장소. 언어별 PlaceInfo와 사용자 리뷰가 이 장소를 가리킵니다.
+    provider_place_id = models.CharField(max_length=100, unique=True, null=True, blank=True)  # 카카오맵 장소 id
+    name = models.CharField(max_length=255)
+    address = models.CharField(max_length=255, null=True, blank=True)
+    lookup_key = models.CharField(max_length=64, unique=True)  # 정규화한 이름과 주소의 해시 (back.place.places)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} / {self.address}"
+
 class PlaceInfo(models.Model):
+    place = models.ForeignKey(Place, related_name="placeInfos", on_delete=models.CASCADE, null=True, blank=True)
+    lookup_key = models.CharField(max_length=64, unique=True, null=True, blank=True)  # 정규화한 이름, 주소, 언어 코드의 해시
     name = models.CharField(max_length=255)
     address = models.CharField(max_length=255, null=True, blank=True)
     language = models.CharField(max_length=255, null=True, blank=True)
@@ -45,7 +58,7 @@ class PlaceInfo(models.Model):
     # is_translated = models.BooleanField(default=False)
 
     class Meta:
-        unique_together = ('name', 'language')
+        unique_together = ('place', 'language')
 
     def __str__(self):
         return f"{self.name} - {self.language}"
@@ -64,17 +77,21 @@ class UserCategory(models.Model):
     user = models.ForeignKey(User, related_name="userCategories", on_delete=models.CASCADE)
     name = models.CharField(max_length=100)
     color = models.TextField(null=True, blank=True, default="")
+    version = models.BigIntegerField(default=0)  # 마지막으로 변경된 사용자별 동기화 버전 (back.place.sync)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         unique_together = ('user', 'name')
+        indexes = [models.Index(fields=['user', 'version'])]
 
     def __str__(self):
         return f"{self.user.email} - {self.name}"
 
-class SavedPlace(models.Model):
-    category = models.ForeignKey(UserCategory, related_name="savedPlaces", on_delete=models.CASCADE)
-    place_id = models.CharField(max_length=100)
+class MapPlace(models.Model):
+    # 카카오맵 장소 정보. 내용이 같은 장소 정보는 여러 사용자와 카테고리가 한 행을 함께 씁니다.
+    # 행은 만든 뒤 바뀌지 않으며, 사용자가 장소 정보를 고치면 고친 내용의 행을 가리키게 됩니다 (back.place.places).
+    place_id = models.CharField(max_length=100, db_index=True)  # 카카오맵 장소 id
+    payload_hash = models.CharField(max_length=64, unique=True)  # 장소 id와 장소 정보의 해시
     place_name = models.CharField(max_length=255)
     address_name = models.CharField(max_length=255, null=True, blank=True)
     road_address_name = models.CharField(max_length=255, null=True, blank=True)
@@ -90,8 +107,65 @@ class SavedPlace(models.Model):
     lng = models.CharField(max_length=50, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # 사용자가 보내는 장소 정보 필드 (place_id 제외)
+    PAYLOAD_FIELDS = (
+        'place_name', 'address_name', 'road_address_name', 'road_address_name_en', 'phone',
+        'category_name', 'category_name_en', 'place_url', 'category_group_code', 'x', 'y', 'lat', 'lng',
+    )
+
+    def __str__(self):
+        return f"{self.place_name} ({self.place_id})"
+
+
+class MapPlaceAttribute:
+    # SavedPlace에서 MapPlace의 필드를 그대로 읽을 수 있게 합니다.
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        if instance.map_place_id is None:
+            return None
+        return getattr(instance.map_place, self.name)
+
+    def __set__(self, instance, value):
+        raise AttributeError(f"{self.name} is stored on MapPlace; point saved_place.map_place at another row instead")
+
+
+class SavedPlace(models.Model):
+    # 사용자 카테고리에 장소를 저장한 기록. 장소 정보는 MapPlace에 있고, 영역 조회에 쓰는 좌표는 카테고리별
+    # 인덱스를 쓸 수 있도록 이 행에 둡니다.
+    category = models.ForeignKey(UserCategory, related_name="savedPlaces", on_delete=models.CASCADE)
+    place_id = models.CharField(max_length=100)  # 카카오맵 장소 id (map_place.place_id와 같습니다)
+    map_place = models.ForeignKey(MapPlace, related_name="savedPlaces", on_delete=models.PROTECT)
+    # map_place의 문자열 좌표에서 저장 시 채워지는 숫자 좌표와 geohash (back.place.geo)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    geohash = models.CharField(max_length=12, null=True, blank=True)
+    version = models.BigIntegerField(default=0)  # 마지막으로 변경된 사용자별 동기화 버전 (back.place.sync)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    place_name = MapPlaceAttribute()
+    address_name = MapPlaceAttribute()
+    road_address_name = MapPlaceAttribute()
+    road_address_name_en = MapPlaceAttribute()
+    phone = MapPlaceAttribute()
+    category_name = MapPlaceAttribute()
+    category_name_en = MapPlaceAttribute()
+    place_url = MapPlaceAttribute()
+    category_group_code = MapPlaceAttribute()
+    x = MapPlaceAttribute()
+    y = MapPlaceAttribute()
+    lat = MapPlaceAttribute()
+    lng = MapPlaceAttribute()
+
     class Meta:
         unique_together = ('category', 'place_id')
+        indexes = [
+            models.Index(fields=['category', 'geohash']),
+            models.Index(fields=['category', 'version']),
+        ]
 
     def __str__(self):
         return f"{self.place_name} - {self.category.name}"
@@ -110,14 +184,32 @@ class PlaceInfoChangeRequest(models.Model):
 class PlaceReviewByUser(models.Model):
     user = models.ForeignKey(User, related_name="placeInfoReviews", on_delete=models.CASCADE)
     place_info = models.ForeignKey(PlaceInfo, related_name="placeInfoReviews", on_delete=models.CASCADE)
+    place = models.ForeignKey(Place, related_name="placeReviews", on_delete=models.CASCADE, null=True, blank=True)
     text = models.TextField(null=True, blank=True)
     images = models.JSONField(null=True, blank=True)
+    # 원본 이미지 URL -> {"thumbnail": url, "medium": url}
+    image_variants = models.JSONField(null=True, blank=True)
     rating = models.IntegerField()
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"{self.user.email} - {self.place_info.name}"
 
+class PlaceReviewTranslation(models.Model):
+    # 리뷰를 읽는 사람의 언어로 번역한 결과. 처음 조회될 때 만들어지며(back.place.translations),
+    # 원문이 바뀌면 source_hash가 달라지므로 더 이상 쓰이지 않고 삭제됩니다.
+    review = models.ForeignKey(PlaceReviewByUser, related_name="translations", on_delete=models.CASCADE)
+    language = models.CharField(max_length=16)
+    source_hash = models.CharField(max_length=64)
+    text = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('review', 'language')
+
+    def __str__(self):
+        return f"{self.review_id} - {self.language}"
+
 class PlaceInfoReviewByUserReport(models.Model):
     place_review = models.ForeignKey(PlaceReviewByUser, related_name="placeReviewByUserReports", on_delete=models.SET_NULL, null=True, blank=True)
     reason = models.TextField(blank=True, null=True)
@@ -127,4 +219,87 @@ class PlaceInfoReviewByUserReport(models.Model):
     def __str__(self):
         if self.place_review and self.place_review.place_info:
             return f"{self.place_review.place_info.name}"
-        return "(deleted review)"
\ No newline at end of file
+        return "(deleted review)"
+
+class PlaceRating(models.Model):
+    # 장소별 리뷰 집계. 리뷰가 생성/삭제될 때 back.place.ratings에서 갱신됩니다.
+    place = models.OneToOneField(Place, related_name="rating", on_delete=models.CASCADE)
+    count = models.IntegerField(default=0)
+    total = models.IntegerField(default=0)
+    rating_1 = models.IntegerField(default=0)
+    rating_2 = models.IntegerField(default=0)
+    rating_3 = models.IntegerField(default=0)
+    rating_4 = models.IntegerField(default=0)
+    rating_5 = models.IntegerField(default=0)
+    latest_review_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def average(self):
+        return self.total / self.count if self.count else None
+
+    @property
+    def histogram(self):
+        return [self.rating_1, self.rating_2, self.rating_3, self.rating_4, self.rating_5]
+
+    def __str__(self):
+        return f"{self.place.name} - {self.count} reviews"
+
+
+class PlaceSearchTerm(models.Model):
+    # 장소 검색용 역색인. 문서(언어별 PlaceInfo 또는 리뷰)에 나온 bigram 하나당 한 행이며,
+    # 문서가 저장될 때 back.place.search에서 해당 문서의 행만 다시 만듭니다.
+    term = models.CharField(max_length=8)
+    place = models.ForeignKey(Place, related_name="searchTerms", on_delete=models.CASCADE)
+    place_info = models.ForeignKey(PlaceInfo, related_name="searchTerms", on_delete=models.CASCADE, null=True, blank=True)
+    review = models.ForeignKey(PlaceReviewByUser, related_name="searchTerms", on_delete=models.CASCADE, null=True, blank=True)
+    weight = models.FloatField()
+
+    class Meta:
+        indexes = [models.Index(fields=['term', 'place'])]
+
+    def __str__(self):
+        return f"{self.term} - {self.place_id}"
+
+
+class ReviewImageGCCheckpoint(models.Model):
+    # 리뷰 이미지 정리 작업의 진행 위치. 중단되면 last_key 다음부터 이어서 진행합니다.
+    last_key = models.CharField(max_length=1024, blank=True, default="")
+    scanned_count = models.IntegerField(default=0)
+    deleted_count = models.IntegerField(default=0)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.last_key or '(start)'} - {self.deleted_count} deleted"
+
+
+class SavedPlaceSyncState(models.Model):
+    # 사용자의 카테고리/저장한 장소가 바뀔 때마다 1씩 증가하는 버전
+    user = models.OneToOneField(User, related_name="savedPlaceSyncState", on_delete=models.CASCADE)
+    version = models.BigIntegerField(default=0)
+    # 이 버전 이하의 삭제 기록은 정리되었으므로, 더 오래된 커서로는 전체를 다시 받아야 합니다.
+    pruned_version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.email} - {self.version}"
+
+
+class SavedPlaceTombstone(models.Model):
+    KIND_CATEGORY = 'category'
+    KIND_PLACE = 'place'
+    KIND_CHOICES = [(KIND_CATEGORY, 'UserCategory'), (KIND_PLACE, 'SavedPlace')]
+
+    user = models.ForeignKey(User, related_name="savedPlaceTombstones", on_delete=models.CASCADE)
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    version = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['user', 'version'])]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} - {self.version}"
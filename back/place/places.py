@@ -0,0 +1,188 @@
+import hashlib
+import json
+import re
+import unicodedata
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+# 조회 키를 만들 때 무시하는 문자: 공백과, 지점명 앞뒤에 붙는 구분 기호
+# ("스타벅스 강남점", "스타벅스강남점", "스타벅스(강남점)", "스타벅스 - 강남점"이 같은 키가 됩니다)
+IGNORED_CHARS_RE = re.compile(r'[\s\-_·・.,()\[\]{}（）]+')
+
+# 정규화된 언어 코드 -> 프론트엔드에서 전달되는 별칭
+# 중국어는 간체/번체의 결과가 다르므로 DeepL 코드(ZH)와 달리 구분합니다.
+LANGUAGE_ALIASES = {
+  'EN': ('EN', 'English', '영어'),
+  'KO': ('KO', 'KR', '한국어'),
+  'JA': ('JA', 'JP', '日本語', '일본어'),
+  'ZH-CN': ('ZH-CN', '中文（简体）', '중국어(간체)'),
+  'ZH-TW': ('ZH-TW', '中文（繁體）', '중국어(번체)'),
+  'ES': ('ES', 'Español', '스페인어'),
+  'FR': ('FR', 'Français', '프랑스어'),
+  'DE': ('DE', 'Deutsch', '독일어'),
+}
+
+
+def normalize_text(value):
+  """
+  NFKC로 전각/반각 등을 통일하고 대소문자, 공백, 구분 기호 차이를 없앱니다.
+  """
+  value = unicodedata.normalize('NFKC', value or '').casefold()
+  return IGNORED_CHARS_RE.sub('', value)
+
+
+LANGUAGE_CODES = {
+  normalize_text(alias): code
+  for code, aliases in LANGUAGE_ALIASES.items()
+  for alias in aliases
+}
+
+
+def canonical_language(language):
+  """
+  언어 별칭('English', '영어', 'EN' 등)을 하나의 코드로 바꿉니다. 알 수 없는 값은 앞뒤 공백만 정리해 그대로 씁니다.
+  """
+  code = LANGUAGE_CODES.get(normalize_text(language))
+  if code is not None:
+    return code
+  return unicodedata.normalize('NFKC', language or '').strip()
+
+
+def digest(*parts):
+  return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+
+def place_lookup_key(name, address=None):
+  """
+  이름과 주소를 정규화해 Place.lookup_key로 쓰는 해시를 만듭니다.
+  """
+  return digest(normalize_text(name), normalize_text(address))
+
+
+def place_info_lookup_key(name, address=None, language=None):
+  """
+  정규화한 이름, 주소, 언어 코드로 PlaceInfo.lookup_key로 쓰는 해시를 만듭니다.
+  """
+  return digest(normalize_text(name), normalize_text(address), canonical_language(language))
+
+
+def find_place(name, address=None, provider_place_id=None):
+  from back.place.models import Place
+
+  if provider_place_id:
+    place = Place.objects.filter(provider_place_id=provider_place_id).first()
+    if place is not None:
+      return place
+  return Place.objects.filter(lookup_key=place_lookup_key(name, address)).first()
+
+
+def get_or_create_place(name, address=None, provider_place_id=None):
+  """
+  장소 제공자(카카오맵)의 id가 있으면 그 id로, 없으면 정규화한 이름과 주소로 Place를 찾고 없으면 만듭니다.
+  이름/주소로 찾은 장소에 제공자 id가 비어 있으면 채워 둡니다.
+  """
+  from back.place.models import Place
+
+  if provider_place_id:
+    place = Place.objects.filter(provider_place_id=provider_place_id).first()
+    if place is not None:
+      return place
+
+  place, _ = Place.objects.get_or_create(
+    lookup_key=place_lookup_key(name, address),
+    defaults={'name': name, 'address': address, 'provider_place_id': provider_place_id or None}
+  )
+  if provider_place_id and not place.provider_place_id:
+    Place.objects.filter(id=place.id, provider_place_id__isnull=True).update(provider_place_id=provider_place_id)
+    place.provider_place_id = provider_place_id
+  return place
+
+
+def get_place_info(name, address=None, language=None, provider_place_id=None):
+  """
+  캐시된 PlaceInfo를 찾습니다. 정규화된 조회 키로 먼저 찾고, 다른 이름/주소 표기로 만들어진 경우를 위해
+  장소(Place)와 언어 코드로 한 번 더 찾습니다. 없으면 PlaceInfo.DoesNotExist를 발생시킵니다.
+  """
+  from back.place.models import PlaceInfo
+
+  place_info = PlaceInfo.objects.filter(lookup_key=place_info_lookup_key(name, address, language)).first()
+  if place_info is not None:
+    return place_info
+
+  place = find_place(name, address, provider_place_id)
+  if place is not None:
+    place_info = PlaceInfo.objects.filter(place=place, language=canonical_language(language)).first()
+    if place_info is not None:
+      return place_info
+
+  raise PlaceInfo.DoesNotExist
+
+
+async def aget_or_create_place(name, address=None, provider_place_id=None):
+  return await sync_to_async(get_or_create_place)(name, address, provider_place_id)
+
+
+async def aget_place_info(name, address=None, language=None, provider_place_id=None):
+  return await sync_to_async(get_place_info)(name, address, language, provider_place_id)
+
+
+def map_place_payload(place_id, values):
+  """
+  MapPlace 한 행의 내용 {필드: 값}과 그 해시. 해시는 장소 id와 모든 장소 정보 필드로 만들므로, 내용이 같은
+  장소 정보만 같은 행을 씁니다.
+  """
+  from back.place.models import MapPlace
+
+  payload = {field: values.get(field) for field in MapPlace.PAYLOAD_FIELDS}
+  return payload, digest(place_id, json.dumps([payload[field] for field in MapPlace.PAYLOAD_FIELDS]))
+
+
+def save_map_places(payloads):
+  """
+  장소 정보 목록과 같은 순서로 MapPlace 목록을 반환합니다. 내용이 같은 행이 있으면 그 행을 쓰고 없으면 만듭니다.
+  이미 있는 행은 고치지 않으므로, 한 사용자의 변경이 같은 장소를 저장한 다른 사용자에게 보이지 않습니다.
+  반환한 행은 트랜잭션이 끝날 때까지 잠그므로, SavedPlace를 저장하는 트랜잭션 안에서 호출하면 아직 아무도
+  가리키지 않는 행을 그 사이에 prune_map_places가 지우지 못합니다.
+  """
+  from back.place.models import MapPlace
+
+  rows = {}
+  hashes = []
+  for values in payloads:
+    payload, payload_hash = map_place_payload(values['place_id'], values)
+    rows.setdefault(payload_hash, MapPlace(place_id=values['place_id'], payload_hash=payload_hash, **payload))
+    hashes.append(payload_hash)
+
+  with transaction.atomic():
+    locked = MapPlace.objects.select_for_update()
+    map_places = locked.in_bulk(list(rows), field_name='payload_hash')
+    missing = [row for payload_hash, row in rows.items() if payload_hash not in map_places]
+    if missing:
+      # 다른 요청이 같은 내용의 행을 먼저 만들었으면 그 행을 씁니다.
+      MapPlace.objects.bulk_create(missing, batch_size=500, ignore_conflicts=True)
+      map_places.update(locked.in_bulk([row.payload_hash for row in missing], field_name='payload_hash'))
+  return [map_places[payload_hash] for payload_hash in hashes]
+
+
+MAP_PLACE_PRUNE_BATCH_SIZE = 1000
+
+
+def prune_map_places(batch_size=MAP_PLACE_PRUNE_BATCH_SIZE):
+  """
+  어떤 저장한 장소도 가리키지 않는 MapPlace 행을 batch_size개씩 지우고 지운 수를 반환합니다.
+  save_map_places가 잠근 행은 곧 저장한 장소가 가리킬 수 있으므로 건너뛰고 다음 실행에서 다시 확인합니다.
+  """
+  from back.place.models import MapPlace, SavedPlace
+
+  unreferenced = MapPlace.objects.filter(~Exists(SavedPlace.objects.filter(map_place=OuterRef('pk'))))
+  deleted = 0
+  while True:
+    with transaction.atomic():
+      ids = list(unreferenced.select_for_update(skip_locked=True).values_list('id', flat=True)[:batch_size])
+      if ids:
+        count, _ = MapPlace.objects.filter(id__in=ids).delete()
+        deleted += count
+    if len(ids) < batch_size:
+      return deleted
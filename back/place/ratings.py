@@ -0,0 +1,144 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Q, Sum
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+RATING_MIN = 1
+RATING_MAX = 5
+RATING_FIELDS = {rating: f'rating_{rating}' for rating in range(RATING_MIN, RATING_MAX + 1)}
+
+_deferred_place_ids = ContextVar('deferred_place_rating_updates', default=None)
+
+
+def validate_rating(rating):
+  if rating is None or not RATING_MIN <= rating <= RATING_MAX:
+    raise Exception(f"Rating must be between {RATING_MIN} and {RATING_MAX}")
+
+
+def apply_review(place_id, rating, created_at, delta):
+  """
+  리뷰 하나를 집계에 더하거나(delta=1) 뺍니다(delta=-1). F()로 갱신하므로 동시에 들어온 리뷰도 누락되지 않습니다.
+  """
+  from back.place.models import PlaceRating, PlaceReviewByUser
+
+  if delta > 0:
+    PlaceRating.objects.get_or_create(place_id=place_id)
+  updates = {
+    'updated_at': timezone.now(),
+    'count': F('count') + delta,
+    'total': F('total') + rating * delta,
+  }
+  if rating in RATING_FIELDS:
+    field = RATING_FIELDS[rating]
+    updates[field] = F(field) + delta
+  if delta > 0:
+    updates['latest_review_at'] = Greatest(Coalesce('latest_review_at', created_at), created_at)
+  PlaceRating.objects.filter(place_id=place_id).update(**updates)
+
+  if delta < 0:
+    # 가장 최근 리뷰가 삭제된 경우에만 남은 리뷰에서 다시 구합니다.
+    latest = PlaceRating.objects.filter(place_id=place_id).values_list('latest_review_at', flat=True).first()
+    if latest is None or created_at >= latest:
+      latest = PlaceReviewByUser.objects.filter(place_id=place_id).aggregate(latest=Max('created_at'))['latest']
+      PlaceRating.objects.filter(place_id=place_id).update(latest_review_at=latest)
+
+
+def review_saved(sender, instance, created, **kwargs):
+  if not created or kwargs.get('raw') or instance.place_id is None:
+    return
+  deferred = _deferred_place_ids.get()
+  if deferred is not None:
+    deferred.add(instance.place_id)
+    return
+  apply_review(instance.place_id, instance.rating, instance.created_at, 1)
+
+
+def review_deleted(sender, instance, **kwargs):
+  if instance.place_id is None:
+    return
+  deferred = _deferred_place_ids.get()
+  if deferred is not None:
+    deferred.add(instance.place_id)
+    return
+  apply_review(instance.place_id, instance.rating, instance.created_at, -1)
+
+
+@contextmanager
+def deferred_rating_updates():
+  """
+  블록 안에서 생성/삭제된 리뷰의 장소를 모아 두었다가 블록이 끝날 때 한 번에 다시 집계합니다.
+  리뷰를 대량으로 삭제할 때 리뷰마다 집계를 갱신하지 않도록 사용합니다.
+  """
+  place_ids = set()
+  token = _deferred_place_ids.set(place_ids)
+  try:
+    yield
+  finally:
+    _deferred_place_ids.reset(token)
+  refresh_place_ratings(place_ids)
+
+
+def rebuild_place_ratings():
+  """
+  모든 리뷰로 장소별 집계를 처음부터 다시 계산합니다.
+  """
+  return refresh_place_ratings()
+
+
+def refresh_place_ratings(place_ids=None):
+  """
+  리뷰로 장소별 집계를 다시 계산합니다. place_ids가 None이면 모든 장소를 계산합니다.
+  리뷰가 없는 장소의 집계는 삭제하며, 갱신된 장소 수와 삭제된 장소 수를 반환합니다.
+  """
+  from back.place.models import PlaceRating, PlaceReviewByUser
+
+  reviews = PlaceReviewByUser.objects.filter(place__isnull=False)
+  existing = PlaceRating.objects.all()
+  if place_ids is not None:
+    place_ids = list(place_ids)
+    if not place_ids:
+      return 0, 0
+    reviews = reviews.filter(place_id__in=place_ids)
+    existing = existing.filter(place_id__in=place_ids)
+
+  rows = (
+    reviews
+    .values('place')
+    .annotate(
+      review_count=Count('id'),
+      rating_total=Sum('rating'),
+      latest=Max('created_at'),
+      **{field: Count('id', filter=Q(rating=rating)) for rating, field in RATING_FIELDS.items()}
+    )
+  )
+  ratings = [
+    PlaceRating(
+      place_id=row['place'],
+      count=row['review_count'],
+      total=row['rating_total'] or 0,
+      latest_review_at=row['latest'],
+      **{field: row[field] for field in RATING_FIELDS.values()}
+    )
+    for row in rows
+  ]
+  rated = {rating.place_id for rating in ratings}
+
+  with transaction.atomic():
+    PlaceRating.objects.bulk_create(
+      ratings,
+      batch_size=500,
+      update_conflicts=True,
+      unique_fields=['place'],
+      update_fields=['count', 'total', 'latest_review_at', 'updated_at', *RATING_FIELDS.values()]
+    )
+    stale = [
+      place_id for place_id in existing.values_list('place_id', flat=True)
+      if place_id not in rated
+    ]
+    for start in range(0, len(stale), 500):
+      PlaceRating.objects.filter(place_id__in=stale[start:start + 500]).delete()
+
+  return len(ratings), len(stale)
@@ -1,47 +1,41 @@
-import re, requests, json
+import re, json, asyncio
 import graphene
-from django.conf import settings
-from django.core.management import call_command
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
 from graphene_django import DjangoObjectType
-from openai import OpenAI
 from graphene.types.generic import GenericScalar
+from back.place import geo
+from back.place.clusters import clusters
+from back.place.clients import get_openai_client, deepl_translate, deepl_translate_many
+from back.place.images import schedule_review_image_processing
+from back.place.places import (
+  aget_or_create_place,
+  aget_place_info,
+  canonical_language,
+  place_info_lookup_key,
+  save_map_places
+)
+from back.place.ratings import deferred_rating_updates, validate_rating
+from back.place.search import index_place_infos, search_places
+from back.place.sync import category_tree, changes_since, sync_changes
+from back.place.translations import DEEPL_MAX_TEXTS, translate_reviews
+from back.place.storage import (
+  REVIEW_IMAGE_MAX_COUNT,
+  create_review_upload_urls,
+  upload_review_images,
+  verify_review_image_keys
+)
 from back.place.models import (
   Category, CategoryLog,
   RegionName, RegionLog,
-  PlaceInfo, PlaceLog,
-  UserCategory, SavedPlace,
+  Place, PlaceInfo, PlaceLog,
+  UserCategory, SavedPlace, MapPlace,
   PlaceInfoChangeRequest,
   PlaceReviewByUser,
+  PlaceRating,
   PlaceInfoReviewByUserReport
 )
 from graphql_jwt.decorators import login_required
-import base64
-import uuid
-import boto3
-from io import BytesIO
-import time
-
-DEEPL_URL = 'https://api-free.deepl.com/v2/translate'
-DEEPL_AUTH_KEY = settings.DEEPL_API_KEY
-OPENAI_API = settings.OPENAI_API_KEY
-client = OpenAI(api_key=OPENAI_API, base_url="https://api.perplexity.ai")
-
-
-def deepl_translate(text: str, source_lang: str, target_lang: str) -> str:
-  try:
-    res = requests.post(
-      DEEPL_URL,
-      data={
-        'text': text,
-        'source_lang': source_lang,
-        'target_lang': target_lang,
-        'auth_key': DEEPL_AUTH_KEY,
-      }
-    )
-    res.raise_for_status()
-    return res.json()['translations'][0]['text']
-  except Exception as e:
-    raise RuntimeError(f'DeepL translation failed: {str(e)}')
 
 
 def get_deepl_language_code(language):
@@ -94,12 +88,35 @@ class RegionNameType(DjangoObjectType):
   class Meta:
     model = RegionName
 
+class PlaceRatingType(graphene.ObjectType):
+  count = graphene.Int()
+  total = graphene.Int()
+  average = graphene.Float()
+  histogram = graphene.List(graphene.Int, description="별점 1~5점별 리뷰 수")
+  latest_review_at = graphene.DateTime()
+
+class PlaceType(DjangoObjectType):
+  class Meta:
+    model = Place
+    fields = ('id', 'provider_place_id', 'name', 'address', 'created_at')
+
 class PlaceInfoType(DjangoObjectType):
   class Meta:
     model = PlaceInfo
 
   menu_or_ticket_info = GenericScalar()
   translated_reviews = GenericScalar()
+  rating_summary = graphene.Field(PlaceRatingType)
+
+  def resolve_rating_summary(self, info):
+    # 리뷰 목록을 내려받지 않고 미리 집계된 한 행만 읽습니다.
+    if self.place_id is None:
+      return PlaceRating()
+    return PlaceRating.objects.filter(place_id=self.place_id).first() or PlaceRating(place_id=self.place_id)
+
+class PlaceSearchResultType(graphene.ObjectType):
+  place_info = graphene.Field(PlaceInfoType)
+  score = graphene.Float()
 
 class UserCategoryType(DjangoObjectType):
   class Meta:
@@ -109,7 +126,22 @@ class UserCategoryType(DjangoObjectType):
 class SavedPlaceType(DjangoObjectType):
   class Meta:
     model = SavedPlace
-    fields = '__all__'
+    fields = ('id', 'category', 'place_id', 'latitude', 'longitude', 'geohash', 'version', 'created_at')
+
+  # 장소 정보는 MapPlace에서 읽습니다.
+  place_name = graphene.String(required=True)
+  address_name = graphene.String()
+  road_address_name = graphene.String()
+  road_address_name_en = graphene.String()
+  phone = graphene.String()
+  category_name = graphene.String()
+  category_name_en = graphene.String()
+  place_url = graphene.String()
+  category_group_code = graphene.String()
+  x = graphene.String()
+  y = graphene.String()
+  lat = graphene.String()
+  lng = graphene.String()
 
   road_address_name_EN = graphene.String()
   category_name_EN = graphene.String()
@@ -128,17 +160,59 @@ class SavedPlaceType(DjangoObjectType):
   def resolve_categoryNameEN(self, info):
     return self.category_name_en
   
+class SavedPlaceChangesType(graphene.ObjectType):
+  cursor = graphene.Int(description="다음 동기화 때 since로 전달할 값")
+  reset = graphene.Boolean(description="True이면 전체 목록이므로 로컬 데이터를 모두 교체합니다")
+  categories = graphene.List(UserCategoryType)
+  saved_places = graphene.List(SavedPlaceType)
+  deleted_category_ids = graphene.List(graphene.ID)
+  deleted_saved_place_ids = graphene.List(graphene.ID)
+
+class SavedPlaceClusterType(graphene.ObjectType):
+  geohash = graphene.String()
+  count = graphene.Int()
+  latitude = graphene.Float(description="셀에 속한 장소들의 평균 위도")
+  longitude = graphene.Float(description="셀에 속한 장소들의 평균 경도")
+  representative_id = graphene.ID()
+  place = graphene.Field(SavedPlaceType, description="장소가 하나뿐이거나 충분히 확대한 경우의 저장한 장소")
+
+class NearbySavedPlaceType(graphene.ObjectType):
+  place = graphene.Field(SavedPlaceType)
+  distance = graphene.Float(description="미터 단위 거리")
+
 class PlaceInfoChangeRequestType(DjangoObjectType):
   class Meta:
     model = PlaceInfoChangeRequest
     fields = '__all__'
 
+class ReviewImageSize(graphene.Enum):
+  THUMBNAIL = 'thumbnail'
+  MEDIUM = 'medium'
+  ORIGINAL = 'original'
+
 class PlaceReviewByUserType(DjangoObjectType):
     class Meta:
         model = PlaceReviewByUser
-        fields = '__all__'
+        # image_variants의 키는 EXIF가 남아 있는 업로드 원본 URL이므로 노출하지 않습니다.
+        exclude = ('image_variants',)
     
-    images = GenericScalar()
+    images = GenericScalar(size=ReviewImageSize(description="기본값은 EXIF를 제거한 original"))
+    translated_text = graphene.String(description="placeReviews에 language를 지정한 경우 번역된 본문")
+
+    def resolve_translated_text(self, info):
+        return getattr(self, 'translated_text', None)
+
+    def resolve_images(self, info, size=None):
+        if not self.images:
+            return self.images
+        # original은 EXIF를 제거한 복사본입니다. 업로드된 원본은 EXIF가 남아 있으므로, 아직 처리되지 않았거나
+        # 처리에 실패한 이미지는 반환하지 않습니다.
+        name = size.value if size else ReviewImageSize.ORIGINAL.value
+        variants = self.image_variants or {}
+        return [
+            variants[url].get(name, variants[url]['original'])
+            for url in self.images if 'original' in variants.get(url, {})
+        ]
 
 class PlaceInfoReviewByUserReportType(DjangoObjectType):
     class Meta:
@@ -152,20 +226,20 @@ class TranslateCategory(graphene.Mutation):
 
   translated_text = graphene.String()
 
-  def mutate(self, info, text):
+  async def mutate(self, info, text):
     if not text:
       raise Exception("Missing 'text' field")
 
-    CategoryLog.objects.create(korean=text)
+    await CategoryLog.objects.acreate(korean=text)
 
     try:
-      category = Category.objects.get(korean=text)
+      category = await Category.objects.aget(korean=text)
       return TranslateCategory(translated_text=category.english)
     except Category.DoesNotExist:
       pass
 
-    translated = deepl_translate(text, source_lang='KO', target_lang='EN')
-    Category.objects.create(korean=text, english=translated)
+    translated = await deepl_translate(text, source_lang='KO', target_lang='EN')
+    await Category.objects.acreate(korean=text, english=translated)
     return TranslateCategory(translated_text=translated)
 
 
@@ -175,20 +249,20 @@ class TranslateRegionToKorean(graphene.Mutation):
 
   translated_text = graphene.String()
 
-  def mutate(self, info, text):
+  async def mutate(self, info, text):
     if not text:
       raise Exception("Missing 'text' field")
 
-    RegionLog.objects.create(english=text)
+    await RegionLog.objects.acreate(english=text)
 
     try:
-      region = RegionName.objects.get(english=text)
+      region = await RegionName.objects.aget(english=text)
       return TranslateRegionToKorean(translated_text=region.korean)
     except RegionName.DoesNotExist:
       pass
 
-    translated = deepl_translate(text, source_lang='EN', target_lang='KO')
-    RegionName.objects.create(korean=translated, english=text)
+    translated = await deepl_translate(text, source_lang='EN', target_lang='KO')
+    await RegionName.objects.acreate(korean=translated, english=text)
     return TranslateRegionToKorean(translated_text=translated)
 
 
@@ -197,17 +271,18 @@ class GetPlaceInfo(graphene.Mutation):
     name = graphene.String(required=True)
     language = graphene.String(required=True)
     address = graphene.String()
+    place_id = graphene.String()  # 카카오맵 장소 id
 
   place = graphene.Field(PlaceInfoType)
 
-  def mutate(self, info, name, language, address=None):
+  async def mutate(self, info, name, language, address=None, place_id=None):
     if not name or not language:
       raise Exception('Missing name or language')
     
-    PlaceLog.objects.create(name=name, address=address, language=language)
+    await PlaceLog.objects.acreate(name=name, address=address, language=language)
 
     try:
-      place = PlaceInfo.objects.get(name=name, address=address, language=language)
+      place = await aget_place_info(name, address, language, place_id)
       return GetPlaceInfo(place=place)
 
     except PlaceInfo.DoesNotExist:
@@ -268,7 +343,7 @@ class GetPlaceInfo(graphene.Mutation):
       max_retries = 3
       for attempt in range(max_retries):
         try:
-          response = client.chat.completions.create(
+          response = await get_openai_client().chat.completions.create(
             model="sonar",
             messages=messages
           )
@@ -307,10 +382,12 @@ class GetPlaceInfo(graphene.Mutation):
             else:
               raise Exception(f"Could not parse valid JSON from Perplexity response. {content}")
 
-          place = PlaceInfo.objects.create(
+          place = await PlaceInfo.objects.acreate(
+            place=await aget_or_create_place(name, address, place_id),
+            lookup_key=place_info_lookup_key(name, address, language),
             name=name,
             address=address,
-            language=language,
+            language=canonical_language(language),
             title=data.get("title"),
             category=data.get("category"),
             menu_or_ticket_info=data.get("menu"),
@@ -323,7 +400,7 @@ class GetPlaceInfo(graphene.Mutation):
         except Exception as e:
           if "<html" in str(e) and attempt < max_retries - 1:
             print(f"Attempt {attempt+1} failed, retrying...")
-            time.sleep(2 * (attempt + 1))  # 지수 백오프
+            await asyncio.sleep(2 * (attempt + 1))  # 지수 백오프
           else:
             raise  # 모든 재시도 실패 또는 다른 오류
       
@@ -367,7 +444,8 @@ class CreateUserCategory(graphene.Mutation):
     if UserCategory.objects.filter(user=user, name=name).exists():
       raise Exception("A category with this name already exists")
     
-    category = UserCategory.objects.create(user=user, name=name, color=color)
+    with sync_changes(user):
+      category = UserCategory.objects.create(user=user, name=name, color=color)
     return CreateUserCategory(category=category, message="Category created successfully")
 
 
@@ -395,7 +473,8 @@ class UpdateUserCategory(graphene.Mutation):
     category.name = name
     if color is not None:
       category.color = color
-    category.save()
+    with sync_changes(user):
+      category.save()
     return UpdateUserCategory(category=category, message="Category updated successfully")
 
 
@@ -414,7 +493,8 @@ class DeleteUserCategory(graphene.Mutation):
     except UserCategory.DoesNotExist:
       raise Exception("Category not found")
       
-    category.delete()
+    with sync_changes(user):
+      category.delete()
     return DeleteUserCategory(message="Category deleted successfully")
 
 
@@ -451,12 +531,9 @@ class CreateSavedPlace(graphene.Mutation):
     if SavedPlace.objects.filter(category=category, place_id=place_id).exists():
       raise Exception("This place is already saved in this category")
     
-    place = SavedPlace.objects.create(
-      category=category,
-      place_id=place_id,
-      place_name=place_name,
-      **{k: v for k, v in kwargs.items() if v is not None}
-    )
+    with sync_changes(user):
+      map_place, = save_map_places([dict(kwargs, place_id=place_id, place_name=place_name)])
+      place = SavedPlace.objects.create(category=category, place_id=place_id, map_place=map_place)
     
     return CreateSavedPlace(place=place, message="Place saved successfully")
 
@@ -486,15 +563,16 @@ class UpdateSavedPlace(graphene.Mutation):
     user = info.context.user
     
     try:
-      place = SavedPlace.objects.get(id=id, category__user=user)
+      place = SavedPlace.objects.select_related('map_place').get(id=id, category__user=user)
     except SavedPlace.DoesNotExist:
       raise Exception("Saved place not found")
     
-    for key, value in kwargs.items():
-      if value is not None:
-        setattr(place, key, value)
-    
-    place.save()
+    # 공유 행은 고치지 않고, 바뀐 내용의 행을 이 장소에만 연결합니다.
+    values = {field: getattr(place.map_place, field) for field in MapPlace.PAYLOAD_FIELDS}
+    values.update({key: value for key, value in kwargs.items() if value is not None})
+    with sync_changes(user):
+      place.map_place, = save_map_places([dict(values, place_id=place.place_id)])
+      place.save()
     return UpdateSavedPlace(place=place, message="Place information updated successfully")
 
 
@@ -511,7 +589,7 @@ class MoveSavedPlace(graphene.Mutation):
     user = info.context.user
     
     try:
-      place = SavedPlace.objects.get(id=id, category__user=user)
+      place = SavedPlace.objects.select_related('map_place').get(id=id, category__user=user)
     except SavedPlace.DoesNotExist:
       raise Exception("Saved place not found")
       
@@ -524,7 +602,8 @@ class MoveSavedPlace(graphene.Mutation):
       raise Exception("This place already exists in the target category")
     
     place.category = new_category
-    place.save()
+    with sync_changes(user):
+      place.save()
     return MoveSavedPlace(place=place, message="Place moved to different category successfully")
 
 
@@ -543,9 +622,203 @@ class DeleteSavedPlace(graphene.Mutation):
     except SavedPlace.DoesNotExist:
       raise Exception("Saved place not found")
       
-    place.delete()
+    with sync_changes(user):
+      place.delete()
     return DeleteSavedPlace(message="Saved place deleted successfully")
-  
+
+
+# 한 번의 일괄 요청으로 처리할 수 있는 최대 장소 수
+SAVED_PLACE_MAX_BATCH = 1000
+
+
+class SavedPlaceInput(graphene.InputObjectType):
+  place_id = graphene.String(required=True)
+  place_name = graphene.String(required=True)
+  address_name = graphene.String()
+  road_address_name = graphene.String()
+  road_address_name_en = graphene.String()
+  phone = graphene.String()
+  category_name = graphene.String()
+  category_name_en = graphene.String()
+  place_url = graphene.String()
+  category_group_code = graphene.String()
+  x = graphene.String()
+  y = graphene.String()
+  lat = graphene.String()
+  lng = graphene.String()
+
+
+class SavedPlaceResultType(graphene.ObjectType):
+  place_id = graphene.String()
+  ok = graphene.Boolean()
+  message = graphene.String()
+  place = graphene.Field(SavedPlaceType)
+
+
+class CreateSavedPlaces(graphene.Mutation):
+  class Arguments:
+    category_id = graphene.ID(required=True)
+    places = graphene.List(graphene.NonNull(SavedPlaceInput), required=True)
+
+  results = graphene.List(SavedPlaceResultType)
+  message = graphene.String()
+
+  @login_required
+  def mutate(self, info, category_id, places):
+    user = info.context.user
+
+    if len(places) > SAVED_PLACE_MAX_BATCH:
+      raise Exception(f"At most {SAVED_PLACE_MAX_BATCH} places can be saved at once")
+
+    try:
+      category = UserCategory.objects.get(id=category_id, user=user)
+    except UserCategory.DoesNotExist:
+      raise Exception("Category not found")
+
+    place_ids = list(dict.fromkeys(place.place_id for place in places))
+    existing = set(
+      SavedPlace.objects
+      .filter(category=category, place_id__in=place_ids)
+      .values_list('place_id', flat=True)
+    )
+    new_places = {}
+    for place in places:
+      if place.place_id not in existing:
+        new_places.setdefault(place.place_id, place)
+
+    with sync_changes(user) as version:
+      map_places = save_map_places([dict(place) for place in new_places.values()])
+      # bulk_create는 pre_save 시그널을 보내지 않으므로 좌표와 동기화 버전을 직접 채웁니다.
+      # 동시에 같은 장소를 저장한 요청이 있어도 (category, place_id) 유일 제약에 걸린 행만 건너뜁니다.
+      SavedPlace.objects.bulk_create([
+        geo.apply_coordinates(SavedPlace(category=category, place_id=map_place.place_id, map_place=map_place, version=version))
+        for map_place in map_places
+      ], batch_size=500, ignore_conflicts=True)
+    created = {
+      place.place_id: place
+      for place in SavedPlace.objects
+      .filter(category=category, place_id__in=[map_place.place_id for map_place in map_places], version=version)
+      .select_related('map_place')
+    }
+
+    # 결과는 입력과 같은 순서, 같은 개수입니다. 요청 안에서 반복된 장소는 처음 것만 저장하고 나머지는 실패로 표시합니다.
+    results = []
+    seen = set()
+    for place_id in (place.place_id for place in places):
+      if place_id in seen:
+        results.append(SavedPlaceResultType(
+          place_id=place_id, ok=False, message="This place appears more than once in the request"
+        ))
+        continue
+      seen.add(place_id)
+      if place_id in existing or place_id not in created:
+        results.append(SavedPlaceResultType(
+          place_id=place_id, ok=False, message="This place is already saved in this category"
+        ))
+      else:
+        results.append(SavedPlaceResultType(
+          place_id=place_id, ok=True, message="Place saved successfully", place=created[place_id]
+        ))
+
+    return CreateSavedPlaces(results=results, message=f"{len(created)} place(s) saved")
+
+
+class SavedPlaceIdResultType(graphene.ObjectType):
+  id = graphene.ID()
+  ok = graphene.Boolean()
+  message = graphene.String()
+
+
+def saved_place_ids(ids):
+  try:
+    ids = list(dict.fromkeys(int(id) for id in ids))
+  except ValueError:
+    raise Exception("Invalid saved place id")
+  if len(ids) > SAVED_PLACE_MAX_BATCH:
+    raise Exception(f"At most {SAVED_PLACE_MAX_BATCH} places can be processed at once")
+  return ids
+
+
+class MoveSavedPlaces(graphene.Mutation):
+  class Arguments:
+    ids = graphene.List(graphene.NonNull(graphene.ID), required=True)
+    new_category_id = graphene.ID(required=True)
+
+  results = graphene.List(SavedPlaceIdResultType)
+  message = graphene.String()
+
+  @login_required
+  def mutate(self, info, ids, new_category_id):
+    user = info.context.user
+    ids = saved_place_ids(ids)
+
+    try:
+      new_category = UserCategory.objects.get(id=new_category_id, user=user)
+    except UserCategory.DoesNotExist:
+      raise Exception("Target category not found")
+
+    with sync_changes(user) as version:
+      owned = {
+        id: (place_id, category_id)
+        for id, place_id, category_id in SavedPlace.objects
+        .filter(id__in=ids, category__user=user)
+        .values_list('id', 'place_id', 'category_id')
+      }
+      moving = {id: place_id for id, (place_id, category_id) in owned.items() if category_id != new_category.id}
+      # 대상 카테고리에 이미 있는 장소와, 옮기는 장소끼리 겹치는 장소는 옮기지 않습니다.
+      taken = set(
+        SavedPlace.objects
+        .filter(category=new_category, place_id__in=set(moving.values()))
+        .values_list('place_id', flat=True)
+      )
+      messages = {}
+      move_ids = []
+      for id in ids:
+        if id not in owned:
+          messages[id] = (False, "Saved place not found")
+        elif id not in moving:
+          messages[id] = (True, "Place is already in the target category")
+        elif moving[id] in taken:
+          messages[id] = (False, "This place already exists in the target category")
+        else:
+          taken.add(moving[id])
+          move_ids.append(id)
+          messages[id] = (True, "Place moved to different category successfully")
+
+      SavedPlace.objects.filter(id__in=move_ids).update(category=new_category, version=version)
+
+    return MoveSavedPlaces(
+      results=[SavedPlaceIdResultType(id=id, ok=ok, message=message) for id, (ok, message) in messages.items()],
+      message=f"{len(move_ids)} place(s) moved"
+    )
+
+
+class DeleteSavedPlaces(graphene.Mutation):
+  class Arguments:
+    ids = graphene.List(graphene.NonNull(graphene.ID), required=True)
+
+  results = graphene.List(SavedPlaceIdResultType)
+  message = graphene.String()
+
+  @login_required
+  def mutate(self, info, ids):
+    user = info.context.user
+    ids = saved_place_ids(ids)
+
+    with sync_changes(user):
+      places = SavedPlace.objects.filter(id__in=ids, category__user=user)
+      found_ids = set(places.values_list('id', flat=True))
+      SavedPlace.objects.filter(id__in=found_ids).delete()
+
+    return DeleteSavedPlaces(
+      results=[
+        SavedPlaceIdResultType(id=id, ok=True, message="Saved place deleted successfully") if id in found_ids
+        else SavedPlaceIdResultType(id=id, ok=False, message="Saved place not found")
+        for id in ids
+      ],
+      message=f"{len(found_ids)} place(s) deleted"
+    )
+
 
 class CreatePlaceInfoChangeRequest(graphene.Mutation):
   class Arguments:
@@ -630,72 +903,92 @@ class RejectPlaceInfoChangeRequest(graphene.Mutation):
       message="Place info change request rejected successfully"
     )
 
+class ReviewImageUploadType(graphene.ObjectType):
+  key = graphene.String()
+  url = graphene.String()
+  fields = GenericScalar()  # url로 POST할 때 파일과 함께 보낼 form 필드
+  content_type = graphene.String()
+  expires_in = graphene.Int()
+
+
+class CreateReviewImageUploadUrls(graphene.Mutation):
+  class Arguments:
+    place_info_id = graphene.ID(required=True)
+    content_types = graphene.List(graphene.String, required=True)
+
+  uploads = graphene.List(ReviewImageUploadType)
+  message = graphene.String()
+
+  @login_required
+  def mutate(self, info, place_info_id, content_types):
+    user = info.context.user
+
+    if not PlaceInfo.objects.filter(id=place_info_id).exists():
+      raise Exception("Place info not found")
+
+    uploads = create_review_upload_urls(place_info_id, user.id, content_types)
+    return CreateReviewImageUploadUrls(uploads=uploads, message="Upload URLs created successfully")
+
+
+class ImageUploadFailureType(graphene.ObjectType):
+  index = graphene.Int()
+  message = graphene.String()
+
+
 class CreatePlaceReview(graphene.Mutation):
     class Arguments:
         place_info_id = graphene.ID(required=True)
         text = graphene.String(required=True)
         rating = graphene.Int(required=True)
         images = graphene.List(graphene.String)  # Base64 인코딩된 이미지 데이터 배열
+        image_keys = graphene.List(graphene.String)  # createReviewImageUploadUrls로 직접 업로드한 S3 객체 키
 
     review = graphene.Field(PlaceReviewByUserType)
+    failed_images = graphene.List(ImageUploadFailureType)
     message = graphene.String()
 
     @login_required
-    def mutate(self, info, place_info_id, text, rating, images=None):
+    async def mutate(self, info, place_info_id, text, rating, images=None, image_keys=None):
         user = info.context.user
         
         try:
-            place_info = PlaceInfo.objects.get(id=place_info_id)
+            place_info = await PlaceInfo.objects.aget(id=place_info_id)
         except PlaceInfo.DoesNotExist:
             raise Exception("Place info not found")
         
+        validate_rating(rating)
+
+        if len(images or []) + len(image_keys or []) > REVIEW_IMAGE_MAX_COUNT:
+            raise Exception(f"A review can have at most {REVIEW_IMAGE_MAX_COUNT} images")
+
         image_urls = []
+        failed_images = []
+
+        if image_keys:
+            image_urls = await verify_review_image_keys(place_info_id, user.id, image_keys)
         
         if images:
-            s3_client = boto3.client(
-                's3',
-                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                region_name=settings.AWS_S3_REGION_NAME
-            )
-            
-            for i, image_data in enumerate(images[:4]):
-                try:
-                    if ',' in image_data:
-                        format_data, imgstr = image_data.split(';base64,')
-                        ext = format_data.split('/')[-1]
-                    else:
-                        imgstr = image_data
-                        ext = 'jpeg'
-                    
-                    data = BytesIO(base64.b64decode(imgstr))
-                    
-                    filename = f"reviews/{place_info_id}/{user.id}/{uuid.uuid4()}.{ext}"
-                    
-                    s3_client.upload_fileobj(
-                        data, 
-                        settings.AWS_STORAGE_BUCKET_NAME, 
-                        filename,
-                        ExtraArgs={'ContentType': f'image/{ext}'}
-                    )
-                    
-                    url = f"https://{settings.AWS_S3_CUSTOM_DOMAIN}/{filename}"
-                    image_urls.append(url)
-                    
-                except Exception as e:
-                    continue
+            # 이미지들을 스레드 풀에서 동시에 업로드하고, 실패한 이미지는 응답으로 알려줍니다.
+            uploaded_urls, failed_images = await upload_review_images(place_info_id, user.id, images)
+            image_urls += uploaded_urls
         
-        review = PlaceReviewByUser.objects.create(
+        review = await PlaceReviewByUser.objects.acreate(
             user=user,
             place_info=place_info,
+            place_id=place_info.place_id,
             text=text,
             images=image_urls if image_urls else None,
             rating=rating
         )
+
+        if image_urls:
+            schedule_review_image_processing(review.id)
         
         return CreatePlaceReview(
             review=review, 
-            message="Review created successfully"
+            failed_images=failed_images,
+            message="Review created successfully" if not failed_images
+            else f"Review created, but {len(failed_images)} image(s) failed to upload"
         )
     
 class DeletePlaceReview(graphene.Mutation):
@@ -793,22 +1086,156 @@ class RejectPlaceInfoReviewByUserReport(graphene.Mutation):
     
     return RejectPlaceInfoReviewByUserReport(message="User report rejected successfully")
 
+MODERATION_MAX_IDS = 5000
+
+
+class ModerationResultType(graphene.ObjectType):
+  id = graphene.ID()
+  ok = graphene.Boolean()
+  message = graphene.String()
+
+
+def moderation_ids(user, ids, action):
+  if not user.is_staff:
+    raise Exception(f"You are not authorized to {action}")
+  try:
+    ids = list(dict.fromkeys(int(id) for id in ids))
+  except ValueError:
+    raise Exception("Invalid id")
+  if len(ids) > MODERATION_MAX_IDS:
+    raise Exception(f"At most {MODERATION_MAX_IDS} ids can be processed at once")
+  return ids
+
+
+def moderation_results(ids, found_ids, message, not_found_message):
+  return [
+    ModerationResultType(id=id, ok=True, message=message) if id in found_ids
+    else ModerationResultType(id=id, ok=False, message=not_found_message)
+    for id in ids
+  ]
+
+
+class BulkApprovePlaceInfoChangeRequests(graphene.Mutation):
+  class Arguments:
+    ids = graphene.List(graphene.NonNull(graphene.ID), required=True)
+
+  results = graphene.List(ModerationResultType)
+  message = graphene.String()
+
+  @login_required
+  def mutate(self, info, ids):
+    ids = moderation_ids(info.context.user, ids, "approve place info change requests")
+
+    with transaction.atomic():
+      requests = PlaceInfoChangeRequest.objects.filter(id__in=ids)
+      found_ids = set(requests.values_list('id', flat=True))
+      place_info_ids = set(requests.values_list('place_info_id', flat=True))
+
+      # 같은 PlaceInfo에 여러 요청이 있으면 가장 나중 요청의 값을 적용합니다.
+      latest_value = (
+        PlaceInfoChangeRequest.objects
+        .filter(place_info=OuterRef('pk'), id__in=found_ids)
+        .order_by('-id')
+        .values('new_value')[:1]
+      )
+      PlaceInfo.objects.filter(id__in=place_info_ids).update(menu_or_ticket_info=Subquery(latest_value))
+      requests.update(is_approved=True)
+
+      # update()는 post_save를 보내지 않으므로 바뀐 메뉴를 검색 색인에 직접 반영합니다.
+      index_place_infos(PlaceInfo.objects.filter(id__in=place_info_ids))
+
+    return BulkApprovePlaceInfoChangeRequests(
+      results=moderation_results(ids, found_ids, "Approved", "Place info change request not found"),
+      message=f"{len(found_ids)} place info change request(s) approved"
+    )
+
+
+class BulkRejectPlaceInfoChangeRequests(graphene.Mutation):
+  class Arguments:
+    ids = graphene.List(graphene.NonNull(graphene.ID), required=True)
+
+  results = graphene.List(ModerationResultType)
+  message = graphene.String()
+
+  @login_required
+  def mutate(self, info, ids):
+    ids = moderation_ids(info.context.user, ids, "reject place info change requests")
+
+    with transaction.atomic():
+      requests = PlaceInfoChangeRequest.objects.filter(id__in=ids)
+      found_ids = set(requests.values_list('id', flat=True))
+      requests.delete()
+
+    return BulkRejectPlaceInfoChangeRequests(
+      results=moderation_results(ids, found_ids, "Rejected", "Place info change request not found"),
+      message=f"{len(found_ids)} place info change request(s) rejected"
+    )
+
+
+class BulkApprovePlaceInfoReviewByUserReports(graphene.Mutation):
+  class Arguments:
+    ids = graphene.List(graphene.NonNull(graphene.ID), required=True)
+
+  results = graphene.List(ModerationResultType)
+  message = graphene.String()
+
+  @login_required
+  def mutate(self, info, ids):
+    ids = moderation_ids(info.context.user, ids, "approve place info review by user reports")
+
+    with transaction.atomic(), deferred_rating_updates():
+      reports = PlaceInfoReviewByUserReport.objects.filter(id__in=ids)
+      found_ids = set(reports.values_list('id', flat=True))
+      review_ids = set(reports.exclude(place_review=None).values_list('place_review_id', flat=True))
+
+      reports.update(is_approved=True, place_review=None)
+      # 신고된 리뷰를 한 번에 삭제하고, 별점 집계는 영향받은 장소만 블록이 끝날 때 다시 계산합니다.
+      PlaceReviewByUser.objects.filter(id__in=review_ids).delete()
+
+    return BulkApprovePlaceInfoReviewByUserReports(
+      results=moderation_results(ids, found_ids, "Approved", "Place info review by user report not found"),
+      message=f"{len(found_ids)} report(s) approved, {len(review_ids)} review(s) deleted"
+    )
+
+
+class BulkRejectPlaceInfoReviewByUserReports(graphene.Mutation):
+  class Arguments:
+    ids = graphene.List(graphene.NonNull(graphene.ID), required=True)
+
+  results = graphene.List(ModerationResultType)
+  message = graphene.String()
+
+  @login_required
+  def mutate(self, info, ids):
+    ids = moderation_ids(info.context.user, ids, "reject place info review by user reports")
+
+    with transaction.atomic():
+      reports = PlaceInfoReviewByUserReport.objects.filter(id__in=ids)
+      found_ids = set(reports.values_list('id', flat=True))
+      reports.delete()
+
+    return BulkRejectPlaceInfoReviewByUserReports(
+      results=moderation_results(ids, found_ids, "Rejected", "Place info review by user report not found"),
+      message=f"{len(found_ids)} report(s) rejected"
+    )
+
 class GetPlaceInfoTranslated(graphene.Mutation):
   class Arguments:
     name = graphene.String(required=True)
     language = graphene.String(required=True)
     address = graphene.String()
+    place_id = graphene.String()  # 카카오맵 장소 id
 
   place = graphene.Field(PlaceInfoType)
 
-  def mutate(self, info, name, language, address=None):
+  async def mutate(self, info, name, language, address=None, place_id=None):
     if not name or not language:
       raise Exception('Missing name or language')
     
-    PlaceLog.objects.create(name=name, address=address, language=language)
+    await PlaceLog.objects.acreate(name=name, address=address, language=language)
 
     try:
-      place = PlaceInfo.objects.get(name=name, address=address, language=language)
+      place = await aget_place_info(name, address, language, place_id)
       return GetPlaceInfoTranslated(place=place)
 
     except PlaceInfo.DoesNotExist:
@@ -867,7 +1294,7 @@ class GetPlaceInfoTranslated(graphene.Mutation):
       max_retries = 3
       for attempt in range(max_retries):
         try:
-          response = client.chat.completions.create(
+          response = await get_openai_client().chat.completions.create(
             model="sonar",
             messages=messages
           )
@@ -909,30 +1336,36 @@ class GetPlaceInfoTranslated(graphene.Mutation):
           if language != 'ko' and language != '한국어' and language != 'KR':
             target_lang = get_deepl_language_code(language)
             
+            # title, category, 메뉴 이름, 리뷰를 한 번의 DeepL 요청으로 번역
+            menu = data.get("menu") or []
+            reviews = data.get("reviews") or []
+            texts = [data.get("title") or "", data.get("category") or ""]
+            texts += [menu_item["name"] for menu_item in menu]
+            texts += list(reviews)
+            translated = await deepl_translate_many(texts, source_lang='KO', target_lang=target_lang)
+
             if data.get("title"):
-              data["title"] = deepl_translate(data["title"], source_lang='KO', target_lang=target_lang)
+              data["title"] = translated[0]
             
             if data.get("category"):
-              data["category"] = deepl_translate(data["category"], source_lang='KO', target_lang=target_lang)
+              data["category"] = translated[1]
             
-            if data.get("menu"):
-              translated_menu = []
-              for menu_item in data["menu"]:
-                translated_name = deepl_translate(menu_item["name"], source_lang='KO', target_lang=target_lang)
-                translated_menu.append({"name": translated_name, "price": menu_item["price"]})
-              data["menu"] = translated_menu
+            if menu:
+              translated_names = translated[2:2 + len(menu)]
+              data["menu"] = [
+                {"name": translated_name, "price": menu_item["price"]}
+                for translated_name, menu_item in zip(translated_names, menu)
+              ]
             
-            if data.get("reviews"):
-              translated_reviews = []
-              for review in data["reviews"]:
-                translated_review = deepl_translate(review, source_lang='KO', target_lang=target_lang)
-                translated_reviews.append(translated_review)
-              data["reviews"] = translated_reviews
-
-          place = PlaceInfo.objects.create(
+            if reviews:
+              data["reviews"] = translated[2 + len(menu):]
+
+          place = await PlaceInfo.objects.acreate(
+            place=await aget_or_create_place(name, address, place_id),
+            lookup_key=place_info_lookup_key(name, address, language),
             name=name,
             address=address,
-            language=language,
+            language=canonical_language(language),
             title=data.get("title"),
             category=data.get("category"),
             menu_or_ticket_info=data.get("menu"),
@@ -945,7 +1378,7 @@ class GetPlaceInfoTranslated(graphene.Mutation):
         except Exception as e:
           if "<html" in str(e) and attempt < max_retries - 1:
             print(f"Attempt {attempt+1} failed, retrying...")
-            time.sleep(2 * (attempt + 1))  # 지수 백오프
+            await asyncio.sleep(2 * (attempt + 1))  # 지수 백오프
           else:
             raise  # 모든 재시도 실패 또는 다른 오류
 
@@ -954,19 +1387,20 @@ class GetPlaceInfoKorean(graphene.Mutation):
     name = graphene.String(required=True)
     address = graphene.String()
     language = graphene.String()
+    place_id = graphene.String()  # 카카오맵 장소 id
 
   place = graphene.Field(PlaceInfoType)
 
-  def mutate(self, info, name, address=None, language=None):
+  async def mutate(self, info, name, address=None, language=None, place_id=None):
     if not name:
       raise Exception('Missing name')
     
     if not language:
       language = '한국어'
-    PlaceLog.objects.create(name=name, address=address, language=language)
+    await PlaceLog.objects.acreate(name=name, address=address, language=language)
 
     try:
-      place = PlaceInfo.objects.get(name=name, address=address, language=language)
+      place = await aget_place_info(name, address, language, place_id)
       return GetPlaceInfoKorean(place=place)
 
     except PlaceInfo.DoesNotExist:
@@ -1025,7 +1459,7 @@ class GetPlaceInfoKorean(graphene.Mutation):
       max_retries = 3
       for attempt in range(max_retries):
         try:
-          response = client.chat.completions.create(
+          response = await get_openai_client().chat.completions.create(
             model="sonar",
             messages=messages
           )
@@ -1064,10 +1498,12 @@ class GetPlaceInfoKorean(graphene.Mutation):
             else:
               raise Exception(f"Could not parse valid JSON from Perplexity response. {content}")
 
-          place = PlaceInfo.objects.create(
+          place = await PlaceInfo.objects.acreate(
+            place=await aget_or_create_place(name, address, place_id),
+            lookup_key=place_info_lookup_key(name, address, language),
             name=name,
             address=address,
-            language=language,
+            language=canonical_language(language),
             title=data.get("title"),
             category=data.get("category"),
             menu_or_ticket_info=data.get("menu"),
@@ -1080,7 +1516,7 @@ class GetPlaceInfoKorean(graphene.Mutation):
         except Exception as e:
           if "<html" in str(e) and attempt < max_retries - 1:
             print(f"Attempt {attempt+1} failed, retrying...")
-            time.sleep(2 * (attempt + 1))  # 지수 백오프
+            await asyncio.sleep(2 * (attempt + 1))  # 지수 백오프
           else:
             raise  # 모든 재시도 실패 또는 다른 오류
 
@@ -1093,7 +1529,7 @@ class TranslateText(graphene.Mutation):
   translated_text = graphene.String()
   message = graphene.String()
 
-  def mutate(self, info, text, target_language):
+  async def mutate(self, info, text, target_language):
     if not text or not target_language:
       raise Exception("Missing 'text' or 'target_language' field")
 
@@ -1102,7 +1538,7 @@ class TranslateText(graphene.Mutation):
       target_lang_code = get_deepl_language_code(target_language)
       
       # 항상 한국어에서 대상 언어로 번역
-      translated = deepl_translate(text, source_lang='KO', target_lang=target_lang_code)
+      translated = await deepl_translate(text, source_lang='KO', target_lang=target_lang_code)
       
       return TranslateText(
         translated_text=translated,
@@ -1130,18 +1566,31 @@ class Mutation(graphene.ObjectType):
   update_saved_place = UpdateSavedPlace.Field()
   move_saved_place = MoveSavedPlace.Field()
   delete_saved_place = DeleteSavedPlace.Field()
+  create_saved_places = CreateSavedPlaces.Field()
+  move_saved_places = MoveSavedPlaces.Field()
+  delete_saved_places = DeleteSavedPlaces.Field()
 
   create_place_info_change_request = CreatePlaceInfoChangeRequest.Field()
   approve_place_info_change_request = ApprovePlaceInfoChangeRequest.Field()
   reject_place_info_change_request = RejectPlaceInfoChangeRequest.Field()
+  bulk_approve_place_info_change_requests = BulkApprovePlaceInfoChangeRequests.Field()
+  bulk_reject_place_info_change_requests = BulkRejectPlaceInfoChangeRequests.Field()
 
+  create_review_image_upload_urls = CreateReviewImageUploadUrls.Field()
   create_place_review = CreatePlaceReview.Field()
   delete_place_review = DeletePlaceReview.Field()
   create_place_info_review_by_user_report = CreatePlaceInfoReviewByUserReport.Field()
   approve_place_info_review_by_user_report = ApprovePlaceInfoReviewByUserReport.Field()
   reject_place_info_review_by_user_report = RejectPlaceInfoReviewByUserReport.Field()
+  bulk_approve_place_info_review_by_user_reports = BulkApprovePlaceInfoReviewByUserReports.Field()
+  bulk_reject_place_info_review_by_user_reports = BulkRejectPlaceInfoReviewByUserReports.Field()
 
 '''query'''
+# placeReviews 한 페이지의 리뷰 수. 최대값은 한 페이지를 DeepL 요청 한 번으로 번역할 수 있는 수입니다.
+PLACE_REVIEWS_PAGE_SIZE = 20
+PLACE_REVIEWS_MAX_PAGE_SIZE = DEEPL_MAX_TEXTS
+
+
 class Query(graphene.ObjectType):
   place_info_by_name = graphene.Field(
     PlaceInfoType,
@@ -1162,22 +1611,53 @@ class Query(graphene.ObjectType):
     category_id=graphene.ID(required=True)
   )
   saved_place = graphene.Field(SavedPlaceType, id=graphene.ID(required=True))
+  sync_saved_places = graphene.Field(SavedPlaceChangesType, since=graphene.Int())
+  saved_places_in_bounds = graphene.List(
+    SavedPlaceType,
+    min_lat=graphene.Float(required=True),
+    min_lng=graphene.Float(required=True),
+    max_lat=graphene.Float(required=True),
+    max_lng=graphene.Float(required=True)
+  )
+  saved_place_clusters = graphene.List(
+    SavedPlaceClusterType,
+    min_lat=graphene.Float(required=True),
+    min_lng=graphene.Float(required=True),
+    max_lat=graphene.Float(required=True),
+    max_lng=graphene.Float(required=True),
+    zoom=graphene.Int(required=True)
+  )
+  nearest_saved_places = graphene.List(
+    NearbySavedPlaceType,
+    lat=graphene.Float(required=True),
+    lng=graphene.Float(required=True),
+    k=graphene.Int()
+  )
 
   place_info_change_requests = graphene.List(PlaceInfoChangeRequestType)
 
   place_reviews = graphene.List(
     PlaceReviewByUserType, 
-    place_info_id=graphene.ID(required=True)
+    place_info_id=graphene.ID(required=True),
+    language=graphene.String(),
+    first=graphene.Int(description=f"가져올 리뷰 수 (기본값 {PLACE_REVIEWS_PAGE_SIZE}, 최대 {PLACE_REVIEWS_MAX_PAGE_SIZE})"),
+    offset=graphene.Int(description="건너뛸 리뷰 수 (최신순)")
   )
 
   place_reviews_by_user = graphene.List(PlaceReviewByUserType)
 
+  search_places = graphene.List(
+    PlaceSearchResultType,
+    query=graphene.String(required=True),
+    language=graphene.String(),
+    limit=graphene.Int()
+  )
+
   user_reports = graphene.List(PlaceInfoReviewByUserReportType)
 
   @login_required
   def resolve_user_categories(self, info):
-    user = info.context.user
-    return UserCategory.objects.filter(user=user).order_by('id')
+    return category_tree(info.context.user)
   
   @login_required
   def resolve_user_category(self, info, id):
@@ -1192,7 +1672,7 @@ class Query(graphene.ObjectType):
     user = info.context.user
     try:
       category = UserCategory.objects.get(id=category_id, user=user)
-      return SavedPlace.objects.filter(category=category).order_by('-created_at')
+      return SavedPlace.objects.filter(category=category).select_related('map_place').order_by('-created_at')
     except UserCategory.DoesNotExist:
       return []
   
@@ -1200,17 +1680,48 @@ class Query(graphene.ObjectType):
   def resolve_saved_place(self, info, id):
     user = info.context.user
     try:
-      return SavedPlace.objects.get(id=id, category__user=user)
+      return SavedPlace.objects.select_related('map_place').get(id=id, category__user=user)
     except SavedPlace.DoesNotExist:
       return None
 
+  @login_required
+  def resolve_sync_saved_places(self, info, since=None):
+    return SavedPlaceChangesType(**changes_since(info.context.user, since))
+
+  @login_required
+  def resolve_saved_places_in_bounds(self, info, min_lat, min_lng, max_lat, max_lng):
+    user = info.context.user
+    return geo.in_bounds(
+      SavedPlace.objects.filter(category__user=user).select_related('map_place'),
+      min_lat, min_lng, max_lat, max_lng
+    )
+
+  @login_required
+  def resolve_saved_place_clusters(self, info, min_lat, min_lng, max_lat, max_lng, zoom):
+    user = info.context.user
+    return [
+      SavedPlaceClusterType(**cluster)
+      for cluster in clusters(user, min_lat, min_lng, max_lat, max_lng, zoom)
+    ]
+
+  @login_required
+  def resolve_nearest_saved_places(self, info, lat, lng, k=10):
+    user = info.context.user
+    k = max(1, min(k, 100))
+    return [
+      NearbySavedPlaceType(place=place, distance=distance)
+      for distance, place in geo.nearest(
+        SavedPlace.objects.filter(category__user=user).select_related('map_place'), lat, lng, k
+      )
+    ]
+
   def resolve_place_info_by_name(self, info, name, address):
     try:
       return PlaceInfo.objects.get(name=name, address=address)
     except PlaceInfo.DoesNotExist:
       return None
 
-  def resolve_get_place_info_by_name(self, info, name, address, language):
+  async def resolve_get_place_info_by_name(self, info, name, address, language):
     prompt = """
       당신은 한국 방문 관광객을 위한 맛집 안내 AI입니다.
       아래의 장소에 대해서 당신이 제공해야 할 것은 종류(장소라면 종류, 식당이라면 음식 종류), 메뉴(장소라면 티켓 정보, 식당이라면 음식)와 가격, 리뷰입니다.
@@ -1245,7 +1756,7 @@ class Query(graphene.ObjectType):
       },
     ]
 
-    response = client.chat.completions.create(
+    response = await get_openai_client().chat.completions.create(
       model="sonar",
       messages=messages
     )
@@ -1260,15 +1771,31 @@ class Query(graphene.ObjectType):
     
     return PlaceInfoChangeRequest.objects.all().order_by('id')
 
-  def resolve_place_reviews(self, info, place_info_id):
+  def resolve_place_reviews(self, info, place_info_id, language=None, first=PLACE_REVIEWS_PAGE_SIZE, offset=0):
     try:
         place_info = PlaceInfo.objects.filter(id=place_info_id).first()
         if not place_info:
             return []
-        return PlaceReviewByUser.objects.filter(place_info__name=place_info.name).order_by('-created_at')
+        # 같은 장소의 모든 언어별 PlaceInfo에 달린 리뷰를 장소 외래키 하나로 조회합니다.
+        if place_info.place_id is None:
+            reviews = PlaceReviewByUser.objects.filter(place_info=place_info).order_by('-created_at')
+        else:
+            reviews = PlaceReviewByUser.objects.filter(place_id=place_info.place_id).order_by('-created_at')
     except Exception:
         return []
+
+    first = max(1, min(first or PLACE_REVIEWS_PAGE_SIZE, PLACE_REVIEWS_MAX_PAGE_SIZE))
+    offset = max(offset or 0, 0)
+    reviews = reviews[offset:offset + first]
+    if not language:
+        return reviews
+    # 번역은 이벤트 루프에서 DeepL을 호출하는 코루틴으로 반환합니다. 이 페이지의 리뷰만 번역합니다.
+    return translate_reviews(list(reviews), language)
     
+  def resolve_search_places(self, info, query, language=None, limit=20):
+    results = search_places(query, language, max(1, min(limit, 50)))
+    return [PlaceSearchResultType(place_info=place_info, score=score) for place_info, score in results]
+
   @login_required
   def resolve_place_reviews_by_user(self, info):
     user = info.context.user
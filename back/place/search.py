@@ -0,0 +1,172 @@
+import math
+import re
+import unicodedata
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Sum, Value, When
+
+from back.place.places import canonical_language
+
+WORD_RE = re.compile(r'\w+')
+MAX_QUERY_TERMS = 64
+
+# 필드별 가중치: 장소 이름과 종류에 나온 단어가 리뷰 본문보다 관련도가 높습니다.
+TITLE_WEIGHT = 3.0
+CATEGORY_WEIGHT = 2.0
+MENU_WEIGHT = 2.0
+REVIEW_WEIGHT = 1.0
+
+
+def tokenize(text):
+  """
+  텍스트를 단어별 bigram으로 나눕니다. 한국어는 띄어쓰기와 조사가 일정하지 않으므로 형태소 분석 대신
+  글자 단위 n-gram을 씁니다 ('삼겹살' -> '삼겹', '겹살'). 한 글자 단어는 그대로 씁니다.
+  """
+  text = unicodedata.normalize('NFKC', text or '').casefold()
+  terms = []
+  for word in WORD_RE.findall(text):
+    if len(word) == 1:
+      terms.append(word)
+    else:
+      terms.extend(word[i:i + 2] for i in range(len(word) - 1))
+  return terms
+
+
+def weigh(fields):
+  """
+  (텍스트, 가중치) 목록에서 term별 가중치를 구합니다. 같은 term이 여러 번 나와도 로그로 완만하게 늘어납니다.
+  """
+  weights = Counter()
+  for text, field_weight in fields:
+    for term, count in Counter(tokenize(text)).items():
+      weights[term] += field_weight * (1 + math.log(count))
+  return weights
+
+
+def place_info_fields(place_info):
+  fields = [(place_info.title, TITLE_WEIGHT), (place_info.name, TITLE_WEIGHT), (place_info.category, CATEGORY_WEIGHT)]
+  for item in place_info.menu_or_ticket_info or []:
+    if isinstance(item, dict):
+      fields.append((str(item.get('name') or ''), MENU_WEIGHT))
+  for review in place_info.translated_reviews or []:
+    fields.append((str(review), REVIEW_WEIGHT))
+  return fields
+
+
+def replace_terms(source, weights, **document):
+  from back.place.models import PlaceSearchTerm
+
+  with transaction.atomic():
+    PlaceSearchTerm.objects.filter(**{source: document[source]}).delete()
+    PlaceSearchTerm.objects.bulk_create([
+      PlaceSearchTerm(term=term, weight=weight, **document)
+      for term, weight in weights.items()
+    ], batch_size=1000)
+
+
+def index_place_info(place_info):
+  if place_info.place_id is None:
+    return
+  replace_terms('place_info', weigh(place_info_fields(place_info)), place_id=place_info.place_id, place_info=place_info)
+
+
+def index_place_infos(place_infos):
+  """
+  여러 PlaceInfo를 삭제 한 번과 bulk_create로 다시 색인합니다. update()로 한꺼번에 바꾼 뒤에 씁니다.
+  """
+  from back.place.models import PlaceSearchTerm
+
+  place_infos = [place_info for place_info in place_infos if place_info.place_id is not None]
+  with transaction.atomic():
+    PlaceSearchTerm.objects.filter(place_info__in=[place_info.id for place_info in place_infos]).delete()
+    PlaceSearchTerm.objects.bulk_create([
+      PlaceSearchTerm(term=term, weight=weight, place_id=place_info.place_id, place_info=place_info)
+      for place_info in place_infos
+      for term, weight in weigh(place_info_fields(place_info)).items()
+    ], batch_size=1000)
+
+
+def index_review(review):
+  if review.place_id is None:
+    return
+  replace_terms('review', weigh([(review.text, REVIEW_WEIGHT)]), place_id=review.place_id, review=review)
+
+
+def place_info_saved(sender, instance, raw=False, **kwargs):
+  if not raw:
+    index_place_info(instance)
+
+
+def review_saved(sender, instance, raw=False, **kwargs):
+  if not raw:
+    index_review(instance)
+
+
+def rebuild_search_index():
+  """
+  모든 PlaceInfo와 리뷰를 다시 색인합니다. 처음 도입할 때나 색인이 어긋났을 때만 사용합니다.
+  """
+  from back.place.models import PlaceInfo, PlaceReviewByUser
+
+  count = 0
+  for place_info in PlaceInfo.objects.filter(place__isnull=False).iterator():
+    index_place_info(place_info)
+    count += 1
+  for review in PlaceReviewByUser.objects.filter(place__isnull=False).only('id', 'place_id', 'text').iterator():
+    index_review(review)
+    count += 1
+  return count
+
+
+def search_places(query, language=None, limit=20):
+  """
+  검색어의 bigram이 많이 일치하는 장소 순으로, 같은 비율이면 idf를 곱한 가중치 합이 큰 순으로 정렬해
+  (PlaceInfo, 점수) 목록을 반환합니다. PlaceInfo는 요청한 언어가 있으면 그 언어, 없으면 먼저 만들어진 것입니다.
+  """
+  from back.place.models import PlaceInfo, PlaceSearchTerm
+
+  terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+  if not terms:
+    return []
+
+  total_places = PlaceInfo.objects.filter(place__isnull=False).values('place').distinct().count() or 1
+  document_frequency = dict(
+    PlaceSearchTerm.objects
+    .filter(term__in=terms)
+    .values_list('term')
+    .annotate(places=Count('place', distinct=True))
+  )
+  idf = {
+    term: math.log(1 + total_places / document_frequency[term])
+    for term in terms if term in document_frequency
+  }
+  if not idf:
+    return []
+
+  ranked = list(
+    PlaceSearchTerm.objects
+    .filter(term__in=idf.keys())
+    .values('place')
+    .annotate(
+      matched=Count('term', distinct=True),
+      score=Sum(
+        Case(*[When(term=term, then=F('weight') * Value(value)) for term, value in idf.items()],
+             output_field=FloatField())
+      )
+    )
+    .order_by('-matched', '-score')[:limit]
+  )
+
+  place_ids = [row['place'] for row in ranked]
+  language = canonical_language(language) if language else None
+  place_infos = {}
+  for place_info in PlaceInfo.objects.filter(place_id__in=place_ids).order_by('id'):
+    current = place_infos.get(place_info.place_id)
+    if current is None or (place_info.language == language and current.language != language):
+      place_infos[place_info.place_id] = place_info
+
+  return [
+    (place_infos[row['place']], row['score'] * row['matched'] / len(terms))
+    for row in ranked if row['place'] in place_infos
+  ]
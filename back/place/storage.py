@@ -0,0 +1,202 @@
+import asyncio
+import base64
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+
+from back.common.profiling import record_timing
+
+REVIEW_IMAGE_MAX_COUNT = 4
+REVIEW_IMAGE_MAX_BYTES = getattr(settings, 'REVIEW_IMAGE_MAX_BYTES', 10 * 1024 * 1024)
+REVIEW_UPLOAD_URL_EXPIRES = getattr(settings, 'REVIEW_UPLOAD_URL_EXPIRES', 600)
+S3_MAX_POOL_CONNECTIONS = getattr(settings, 'S3_MAX_POOL_CONNECTIONS', 32)
+S3_UPLOAD_WORKERS = getattr(settings, 'S3_UPLOAD_WORKERS', 16)
+REVIEW_IMAGE_CONTENT_TYPES = {
+  'image/jpeg': 'jpeg',
+  'image/jpg': 'jpeg',
+  'image/png': 'png',
+  'image/webp': 'webp',
+  'image/gif': 'gif',
+  'image/heic': 'heic',
+}
+
+
+_s3_client = None
+_upload_executor = None
+_lock = threading.Lock()
+
+
+def get_s3_client():
+  """
+  프로세스 전체에서 공유하는 S3 클라이언트. boto3 클라이언트는 스레드 안전하므로 처음 사용할 때 한 번만 만들고,
+  업로드 스레드 수만큼 커넥션을 재사용할 수 있도록 커넥션 풀 크기를 늘려 둡니다.
+  """
+  global _s3_client
+  if _s3_client is None:
+    with _lock:
+      if _s3_client is None:
+        import boto3
+        from botocore.config import Config
+
+        _s3_client = boto3.client(
+          's3',
+          aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+          aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+          region_name=settings.AWS_S3_REGION_NAME,
+          # 로컬 S3 호환 서버(MinIO 등)로 테스트할 때 지정합니다.
+          endpoint_url=getattr(settings, 'AWS_S3_ENDPOINT_URL', None),
+          config=Config(
+            max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+            retries={'max_attempts': 3, 'mode': 'standard'},
+            connect_timeout=5,
+            read_timeout=30
+          )
+        )
+  return _s3_client
+
+
+def get_upload_executor():
+  """
+  S3 업로드, HEAD 요청에 쓰는 크기 제한 스레드 풀. 워커 안에서 처음 사용할 때 만들어집니다.
+  """
+  global _upload_executor
+  if _upload_executor is None:
+    with _lock:
+      if _upload_executor is None:
+        _upload_executor = ThreadPoolExecutor(max_workers=S3_UPLOAD_WORKERS, thread_name_prefix='s3')
+  return _upload_executor
+
+
+async def run_in_upload_executor(func, *args):
+  loop = asyncio.get_running_loop()
+  return await loop.run_in_executor(get_upload_executor(), func, *args)
+
+
+REVIEW_IMAGE_ROOT = 'reviews/'
+
+
+def review_image_prefix(place_info_id, user_id):
+  return f"{REVIEW_IMAGE_ROOT}{place_info_id}/{user_id}/"
+
+
+def review_image_url(key):
+  return f"https://{settings.AWS_S3_CUSTOM_DOMAIN}/{key}"
+
+
+def create_review_upload_urls(place_info_id, user_id, content_types):
+  """
+  클라이언트가 S3에 직접 업로드할 수 있도록 reviews/{place_info_id}/{user_id}/ 아래의 presigned POST를 발급합니다.
+  url로 fields를 모두 담은 multipart/form-data를 보내고 파일은 마지막 file 필드에 넣어야 합니다. 정책 조건으로
+  Content-Type과 REVIEW_IMAGE_MAX_BYTES 이하의 크기를 S3가 업로드 시점에 검사합니다.
+  """
+  if not content_types:
+    raise Exception("At least one content type is required")
+  if len(content_types) > REVIEW_IMAGE_MAX_COUNT:
+    raise Exception(f"A review can have at most {REVIEW_IMAGE_MAX_COUNT} images")
+
+  s3_client = get_s3_client()
+  prefix = review_image_prefix(place_info_id, user_id)
+  uploads = []
+
+  for content_type in content_types:
+    ext = REVIEW_IMAGE_CONTENT_TYPES.get((content_type or '').lower())
+    if ext is None:
+      raise Exception(f"Unsupported image type: {content_type}")
+
+    key = f"{prefix}{uuid.uuid4()}.{ext}"
+    # presigned PUT은 크기를 제한할 수 없으므로 content-length-range 조건을 둘 수 있는 POST 정책을 씁니다.
+    post = s3_client.generate_presigned_post(
+      Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+      Key=key,
+      Fields={'Content-Type': content_type},
+      Conditions=[
+        {'Content-Type': content_type},
+        ['content-length-range', 1, REVIEW_IMAGE_MAX_BYTES],
+      ],
+      ExpiresIn=REVIEW_UPLOAD_URL_EXPIRES
+    )
+    uploads.append({
+      'key': key,
+      'url': post['url'],
+      'fields': post['fields'],
+      'content_type': content_type,
+      'expires_in': REVIEW_UPLOAD_URL_EXPIRES,
+    })
+
+  return uploads
+
+
+def head_review_image(prefix, key):
+  from botocore.exceptions import ClientError
+
+  if not key.startswith(prefix) or '..' in key:
+    raise Exception(f"Invalid image key: {key}")
+
+  try:
+    with record_timing('s3.head_object'):
+      head = get_s3_client().head_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=key)
+  except ClientError:
+    raise Exception(f"Uploaded image not found: {key}")
+
+  if not head.get('ContentType', '').startswith('image/'):
+    raise Exception(f"Uploaded file is not an image: {key}")
+  if head.get('ContentLength', 0) > REVIEW_IMAGE_MAX_BYTES:
+    raise Exception(f"Uploaded image is too large: {key}")
+
+  return review_image_url(key)
+
+
+async def verify_review_image_keys(place_info_id, user_id, keys):
+  """
+  클라이언트가 직접 업로드한 객체들을 HEAD 요청으로 동시에 확인하고 이미지 URL 목록을 반환합니다.
+  다른 사용자나 다른 장소의 경로, 존재하지 않거나 이미지가 아닌 객체는 거부합니다.
+  """
+  prefix = review_image_prefix(place_info_id, user_id)
+  return list(await asyncio.gather(*[
+    run_in_upload_executor(head_review_image, prefix, key) for key in keys
+  ]))
+
+
+def upload_review_image(place_info_id, user_id, image_data):
+  if ',' in image_data:
+    format_data, imgstr = image_data.split(';base64,')
+    ext = format_data.split('/')[-1]
+  else:
+    imgstr = image_data
+    ext = 'jpeg'
+
+  data = BytesIO(base64.b64decode(imgstr))
+  filename = f"{review_image_prefix(place_info_id, user_id)}{uuid.uuid4()}.{ext}"
+
+  with record_timing('s3.upload'):
+    get_s3_client().upload_fileobj(
+      data,
+      settings.AWS_STORAGE_BUCKET_NAME,
+      filename,
+      ExtraArgs={'ContentType': f'image/{ext}'}
+    )
+
+  return review_image_url(filename)
+
+
+async def upload_review_images(place_info_id, user_id, images):
+  """
+  Base64로 전달된 이미지들을 스레드 풀에서 동시에 S3에 업로드합니다. (presigned URL 이전 방식)
+  업로드된 URL 목록과, 실패한 이미지의 순번과 사유 목록을 반환합니다.
+  """
+  results = await asyncio.gather(*[
+    run_in_upload_executor(upload_review_image, place_info_id, user_id, image_data)
+    for image_data in images[:REVIEW_IMAGE_MAX_COUNT]
+  ], return_exceptions=True)
+
+  image_urls = []
+  failures = []
+  for index, result in enumerate(results):
+    if isinstance(result, BaseException):
+      failures.append({'index': index, 'message': str(result) or result.__class__.__name__})
+    else:
+      image_urls.append(result)
+  return image_urls, failures
@@ -0,0 +1,188 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F, Max, Prefetch
+from django.utils import timezone
+
+# 블록 안의 변경에 같이 쓸 (사용자 id, 버전, 삭제 기록) (sync_changes)
+_current_changes = ContextVar('saved_place_sync_changes', default=None)
+
+SAVED_PLACE_TREE_CACHE_TIMEOUT = getattr(settings, 'SAVED_PLACE_TREE_CACHE_TIMEOUT', 60 * 60 * 24)
+
+
+def saved_place_cache():
+  """
+  저장한 장소 관련 캐시. SAVED_PLACE_CACHE_ALIAS로 CACHES의 다른 백엔드(예: Redis)를 지정할 수 있습니다.
+  키에 DB에서 읽은 동기화 버전을 넣으므로 워커별 캐시(LocMem)에서도 바뀐 뒤의 값을 돌려주지 않습니다.
+  """
+  return caches[getattr(settings, 'SAVED_PLACE_CACHE_ALIAS', 'default')]
+
+
+def bump_version(user_id):
+  """
+  사용자의 동기화 버전을 1 올리고 새 버전을 반환합니다. 갱신한 행의 잠금이 트랜잭션이 끝날 때까지 유지되므로,
+  같은 사용자의 변경은 버전 순서대로 커밋됩니다.
+  """
+  from back.place.models import SavedPlaceSyncState
+
+  with transaction.atomic():
+    if not SavedPlaceSyncState.objects.filter(user_id=user_id).update(version=F('version') + 1):
+      SavedPlaceSyncState.objects.bulk_create([SavedPlaceSyncState(user_id=user_id)], ignore_conflicts=True)
+      SavedPlaceSyncState.objects.filter(user_id=user_id).update(version=F('version') + 1)
+    return SavedPlaceSyncState.objects.filter(user_id=user_id).values_list('version', flat=True).get()
+
+
+def current_version(user_id):
+  from back.place.models import SavedPlaceSyncState
+  return (
+    SavedPlaceSyncState.objects.filter(user_id=user_id).values_list('version', 'pruned_version').first()
+    or (0, 0)
+  )
+
+
+def category_tree(user):
+  """
+  사용자의 카테고리 목록과 각 카테고리의 저장한 장소(savedPlaces)를 미리 읽어 둔 목록.
+  DB에서 읽은 동기화 버전을 키로 캐시하므로 카테고리/장소가 바뀌기 전까지는 버전 조회 한 번으로 반환합니다.
+  """
+  from back.place.models import SavedPlace, UserCategory
+
+  cache = saved_place_cache()
+  version, _ = current_version(user.id)
+  key = f'saved_place_tree:{user.id}:{version}'
+  categories = cache.get(key)
+  if categories is None:
+    categories = list(
+      UserCategory.objects
+      .filter(user=user)
+      .order_by('id')
+      .prefetch_related(Prefetch(
+        'savedPlaces', queryset=SavedPlace.objects.select_related('map_place').order_by('-created_at')
+      ))
+    )
+    cache.set(key, categories, SAVED_PLACE_TREE_CACHE_TIMEOUT)
+  return categories
+
+
+@contextmanager
+def sync_changes(user):
+  """
+  블록 안의 카테고리/저장한 장소 변경을 한 트랜잭션에서 같은 버전으로 기록합니다. 버전은 블록을 시작할 때 한 번만
+  올리고, 삭제 기록은 모아 두었다가 블록이 끝날 때 한 번에 저장합니다. bulk_create/update처럼 시그널을 보내지 않는
+  변경에는 반환된 버전을 직접 넣어야 합니다.
+  """
+  from back.place.models import SavedPlaceTombstone
+
+  changes = _current_changes.get()
+  if changes is not None and changes['user_id'] == user.id:
+    yield changes['version']
+    return
+
+  with transaction.atomic():
+    changes = {'user_id': user.id, 'version': bump_version(user.id), 'deleted': []}
+    token = _current_changes.set(changes)
+    try:
+      yield changes['version']
+    finally:
+      _current_changes.reset(token)
+    SavedPlaceTombstone.objects.bulk_create([
+      SavedPlaceTombstone(user_id=user.id, kind=kind, object_id=object_id, version=changes['version'])
+      for kind, object_id in changes['deleted']
+    ], batch_size=1000)
+
+
+def owner_id(instance):
+  from back.place.models import UserCategory
+
+  if isinstance(instance, UserCategory):
+    return instance.user_id
+  return UserCategory.objects.filter(id=instance.category_id).values_list('user_id', flat=True).first()
+
+
+def stamp_version(sender, instance, raw=False, **kwargs):
+  if raw:
+    return
+  changes = _current_changes.get()
+  if changes is not None:
+    instance.version = changes['version']
+    return
+  user_id = owner_id(instance)
+  if user_id is not None:
+    instance.version = bump_version(user_id)
+
+
+def record_deletion(sender, instance, origin=None, **kwargs):
+  """
+  삭제 기록을 남깁니다. 카테고리나 사용자가 삭제되면서 함께 삭제된 행은, 클라이언트가 상위 항목의 삭제로
+  알 수 있으므로 기록하지 않습니다.
+  """
+  from back.place.models import SavedPlaceTombstone, UserCategory
+
+  origin_model = getattr(origin, 'model', type(origin))
+  if origin is not None and origin_model is not sender:
+    return
+
+  kind = SavedPlaceTombstone.KIND_CATEGORY if sender is UserCategory else SavedPlaceTombstone.KIND_PLACE
+  changes = _current_changes.get()
+  if changes is not None:
+    changes['deleted'].append((kind, instance.id))
+    return
+
+  user_id = owner_id(instance)
+  if user_id is not None:
+    SavedPlaceTombstone.objects.create(user_id=user_id, kind=kind, object_id=instance.id, version=bump_version(user_id))
+
+
+def changes_since(user, since=None):
+  """
+  since 이후에 바뀐 카테고리와 장소, 삭제된 id를 반환합니다. since가 없거나 정리된 삭제 기록보다 오래되었으면
+  전체 목록을 반환하고 reset을 True로 둡니다.
+  """
+  from back.place.models import SavedPlace, SavedPlaceTombstone, UserCategory
+
+  version, pruned_version = current_version(user.id)
+  reset = not since or since < pruned_version or since > version
+  categories = UserCategory.objects.filter(user=user, version__lte=version)
+  places = SavedPlace.objects.filter(category__user=user, version__lte=version).select_related('category', 'map_place')
+  deleted = {SavedPlaceTombstone.KIND_CATEGORY: [], SavedPlaceTombstone.KIND_PLACE: []}
+  if not reset:
+    categories = categories.filter(version__gt=since)
+    places = places.filter(version__gt=since)
+    for kind, object_id in (
+      SavedPlaceTombstone.objects
+      .filter(user=user, version__gt=since, version__lte=version)
+      .values_list('kind', 'object_id')
+    ):
+      deleted[kind].append(object_id)
+
+  return {
+    'cursor': version,
+    'reset': reset,
+    'categories': list(categories.order_by('id')),
+    'saved_places': list(places.order_by('id')),
+    'deleted_category_ids': deleted[SavedPlaceTombstone.KIND_CATEGORY],
+    'deleted_saved_place_ids': deleted[SavedPlaceTombstone.KIND_PLACE],
+  }
+
+
+def prune_tombstones(days=None):
+  """
+  보관 기간이 지난 삭제 기록을 지우고, 사용자별로 지운 가장 큰 버전을 pruned_version에 남깁니다.
+  """
+  from back.place.models import SavedPlaceSyncState, SavedPlaceTombstone
+
+  if days is None:
+    days = getattr(settings, 'SAVED_PLACE_TOMBSTONE_DAYS', 90)
+  expired = SavedPlaceTombstone.objects.filter(created_at__lt=timezone.now() - timedelta(days=days))
+  with transaction.atomic():
+    pruned = list(expired.values('user').annotate(version=Max('version')))
+    for row in pruned:
+      SavedPlaceSyncState.objects.filter(user_id=row['user'], pruned_version__lt=row['version']).update(
+        pruned_version=row['version']
+      )
+    count, _ = expired.delete()
+  return count
@@ -1,3 +1,1147 @@
-from django.test import TestCase
+import asyncio
+import base64
+import json
+import threading
+from datetime import datetime, timezone as dt_timezone
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from graphql_jwt.shortcuts import get_token
+
+from back.common.models import User
+from back.common.testing import assert_max_queries
+from back.place import clients, clusters, geo, image_gc, images, schema as place_schema, storage, translations
+from back.place.models import (
+  MapPlace, Place, PlaceInfo, PlaceInfoChangeRequest, PlaceInfoReviewByUserReport, PlaceRating, PlaceReviewByUser,
+  PlaceReviewTranslation, PlaceSearchTerm, ReviewImageGCCheckpoint, SavedPlace, UserCategory,
+)
+from back.place.places import get_or_create_place, get_place_info, prune_map_places, save_map_places
+from back.place.ratings import deferred_rating_updates
+from back.place.search import search_places, tokenize
+from back.place.storage import review_image_url
+from back.place.sync import category_tree, changes_since, current_version, prune_tombstones, saved_place_cache
+from back.schema import schema
+
+
+def save_place(category, place_id, **values):
+  map_place, = save_map_places([{'place_id': place_id, 'place_name': place_id, **values}])
+  return SavedPlace.objects.create(category=category, place_id=place_id, map_place=map_place)
+
+
+def post_graphql(client, user, query, variables=None):
+  response = client.post(
+    '/graphql/', json.dumps({'query': query, 'variables': variables or {}}),
+    content_type='application/json', headers={'Authorization': f'JWT {get_token(user)}'}
+  )
+  return json.loads(response.content)
+
+
+class PlaceIdentityTests(TestCase):
+  def test_same_place_across_spelling_and_provider_id(self):
+    place = get_or_create_place('스타벅스 강남점', '서울 강남구')
+
+    self.assertEqual(get_or_create_place('스타벅스(강남점)', '서울  강남구').id, place.id)
+    self.assertNotEqual(get_or_create_place('Starbucks Gangnam', 'Seoul', provider_place_id='K1').id, place.id)
+    self.assertEqual(get_or_create_place('스타벅스 강남점', '서울 강남구', provider_place_id='K2').id, place.id)
+    self.assertEqual(Place.objects.get(id=place.id).provider_place_id, 'K2')
+    self.assertEqual(get_or_create_place('다른 이름', None, provider_place_id='K2').id, place.id)
+
+  def test_place_infos_of_each_language_share_the_place(self):
+    place = get_or_create_place('스타벅스 강남점', '서울 강남구', provider_place_id='K1')
+    english = PlaceInfo.objects.create(place=place, name='Starbucks Gangnam', language='EN')
+    korean = PlaceInfo.objects.create(place=place, name='스타벅스 강남점', address='서울 강남구', language='KO')
+
+    self.assertEqual(get_place_info('스타벅스 강남점', '서울 강남구', 'English').id, english.id)
+    self.assertEqual(get_place_info('Starbucks', None, '한국어', provider_place_id='K1').id, korean.id)
+    with self.assertRaises(PlaceInfo.DoesNotExist):
+      get_place_info('스타벅스 강남점', '서울 강남구', 'JA')
+
+
+class PlaceRatingTests(TestCase):
+  def setUp(self):
+    self.user = User.objects.create_user('rating@example.com', 'rating', 'password')
+    self.place = get_or_create_place('평양냉면', '서울 중구')
+    self.place_info = PlaceInfo.objects.create(place=self.place, name='평양냉면', language='KO')
+
+  def review(self, rating):
+    return PlaceReviewByUser.objects.create(
+      user=self.user, place_info=self.place_info, place=self.place, text='', rating=rating
+    )
+
+  def rating(self):
+    return PlaceRating.objects.get(place=self.place)
+
+  def test_reviews_update_the_aggregate(self):
+    first = self.review(5)
+    second = self.review(2)
+    self.review(5)
+
+    rating = self.rating()
+    self.assertEqual((rating.count, rating.total, rating.histogram), (3, 12, [0, 1, 0, 0, 2]))
+    self.assertEqual(rating.average, 4)
+
+    latest = PlaceReviewByUser.objects.latest('created_at')
+    latest.delete()
+    rating = self.rating()
+    self.assertEqual((rating.count, rating.total, rating.histogram), (2, 7, [0, 1, 0, 0, 1]))
+    self.assertEqual(rating.latest_review_at, second.created_at)
+
+    first.delete()
+    second.delete()
+    rating = self.rating()
+    self.assertEqual((rating.count, rating.total, rating.latest_review_at), (0, 0, None))
+    self.assertIsNone(rating.average)
+
+  def test_deferred_updates_are_applied_once_at_the_end(self):
+    reviews = [self.review(rating) for rating in (1, 3, 4)]
+
+    with deferred_rating_updates():
+      for review in reviews[:2]:
+        review.delete()
+      self.assertEqual(self.rating().count, 3)
+
+    rating = self.rating()
+    self.assertEqual((rating.count, rating.histogram), (1, [0, 0, 0, 1, 0]))
+
+  def test_rebuild_repairs_drift_and_removes_stale_rows(self):
+    self.review(4)
+    self.review(3)
+    PlaceRating.objects.filter(place=self.place).update(count=10, total=1, rating_4=0)
+    unreviewed = get_or_create_place('빈 장소')
+    PlaceRating.objects.create(place=unreviewed, count=1, total=5, rating_5=1)
+
+    call_command('rebuild_place_ratings', stdout=StringIO())
+
+    rating = self.rating()
+    self.assertEqual((rating.count, rating.total, rating.histogram), (2, 7, [0, 0, 1, 1, 0]))
+    self.assertFalse(PlaceRating.objects.filter(place=unreviewed).exists())
+
+
+class ReviewTranslationTests(TestCase):
+  def setUp(self):
+    self.user = User.objects.create_user('translate@example.com', 'translate', 'password')
+    self.place = get_or_create_place('비빔밥')
+    self.place_info = PlaceInfo.objects.create(place=self.place, name='비빔밥', language='KO')
+    self.reviews = [
+      PlaceReviewByUser.objects.create(user=self.user, place_info=self.place_info, place=self.place, text=f'리뷰 {i}', rating=5)
+      for i in range(5)
+    ]
+    self.deepl = mock.AsyncMock(side_effect=lambda texts, source, target: [f'{target}:{text}' for text in texts])
+    patcher = mock.patch.object(translations, 'deepl_translate_many', self.deepl)
+    patcher.start()
+    self.addCleanup(patcher.stop)
+
+  def place_reviews(self, arguments=''):
+    response = self.client.post(
+      '/graphql/',
+      json.dumps({'query': '{ placeReviews(placeInfoId: %d, language: "English"%s) { id translatedText } }' % (
+        self.place_info.id, arguments
+      )}),
+      content_type='application/json'
+    )
+    return [review['translatedText'] for review in json.loads(response.content)['data']['placeReviews']]
+
+  def test_translates_only_the_requested_page_in_one_call(self):
+    self.assertEqual(self.place_reviews(', first: 2, offset: 1'), ['EN:리뷰 3', 'EN:리뷰 2'])
+
+    self.deepl.assert_awaited_once_with(['리뷰 3', '리뷰 2'], None, 'EN')
+    self.assertEqual(PlaceReviewTranslation.objects.count(), 2)
+
+  def test_page_size_is_bounded(self):
+    for i in range(5, place_schema.PLACE_REVIEWS_MAX_PAGE_SIZE + 5):
+      PlaceReviewByUser.objects.create(user=self.user, place_info=self.place_info, place=self.place, text=f'리뷰 {i}', rating=4)
+
+    self.assertEqual(len(self.place_reviews(', first: 1000')), place_schema.PLACE_REVIEWS_MAX_PAGE_SIZE)
+    self.assertEqual(len(self.place_reviews()), place_schema.PLACE_REVIEWS_PAGE_SIZE)
+    self.assertEqual(self.deepl.await_count, 1)
+
+  def test_saved_translations_are_reused_until_the_text_changes(self):
+    self.place_reviews()
+    self.deepl.reset_mock()
+
+    self.assertEqual(self.place_reviews(), [f'EN:리뷰 {i}' for i in range(4, -1, -1)])
+    self.deepl.assert_not_awaited()
+
+    self.reviews[0].text = '고친 리뷰'
+    self.reviews[0].save()
+    self.assertEqual(PlaceReviewTranslation.objects.filter(review=self.reviews[0]).count(), 0)
+    self.assertEqual(self.place_reviews()[-1], 'EN:고친 리뷰')
+    self.deepl.assert_awaited_once_with(['고친 리뷰'], None, 'EN')
+
+  def test_failed_translation_returns_the_original(self):
+    self.deepl.side_effect = RuntimeError('DeepL translation failed')
+
+    with self.assertLogs('back.place.translations', 'ERROR'):
+      self.assertEqual(self.place_reviews(', first: 1'), ['리뷰 4'])
+    self.assertFalse(PlaceReviewTranslation.objects.exists())
+
+  def test_concurrent_deepl_requests_are_bounded(self):
+    in_flight = []
+    peak = []
+
+    class SlowDeepL:
+      async def post(self, url, data):
+        in_flight.append(1)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.pop()
+        return mock.Mock(json=lambda: {'translations': [{'text': text} for text in data['text']]})
+
+    async def translate_many():
+      with mock.patch.object(clients, 'get_http_client', return_value=SlowDeepL()):
+        return await asyncio.gather(*[clients.deepl_translate_many([str(i)], None, 'EN') for i in range(10)])
+
+    self.assertEqual(async_to_sync(translate_many)(), [[str(i)] for i in range(10)])
+    self.assertEqual(max(peak), clients.DEEPL_MAX_CONCURRENCY)
+
+
+class SyncTombstoneTests(TestCase):
+  def setUp(self):
+    self.user = User.objects.create_user('sync@example.com', 'sync', 'password')
+    self.category = UserCategory.objects.create(user=self.user, name='food')
+
+  def test_changes_since_cursor(self):
+    first = save_place(self.category, 'P1')
+    cursor, _ = current_version(self.user.id)
+    second = save_place(self.category, 'P2')
+
+    changes = changes_since(self.user, cursor)
+
+    self.assertFalse(changes['reset'])
+    self.assertEqual([place.id for place in changes['saved_places']], [second.id])
+    self.assertNotIn(first.id, [place.id for place in changes['saved_places']])
+
+  def test_deleted_place_leaves_tombstone(self):
+    place = save_place(self.category, 'P1')
+    cursor, _ = current_version(self.user.id)
+
+    place_id = place.id
+    place.delete()
+    changes = changes_since(self.user, cursor)
+
+    self.assertEqual(changes['deleted_saved_place_ids'], [place_id])
+    self.assertEqual(changes['saved_places'], [])
+    self.assertGreater(changes['cursor'], cursor)
+    # 커서를 따라온 클라이언트에게는 같은 삭제를 다시 보내지 않습니다.
+    self.assertEqual(changes_since(self.user, changes['cursor'])['deleted_saved_place_ids'], [])
+
+  def test_deleted_category_does_not_record_its_places(self):
+    place = save_place(self.category, 'P1')
+    cursor, _ = current_version(self.user.id)
+
+    category_id = self.category.id
+    self.category.delete()
+    changes = changes_since(self.user, cursor)
+
+    self.assertEqual(changes['deleted_category_ids'], [category_id])
+    self.assertEqual(changes['deleted_saved_place_ids'], [])
+    self.assertFalse(SavedPlace.objects.filter(id=place.id).exists())
+
+  def test_pruned_cursor_resets(self):
+    cursor, _ = current_version(self.user.id)
+    save_place(self.category, 'P1').delete()
+
+    self.assertEqual(prune_tombstones(days=0), 1)
+    changes = changes_since(self.user, cursor)
+
+    self.assertTrue(changes['reset'])
+    self.assertEqual(changes['deleted_saved_place_ids'], [])
+
+  def test_map_places_are_not_shared_across_edits(self):
+    other = UserCategory.objects.create(
+      user=User.objects.create_user('other@example.com', 'other', 'password'), name='food'
+    )
+    mine = save_place(self.category, 'P1', phone='1')
+    theirs = save_place(other, 'P1', phone='1')
+    self.assertEqual(mine.map_place_id, theirs.map_place_id)
+
+    edited, = save_map_places([{'place_id': 'P1', 'place_name': 'P1', 'phone': '2'}])
+    SavedPlace.objects.filter(id=theirs.id).update(map_place=edited)
+
+    mine.refresh_from_db()
+    self.assertEqual(mine.phone, '1')
+    self.assertEqual(prune_map_places(), 0)
+    mine.delete()
+    self.assertEqual(prune_map_places(), 1)
+    self.assertEqual(MapPlace.objects.count(), 1)
+
+
+class PlaceSearchTests(TestCase):
+  def setUp(self):
+    self.user = User.objects.create_user('search@example.com', 'search', 'password')
+
+  def place_info(self, name, language='KO', **fields):
+    place = get_or_create_place(name, fields.pop('address', None))
+    return PlaceInfo.objects.create(place=place, name=name, language=language, **fields)
+
+  def search(self, query, language=None):
+    return [place_info.name for place_info, _ in search_places(query, language)]
+
+  def test_tokenize_uses_bigrams_of_each_word(self):
+    self.assertEqual(tokenize('삼겹살 집'), ['삼겹', '겹살', '집'])
+    self.assertEqual(tokenize('ＣＡＦＥ'), ['ca', 'af', 'fe'])
+
+  def test_title_matches_rank_above_review_matches(self):
+    self.place_info('삼겹살 전문점', category='고깃집')
+    mentioned = self.place_info('동네 식당')
+    PlaceReviewByUser.objects.create(
+      user=self.user, place_info=mentioned, place=mentioned.place, text='삼겹살이 맛있어요', rating=5
+    )
+    self.place_info('카페')
+
+    self.assertEqual(self.search('삼겹살'), ['삼겹살 전문점', '동네 식당'])
+
+  def test_places_matching_more_terms_rank_first(self):
+    self.place_info('냉면 냉면 냉면 냉면')
+    self.place_info('평양냉면')
+
+    self.assertEqual(self.search('평양냉면'), ['평양냉면', '냉면 냉면 냉면 냉면'])
+
+  def test_prefers_the_requested_language(self):
+    korean = self.place_info('Noodle House', language='KO')
+    PlaceInfo.objects.create(place=korean.place, name='Noodle House', language='EN')
+
+    results = search_places('noodle', 'English')
+
+    self.assertEqual([place_info.language for place_info, _ in results], ['EN'])
+
+  def test_index_follows_saves(self):
+    place_info = self.place_info('순두부')
+    review = PlaceReviewByUser.objects.create(
+      user=self.user, place_info=place_info, place=place_info.place, text='만두도 좋아요', rating=4
+    )
+    self.assertEqual(self.search('만두'), ['순두부'])
+
+    place_info.name = '칼국수'
+    place_info.save()
+    review.text = '국물이 좋아요'
+    review.save()
+
+    self.assertEqual(self.search('순두부'), [])
+    self.assertEqual(self.search('만두'), [])
+    self.assertEqual(self.search('국물'), ['칼국수'])
+    self.assertEqual(
+      PlaceSearchTerm.objects.filter(place_info=place_info).count(), len(set(tokenize('칼국수')))
+    )
+
+  def test_limit_is_clamped(self):
+    for i in range(3):
+      self.place_info(f'김밥 {i}호점')
+
+    result = schema.execute('{ searchPlaces(query: "김밥", limit: -5) { score } }')
+
+    self.assertIsNone(result.errors)
+    self.assertEqual(len(result.data['searchPlaces']), 1)
+
+
+class GeoQueryTests(TestCase):
+  def setUp(self):
+    self.user = User.objects.create_user('geo@example.com', 'geo', 'password')
+    self.category = UserCategory.objects.create(user=self.user, name='food')
+    # 서울 시청 주변 약 1km 간격의 격자
+    self.places = [
+      save_place(self.category, f'G{i}{j}', y=str(37.56 + i * 0.01), x=str(126.97 + j * 0.01))
+      for i in range(-3, 4) for j in range(-3, 4)
+    ]
+
+  def test_encode_and_coordinates(self):
+    self.assertEqual(geo.encode(57.64911, 10.40744, 11), 'u4pruydqqvj')
+    place = save_place(self.category, 'C1', lat='37.5', lng='127.0', y='1', x='1')
+    self.assertEqual((place.latitude, place.longitude, place.geohash), (37.5, 127.0, geo.encode(37.5, 127.0)))
+    invalid = save_place(self.category, 'C2', y='91', x='abc')
+    self.assertEqual((invalid.latitude, invalid.longitude, invalid.geohash), (None, None, None))
+
+  def test_in_bounds_matches_a_full_scan(self):
+    bounds = (37.545, 126.955, 37.585, 126.992)
+
+    found = geo.in_bounds(SavedPlace.objects.all(), *bounds)
+
+    expected = {
+      place.id for place in self.places
+      if bounds[0] <= place.latitude <= bounds[2] and bounds[1] <= place.longitude <= bounds[3]
+    }
+    self.assertEqual({place.id for place in found}, expected)
+    self.assertEqual(len(expected), 16)
+    with self.assertRaisesMessage(Exception, 'Invalid bounds'):
+      geo.in_bounds(SavedPlace.objects.all(), 37.6, 126.9, 37.5, 127.0)
+
+  def test_nearest_matches_a_full_scan(self):
+    for lat, lng, k in ((37.561, 126.972, 5), (37.4, 126.8, 3), (37.56, 126.97, 49)):
+      result = geo.nearest(SavedPlace.objects.all(), lat, lng, k)
+
+      expected = sorted(geo.distance_m(lat, lng, p.latitude, p.longitude) for p in self.places)[:k]
+      self.assertEqual([round(distance, 3) for distance, _ in result], [round(d, 3) for d in expected])
+
+  def test_queries_only_see_the_users_places(self):
+    other = UserCategory.objects.create(
+      user=User.objects.create_user('other@example.com', 'other', 'password'), name='food'
+    )
+    save_place(other, 'O1', y='37.56', x='126.97')
+
+    result = post_graphql(
+      self.client, self.user,
+      '{ nearestSavedPlaces(lat: 37.56, lng: 126.97, k: 1000) { distance place { placeId } } '
+      'savedPlacesInBounds(minLat: 37.5, minLng: 126.9, maxLat: 37.6, maxLng: 127.1) { placeId } }'
+    )['data']
+
+    self.assertEqual(len(result['nearestSavedPlaces']), len(self.places))
+    self.assertEqual(result['nearestSavedPlaces'][0], {'distance': 0.0, 'place': {'placeId': 'G00'}})
+    self.assertNotIn('O1', {place['placeId'] for place in result['savedPlacesInBounds']})
+
+
+class SavedPlaceClusterTests(TestCase):
+  bounds = (37.0, 126.0, 38.0, 128.0)
+
+  def setUp(self):
+    self.user = User.objects.create_user('cluster@example.com', 'cluster', 'password')
+    self.category = UserCategory.objects.create(user=self.user, name='food')
+    # 강남역 주변 10곳과 멀리 떨어진 한 곳
+    self.dense = [
+      save_place(self.category, f'D{i}', y=str(37.4979 + i * 0.0001), x=str(127.0276 + i * 0.0001))
+      for i in range(10)
+    ]
+    self.lone = save_place(self.category, 'L1', y='37.2', x='126.5')
+
+  def test_precision_grows_with_zoom(self):
+    precisions = [clusters.precision_for_zoom(zoom) for zoom in range(0, 21)]
+
+    self.assertEqual(precisions, sorted(precisions))
+    self.assertEqual(precisions[0], 1)
+    self.assertLessEqual(precisions[-1], geo.GEOHASH_PRECISION)
+    # 가장 큰 셀보다 화면이 넓은 낮은 줌을 빼면, 셀 하나가 화면에서 CLUSTER_CELL_PIXELS 이상을 차지합니다.
+    for zoom, precision in enumerate(precisions):
+      if precision == 1:
+        continue
+      self.assertGreaterEqual(
+        geo.cell_size(precision)[1] * 256 * 2 ** zoom / 360, clusters.CLUSTER_CELL_PIXELS
+      )
+
+  def test_groups_nearby_places(self):
+    result = sorted(clusters.clusters(self.user, *self.bounds, zoom=8), key=lambda cluster: -cluster['count'])
+
+    self.assertEqual([cluster['count'] for cluster in result], [10, 1])
+    self.assertIsNone(result[0]['place'])
+    self.assertAlmostEqual(result[0]['latitude'], 37.49835)
+    self.assertEqual(result[1]['place'].id, self.lone.id)
+    # 영역 밖의 클러스터는 빠집니다.
+    self.assertEqual(len(clusters.clusters(self.user, 37.4, 127.0, 37.6, 127.1, zoom=8)), 1)
+
+  def test_high_zoom_returns_places(self):
+    result = clusters.clusters(self.user, *self.bounds, zoom=clusters.SAVED_PLACE_CLUSTER_MAX_ZOOM)
+
+    self.assertEqual(len(result), 11)
+    self.assertTrue(all(cluster['count'] == 1 and cluster['place'] for cluster in result))
+
+  def test_counts_are_cached_until_places_change(self):
+    clusters.clusters(self.user, *self.bounds, zoom=8)
+    with self.assertNumQueries(1):  # 동기화 버전 조회
+      clusters.cell_counts(self.user, clusters.precision_for_zoom(8))
+
+    save_place(self.category, 'D10', y='37.4979', x='127.0276')
+
+    counts = [cluster['count'] for cluster in clusters.clusters(self.user, *self.bounds, zoom=8)]
+    self.assertEqual(sorted(counts), [1, 11])
+
+
+class CreateSavedPlacesTests(TestCase):
+  mutation = '''
+    mutation createSavedPlaces($categoryId: ID!, $places: [SavedPlaceInput!]!) {
+      createSavedPlaces(categoryId: $categoryId, places: $places) {
+        results { placeId ok message place { id latitude } } message
+      }
+    }
+  '''
+
+  def setUp(self):
+    self.user = User.objects.create_user('import@example.com', 'import', 'password')
+    self.category = UserCategory.objects.create(user=self.user, name='food')
+
+  def create(self, places):
+    return post_graphql(
+      self.client, self.user, self.mutation, {'categoryId': self.category.id, 'places': places}
+    )['data']['createSavedPlaces']
+
+  def test_results_follow_the_input(self):
+    save_place(self.category, 'P1')
+    cursor, _ = current_version(self.user.id)
+
+    result = self.create([
+      {'placeId': 'P2', 'placeName': 'two', 'y': '37.5', 'x': '127.0'},
+      {'placeId': 'P1', 'placeName': 'one'},
+      {'placeId': 'P2', 'placeName': 'two again'},
+      {'placeId': 'P3', 'placeName': 'three'},
+    ])
+
+    self.assertEqual([(r['placeId'], r['ok']) for r in result['results']], [
+      ('P2', True), ('P1', False), ('P2', False), ('P3', True),
+    ])
+    self.assertEqual(result['results'][1]['message'], 'This place is already saved in this category')
+    self.assertEqual(result['results'][2]['message'], 'This place appears more than once in the request')
+    self.assertEqual(result['results'][0]['place']['latitude'], 37.5)
+    self.assertEqual(result['message'], '2 place(s) saved')
+    self.assertEqual(SavedPlace.objects.get(place_id='P2').map_place.place_name, 'two')
+    # bulk_create로 만든 장소도 동기화 변경 목록에 나옵니다.
+    self.assertEqual(
+      sorted(place.place_id for place in changes_since(self.user, cursor)['saved_places']), ['P2', 'P3']
+    )
+
+  def test_places_saved_concurrently_are_reported_as_conflicts(self):
+    original = place_schema.save_map_places
+
+    def save_with_race(places):
+      # 존재 확인과 bulk_create 사이에 다른 요청이 같은 장소를 저장한 경우. 그 요청은 앞선 버전으로 커밋됩니다.
+      SavedPlace.objects.filter(id=save_place(self.category, 'P1').id).update(version=0)
+      return original(places)
+
+    with mock.patch.object(place_schema, 'save_map_places', side_effect=save_with_race):
+      result = self.create([{'placeId': 'P1', 'placeName': 'one'}, {'placeId': 'P2', 'placeName': 'two'}])
+
+    self.assertEqual([(r['placeId'], r['ok']) for r in result['results']], [('P1', False), ('P2', True)])
+    self.assertEqual(SavedPlace.objects.filter(place_id='P1').count(), 1)
+
+  def test_query_count_does_not_grow_with_places(self):
+    places = [{'placeId': f'P{i}', 'placeName': f'place {i}', 'y': '37.5', 'x': '127.0'} for i in range(50)]
+
+    with assert_max_queries(20, 'createSavedPlaces'):
+      result = self.create(places)
+
+    self.assertTrue(all(r['ok'] for r in result['results']))
+
+
+class MoveAndDeleteSavedPlacesTests(TestCase):
+  def setUp(self):
+    self.user = User.objects.create_user('move@example.com', 'move', 'password')
+    self.source = UserCategory.objects.create(user=self.user, name='food')
+    self.target = UserCategory.objects.create(user=self.user, name='cafe')
+    other_category = UserCategory.objects.create(
+      user=User.objects.create_user('stranger@example.com', 'stranger', 'password'), name='food'
+    )
+    self.others = save_place(other_category, 'P9')
+
+  def run_mutation(self, mutation, ids, **arguments):
+    extra = ''.join(f', {name}: {value}' for name, value in arguments.items())
+    return post_graphql(
+      self.client, self.user,
+      'mutation($ids: [ID!]!) { %s(ids: $ids%s) { results { id ok message } message } }' % (mutation, extra),
+      {'ids': ids}
+    )['data'][mutation]
+
+  def test_move_reports_each_conflict(self):
+    moved = save_place(self.source, 'P1')
+    taken = save_place(self.source, 'P2')
+    save_place(self.target, 'P2')
+    staying = save_place(self.target, 'P3')
+    first = save_place(self.source, 'P4')
+    second_category = UserCategory.objects.create(user=self.user, name='bar')
+    second = save_place(second_category, 'P4')
+    cursor, _ = current_version(self.user.id)
+
+    result = self.run_mutation(
+      'moveSavedPlaces', [moved.id, taken.id, staying.id, first.id, second.id, self.others.id, moved.id],
+      newCategoryId=self.target.id
+    )
+
+    self.assertEqual([(r['id'], r['ok'], r['message']) for r in result['results']], [
+      (str(moved.id), True, 'Place moved to different category successfully'),
+      (str(taken.id), False, 'This place already exists in the target category'),
+      (str(staying.id), True, 'Place is already in the target category'),
+      (str(first.id), True, 'Place moved to different category successfully'),
+      (str(second.id), False, 'This place already exists in the target category'),
+      (str(self.others.id), False, 'Saved place not found'),
+    ])
+    self.assertEqual(result['message'], '2 place(s) moved')
+    self.assertEqual(
+      sorted(SavedPlace.objects.filter(category=self.target).values_list('place_id', flat=True)),
+      ['P1', 'P2', 'P3', 'P4']
+    )
+    self.assertEqual(
+      sorted(place.id for place in changes_since(self.user, cursor)['saved_places']), sorted([moved.id, first.id])
+    )
+
+  def test_delete_reports_missing_ids_and_records_tombstones(self):
+    places = [save_place(self.source, f'P{i}') for i in range(3)]
+    cursor, _ = current_version(self.user.id)
+
+    result = self.run_mutation('deleteSavedPlaces', [places[0].id, self.others.id, places[2].id])
+
+    self.assertEqual([r['ok'] for r in result['results']], [True, False, True])
+    self.assertEqual(list(SavedPlace.objects.filter(category=self.source).values_list('id', flat=True)), [places[1].id])
+    self.assertTrue(SavedPlace.objects.filter(id=self.others.id).exists())
+    changes = changes_since(self.user, cursor)
+    self.assertEqual(sorted(changes['deleted_saved_place_ids']), [places[0].id, places[2].id])
+
+  def test_rejects_invalid_ids(self):
+    result = post_graphql(self.client, self.user, 'mutation { deleteSavedPlaces(ids: ["x"]) { message } }')
+
+    self.assertEqual(result['errors'][0]['message'], 'Invalid saved place id')
+
+
+class BulkModerationTests(TestCase):
+  def setUp(self):
+    self.staff = User.objects.create_user('staff@example.com', 'staff', 'password')
+    User.objects.filter(id=self.staff.id).update(is_staff=True)
+    self.user = User.objects.create_user('reporter@example.com', 'reporter', 'password')
+    self.place = get_or_create_place('만두집')
+    self.place_info = PlaceInfo.objects.create(place=self.place, name='만두집', language='KO')
+
+  def moderate(self, mutation, ids, user=None):
+    result = post_graphql(
+      self.client, user or self.staff,
+      'mutation($ids: [ID!]!) { %s(ids: $ids) { results { id ok message } message } }' % mutation,
+      {'ids': ids}
+    )
+    return result['errors'][0]['message'] if result.get('errors') else result['data'][mutation]
+
+  def test_approving_change_requests_applies_the_latest_value(self):
+    older = PlaceInfoChangeRequest.objects.create(user=self.user, place_info=self.place_info, new_value=[{'name': '군만두'}])
+    newer = PlaceInfoChangeRequest.objects.create(user=self.user, place_info=self.place_info, new_value=[{'name': '물만두'}])
+
+    result = self.moderate('bulkApprovePlaceInfoChangeRequests', [older.id, newer.id, 999999])
+
+    self.assertEqual([(r['id'], r['ok']) for r in result['results']], [(str(older.id), True), (str(newer.id), True), ('999999', False)])
+    self.assertEqual(result['results'][2]['message'], 'Place info change request not found')
+    self.place_info.refresh_from_db()
+    self.assertEqual(self.place_info.menu_or_ticket_info, [{'name': '물만두'}])
+    self.assertEqual(PlaceInfoChangeRequest.objects.filter(is_approved=True).count(), 2)
+    self.assertEqual([place_info.name for place_info, _ in search_places('물만두')], ['만두집'])
+
+  def test_approving_reports_deletes_reviews_and_refreshes_ratings(self):
+    reviews = [
+      PlaceReviewByUser.objects.create(user=self.user, place_info=self.place_info, place=self.place, rating=rating)
+      for rating in (1, 5, 4)
+    ]
+    reports = [
+      PlaceInfoReviewByUserReport.objects.create(place_review=review, reason='spam') for review in reviews[:2]
+    ]
+    # 같은 리뷰에 대한 신고가 여러 개여도 한 번만 삭제합니다.
+    reports.append(PlaceInfoReviewByUserReport.objects.create(place_review=reviews[0], reason='again'))
+
+    result = self.moderate('bulkApprovePlaceInfoReviewByUserReports', [report.id for report in reports])
+
+    self.assertTrue(all(r['ok'] for r in result['results']))
+    self.assertEqual(result['message'], '3 report(s) approved, 2 review(s) deleted')
+    self.assertEqual(list(PlaceReviewByUser.objects.values_list('id', flat=True)), [reviews[2].id])
+    self.assertEqual(PlaceInfoReviewByUserReport.objects.filter(is_approved=True, place_review=None).count(), 3)
+    rating = PlaceRating.objects.get(place=self.place)
+    self.assertEqual((rating.count, rating.total), (1, 4))
+
+  def test_rejecting_deletes_only_the_requests(self):
+    request = PlaceInfoChangeRequest.objects.create(user=self.user, place_info=self.place_info, new_value=[])
+    review = PlaceReviewByUser.objects.create(user=self.user, place_info=self.place_info, place=self.place, rating=3)
+    report = PlaceInfoReviewByUserReport.objects.create(place_review=review)
+
+    self.assertTrue(self.moderate('bulkRejectPlaceInfoChangeRequests', [request.id])['results'][0]['ok'])
+    self.assertTrue(self.moderate('bulkRejectPlaceInfoReviewByUserReports', [report.id, report.id])['results'][0]['ok'])
+
+    self.assertFalse(PlaceInfoChangeRequest.objects.exists())
+    self.assertFalse(PlaceInfoReviewByUserReport.objects.exists())
+    self.assertTrue(PlaceReviewByUser.objects.filter(id=review.id).exists())
+
+  def test_requires_staff_and_valid_ids(self):
+    self.assertIn('not authorized', self.moderate('bulkRejectPlaceInfoChangeRequests', ['1'], user=self.user))
+    self.assertEqual(self.moderate('bulkRejectPlaceInfoChangeRequests', ['abc']), 'Invalid id')
+
+
+class CategoryTreeCacheTests(TestCase):
+  def setUp(self):
+    saved_place_cache().clear()
+    self.user = User.objects.create_user('tree@example.com', 'tree', 'password')
+    self.category = UserCategory.objects.create(user=self.user, name='food')
+    self.place = save_place(self.category, 'P1')
+
+  def tree(self):
+    return {category.name: [place.place_id for place in category.savedPlaces.all()] for category in category_tree(self.user)}
+
+  def test_cached_tree_costs_one_query(self):
+    self.tree()
+
+    with self.assertNumQueries(1):  # 동기화 버전 조회
+      self.assertEqual(self.tree(), {'food': ['P1']})
+
+  def test_changes_invalidate_the_tree(self):
+    self.tree()
+
+    save_place(self.category, 'P2')
+    self.assertEqual(self.tree(), {'food': ['P2', 'P1']})
+
+    self.category.name = 'restaurants'
+    self.category.save()
+    self.place.delete()
+    self.assertEqual(self.tree(), {'restaurants': ['P2']})
+
+    cafe = UserCategory.objects.create(user=self.user, name='cafe')
+    post_graphql(
+      self.client, self.user, 'mutation($ids: [ID!]!, $to: ID!) { moveSavedPlaces(ids: $ids, newCategoryId: $to) { message } }',
+      {'ids': list(SavedPlace.objects.values_list('id', flat=True)), 'to': cafe.id}
+    )
+    self.assertEqual(self.tree(), {'restaurants': [], 'cafe': ['P2']})
+
+  def test_trees_are_per_user(self):
+    other = User.objects.create_user('other@example.com', 'other', 'password')
+    self.tree()
+
+    self.assertEqual(category_tree(other), [])
+
+
+class PruneMapPlacesTests(TestCase):
+  def test_deletes_unreferenced_rows_in_batches(self):
+    category = UserCategory.objects.create(user=User.objects.create_user('prune@example.com', 'prune', 'password'), name='food')
+    kept = save_place(category, 'P0')
+    save_map_places([{'place_id': f'P{i}', 'place_name': f'P{i}'} for i in range(1, 6)])
+
+    self.assertEqual(prune_map_places(batch_size=2), 5)
+    self.assertEqual(list(MapPlace.objects.values_list('id', flat=True)), [kept.map_place_id])
+
+
+@skipUnlessDBFeature('has_select_for_update_skip_locked')
+class PruneMapPlacesRaceTests(TransactionTestCase):
+  def test_rows_about_to_be_saved_are_not_pruned(self):
+    category = UserCategory.objects.create(user=User.objects.create_user('race@example.com', 'race', 'password'), name='food')
+    orphan, = save_map_places([{'place_id': 'P1', 'place_name': 'P1'}])
+    reused = threading.Event()
+    pruned = threading.Event()
+
+    def save():
+      try:
+        with transaction.atomic():
+          map_place, = save_map_places([{'place_id': 'P1', 'place_name': 'P1'}])
+          reused.set()
+          pruned.wait(timeout=5)
+          SavedPlace.objects.create(category=category, place_id='P1', map_place=map_place)
+      finally:
+        connection.close()
+
+    thread = threading.Thread(target=save)
+    thread.start()
+    reused.wait(timeout=5)
+    self.assertEqual(prune_map_places(), 0)
+    pruned.set()
+    thread.join()
+
+    self.assertEqual(SavedPlace.objects.get().map_place_id, orphan.id)
+
+
+class MigrationTestCase(TransactionTestCase):
+  """
+  before 상태에서 데이터를 만든 뒤 after까지 마이그레이션해 결과를 확인합니다. 끝나면 최신 상태로 되돌립니다.
+  """
+
+  before = None
+  after = None
+
+  def setUp(self):
+    executor = MigrationExecutor(connection)
+    executor.migrate(self.before)
+    self.old_apps = executor.loader.project_state(self.before).apps
+
+  def tearDown(self):
+    executor = MigrationExecutor(connection)
+    executor.migrate(executor.loader.graph.leaf_nodes())
+
+  def migrate(self):
+    executor = MigrationExecutor(connection)
+    executor.loader.build_graph()
+    executor.migrate(self.after)
+    return executor.loader.project_state(self.after).apps
+
+
+class PlaceBackfillMigrationTests(MigrationTestCase):
+  """
+  0013_place가 공백/대소문자만 다른 PlaceInfo를 하나의 Place로 묶을 때 (place, language) 충돌을 합치는지 확인합니다.
+  """
+
+  before = [('place', '0012_placerating')]
+  after = [('place', '0014_placeinfo_lookup_key')]
+
+  def test_merges_place_infos_that_collide_on_place_and_language(self):
+    User = self.old_apps.get_model('common', 'User')
+    PlaceInfo = self.old_apps.get_model('place', 'PlaceInfo')
+    PlaceReviewByUser = self.old_apps.get_model('place', 'PlaceReviewByUser')
+    PlaceInfoChangeRequest = self.old_apps.get_model('place', 'PlaceInfoChangeRequest')
+
+    user = User.objects.create(email='backfill@example.com', name='backfill')
+    kept = PlaceInfo.objects.create(name='스타벅스 강남점', address='서울 강남구', language='EN')
+    spaced = PlaceInfo.objects.create(name='스타벅스  강남점', address='서울 강남구', language='EN')
+    korean = PlaceInfo.objects.create(name='스타벅스 강남점', address='서울 강남구', language='KO')
+    PlaceReviewByUser.objects.create(user=user, place_info=spaced, rating=5)
+    PlaceInfoChangeRequest.objects.create(user=user, place_info=spaced, new_value=[])
+
+    apps = self.migrate()
+    Place = apps.get_model('place', 'Place')
+    PlaceInfo = apps.get_model('place', 'PlaceInfo')
+    PlaceReviewByUser = apps.get_model('place', 'PlaceReviewByUser')
+    PlaceInfoChangeRequest = apps.get_model('place', 'PlaceInfoChangeRequest')
+    PlaceRating = apps.get_model('place', 'PlaceRating')
+
+    place = Place.objects.get()
+    self.assertEqual(sorted(PlaceInfo.objects.values_list('id', 'place_id')), [(kept.id, place.id), (korean.id, place.id)])
+    self.assertEqual(list(PlaceReviewByUser.objects.values_list('place_info_id', 'place_id')), [(kept.id, place.id)])
+    self.assertEqual(list(PlaceInfoChangeRequest.objects.values_list('place_info_id', flat=True)), [kept.id])
+    self.assertEqual(PlaceRating.objects.get(place=place).count, 1)
+
+
+class MergeDuplicatesMigrationTests(MigrationTestCase):
+  """
+  0014_placeinfo_lookup_key가 새 정규화 기준으로 같은 장소를 합치는지 확인합니다.
+  """
+
+  before = [('place', '0013_place')]
+  after = [('place', '0014_placeinfo_lookup_key')]
+
+  def test_merges_places_and_place_infos(self):
+    User = self.old_apps.get_model('common', 'User')
+    Place = self.old_apps.get_model('place', 'Place')
+    PlaceInfo = self.old_apps.get_model('place', 'PlaceInfo')
+    PlaceReviewByUser = self.old_apps.get_model('place', 'PlaceReviewByUser')
+
+    user = User.objects.create(email='merge@example.com', name='merge')
+    kept = Place.objects.create(name='스타벅스 강남점', address='서울 강남구', lookup_key='a')
+    duplicate = Place.objects.create(
+      name='스타벅스(강남점)', address='서울 강남구', lookup_key='b', provider_place_id='K1'
+    )
+    other = Place.objects.create(name='이디야', address='서울 강남구', lookup_key='c')
+    english = PlaceInfo.objects.create(place=kept, name='스타벅스 강남점', address='서울 강남구', language='English')
+    alias = PlaceInfo.objects.create(place=duplicate, name='스타벅스(강남점)', address='서울 강남구', language='EN')
+    PlaceReviewByUser.objects.create(user=user, place_info=alias, place=duplicate, rating=4)
+    PlaceReviewByUser.objects.create(user=user, place_info=english, place=kept, rating=2)
+
+    apps = self.migrate()
+    Place = apps.get_model('place', 'Place')
+    PlaceInfo = apps.get_model('place', 'PlaceInfo')
+    PlaceReviewByUser = apps.get_model('place', 'PlaceReviewByUser')
+    PlaceRating = apps.get_model('place', 'PlaceRating')
+
+    self.assertEqual(sorted(Place.objects.values_list('id', flat=True)), [kept.id, other.id])
+    self.assertEqual(Place.objects.get(id=kept.id).provider_place_id, 'K1')
+    self.assertEqual(list(PlaceInfo.objects.values_list('id', 'language')), [(english.id, 'EN')])
+    self.assertIsNotNone(PlaceInfo.objects.get(id=english.id).lookup_key)
+    self.assertEqual(
+      sorted(PlaceReviewByUser.objects.values_list('place_id', 'place_info_id')),
+      [(kept.id, english.id), (kept.id, english.id)]
+    )
+    rating = PlaceRating.objects.get(place_id=kept.id)
+    self.assertEqual((rating.count, rating.total), (2, 6))
+
+
+class SearchTermBackfillMigrationTests(MigrationTestCase):
+  """
+  0020이 저장 시그널 없이 만들어진 PlaceInfo와 리뷰만 색인하는지 확인합니다.
+  """
+
+  before = [('place', '0019_mapplace')]
+  after = [('place', '0020_backfill_place_search_terms')]
+
+  def test_indexes_only_documents_without_terms(self):
+    User = self.old_apps.get_model('common', 'User')
+    Place = self.old_apps.get_model('place', 'Place')
+    PlaceInfo = self.old_apps.get_model('place', 'PlaceInfo')
+    PlaceReviewByUser = self.old_apps.get_model('place', 'PlaceReviewByUser')
+    PlaceSearchTerm = self.old_apps.get_model('place', 'PlaceSearchTerm')
+
+    user = User.objects.create(email='backfill@example.com', name='backfill')
+    place = Place.objects.create(name='떡볶이', lookup_key='a')
+    place_info = PlaceInfo.objects.create(place=place, name='떡볶이', language='KO')
+    review = PlaceReviewByUser.objects.create(user=user, place_info=place_info, place=place, text='순대', rating=5)
+    indexed = PlaceInfo.objects.create(place=place, name='Tteokbokki', language='EN')
+    PlaceSearchTerm.objects.create(term='tt', weight=1, place=place, place_info=indexed)
+
+    apps = self.migrate()
+    PlaceSearchTerm = apps.get_model('place', 'PlaceSearchTerm')
+
+    self.assertEqual(
+      sorted(PlaceSearchTerm.objects.values_list('term', 'place_info_id', 'review_id')),
+      [('tt', indexed.id, None), ('떡볶', place_info.id, None), ('볶이', place_info.id, None), ('순대', None, review.id)]
+    )
+
+
+class FakeS3:
+  """
+  list_objects_v2, get_object, put_object, upload_fileobj, delete_objects만 흉내 내는 S3 대역.
+  본문이 b'broken'인 업로드는 실패합니다.
+  """
+
+  def __init__(self, objects, bodies=None):
+    self.objects = dict(objects)
+    self.bodies = dict(bodies or {})
+    self.deleted = []
+
+  def get_object(self, Bucket, Key):
+    return {'Body': BytesIO(self.bodies[Key])}
+
+  def put_object(self, Bucket, Key, Body, **kwargs):
+    self.objects[Key] = datetime.now(dt_timezone.utc)
+    self.bodies[Key] = Body.read()
+
+  def list_objects_v2(self, Bucket, Prefix='', MaxKeys=1000, StartAfter='', **kwargs):
+    keys = sorted(key for key in self.objects if key.startswith(Prefix) and key > StartAfter)
+    page = keys[:MaxKeys]
+    return {
+      'Contents': [{'Key': key, 'LastModified': self.objects[key]} for key in page],
+      'IsTruncated': len(keys) > MaxKeys,
+    }
+
+  def upload_fileobj(self, Fileobj, Bucket, Key, ExtraArgs=None):
+    body = Fileobj.read()
+    if body == b'broken':
+      raise Exception('Access Denied')
+    self.objects[Key] = datetime.now(dt_timezone.utc)
+    self.bodies[Key] = body
+
+  def delete_objects(self, Bucket, Delete):
+    for item in Delete['Objects']:
+      self.deleted.append(item['Key'])
+      del self.objects[item['Key']]
+      self.bodies.pop(item['Key'], None)
+    return {}
+
+
+class ReviewImageGCTests(TestCase):
+  def setUp(self):
+    self.user = User.objects.create_user('gc@example.com', 'gc', 'password')
+    self.place_info = PlaceInfo.objects.create(name='gc')
+    self.prefix = f'reviews/{self.place_info.id}/{self.user.id}/'
+    self.old = datetime(2020, 1, 1, tzinfo=dt_timezone.utc)
+
+  def collect(self, objects, **kwargs):
+    s3 = FakeS3(objects)
+    checkpoint = ReviewImageGCCheckpoint.objects.create()
+    with mock.patch.object(image_gc, 'get_s3_client', return_value=s3):
+      finished = image_gc.collect_review_images(checkpoint, requests_per_second=None, **kwargs)
+    return s3, finished, checkpoint
+
+  def test_deletes_only_unreferenced_old_keys(self):
+    pending = self.prefix + 'pending.jpg'
+    processed = self.prefix + 'processed.jpg'
+    recorded = self.prefix + 'recorded.webp'
+    PlaceReviewByUser.objects.create(
+      user=self.user, place_info=self.place_info, rating=5,
+      images=[review_image_url(pending), review_image_url(processed)],
+      image_variants={review_image_url(processed): {'original': review_image_url(recorded)}}
+    )
+    objects = {
+      pending: self.old,
+      self.prefix + 'pending_thumbnail.webp': self.old,  # 아직 image_variants에 기록되지 않은 변형
+      self.prefix + 'pending_original.jpg': self.old,
+      processed: self.old,  # 변형이 기록된 뒤 지우지 못한 업로드 원본
+      recorded: self.old,
+      self.prefix + 'orphan.jpg': self.old,
+      self.prefix + 'recent.jpg': datetime.now(dt_timezone.utc),
+      'reviews/unexpected.jpg': self.old,
+    }
+
+    s3, finished, checkpoint = self.collect(objects)
+
+    self.assertTrue(finished)
+    self.assertEqual(s3.deleted, [self.prefix + 'orphan.jpg', processed])
+    self.assertEqual(checkpoint.deleted_count, 2)
+    self.assertEqual(checkpoint.last_key, '')
+
+  def test_resumes_from_checkpoint(self):
+    objects = {f'{self.prefix}{i:02}.jpg': self.old for i in range(5)}
+
+    s3 = FakeS3(objects)
+    checkpoint = ReviewImageGCCheckpoint.objects.create()
+    with mock.patch.object(image_gc, 'get_s3_client', return_value=s3):
+      self.assertFalse(image_gc.collect_review_images(checkpoint, page_size=2, max_pages=1))
+      self.assertEqual(checkpoint.last_key, self.prefix + '01.jpg')
+      self.assertTrue(image_gc.collect_review_images(checkpoint, page_size=2))
+
+    self.assertEqual(sorted(s3.deleted), sorted(objects))
+    self.assertEqual(checkpoint.scanned_count, 5)
+
+  def test_dry_run_keeps_objects_and_checkpoint(self):
+    s3, finished, checkpoint = self.collect({self.prefix + 'orphan.jpg': self.old}, dry_run=True)
+
+    self.assertTrue(finished)
+    self.assertEqual(s3.deleted, [])
+    checkpoint.refresh_from_db()
+    self.assertIsNone(checkpoint.started_at)
+
+
+def jpeg_with_location():
+  from PIL import Image
+
+  exif = Image.Exif()
+  exif[0x8825] = {2: (37.0, 33.0, 0.0)}  # GPSInfo
+  buffer = BytesIO()
+  Image.new('RGB', (2000, 1000), 'red').save(buffer, format='JPEG', exif=exif)
+  return buffer.getvalue()
+
+
+class ReviewImageVariantTests(TestCase):
+  def setUp(self):
+    self.user = User.objects.create_user('variants@example.com', 'variants', 'password')
+    self.place_info = PlaceInfo.objects.create(name='variants')
+    self.key = f'reviews/{self.place_info.id}/{self.user.id}/photo.jpg'
+    self.review = PlaceReviewByUser.objects.create(
+      user=self.user, place_info=self.place_info, rating=5, images=[review_image_url(self.key)]
+    )
+
+  def process(self, s3):
+    with mock.patch.object(images, 'get_s3_client', return_value=s3):
+      return images.process_review_images(self.review.id)
+
+  def test_strips_exif_and_deletes_the_upload(self):
+    from PIL import Image
+
+    s3 = FakeS3({self.key: datetime.now(dt_timezone.utc)}, {self.key: jpeg_with_location()})
+
+    self.assertEqual(self.process(s3), 1)
+
+    self.review.refresh_from_db()
+    variants = self.review.image_variants[review_image_url(self.key)]
+    self.assertEqual(set(variants), {'original', 'thumbnail', 'medium'})
+    original = Image.open(BytesIO(s3.bodies[images.key_from_url(variants['original'])]))
+    self.assertNotIn(0x8825, original.getexif())
+    thumbnail = Image.open(BytesIO(s3.bodies[images.key_from_url(variants['thumbnail'])]))
+    self.assertEqual(max(thumbnail.size), images.REVIEW_IMAGE_VARIANTS['thumbnail'])
+    self.assertEqual(s3.deleted, [self.key])
+    # 이미 처리된 이미지는 다시 처리하지 않습니다.
+    self.assertEqual(self.process(s3), 0)
+
+  def test_non_image_upload_is_marked_and_kept_for_gc(self):
+    s3 = FakeS3({self.key: datetime.now(dt_timezone.utc)}, {self.key: b'not an image'})
+
+    with self.assertLogs('back.place.images', 'ERROR'):
+      self.assertEqual(self.process(s3), 0)
+
+    self.review.refresh_from_db()
+    self.assertEqual(self.review.image_variants, {review_image_url(self.key): {}})
+    self.assertEqual(s3.deleted, [])
+
+  def test_images_never_return_the_uploaded_url(self):
+    processed = review_image_url(self.key)
+    pending = review_image_url(self.key.replace('photo', 'pending'))
+    failed = review_image_url(self.key.replace('photo', 'failed'))
+    self.review.images = [processed, pending, failed]
+    self.review.image_variants = {
+      processed: {'original': 'https://cdn/photo_original.jpg', 'thumbnail': 'https://cdn/photo_thumbnail.webp'},
+      failed: {},
+    }
+
+    self.review.save()
+
+    def query(argument=''):
+      result = schema.execute(
+        '{ placeReviews(placeInfoId: %d) { images%s } }' % (self.place_info.id, argument)
+      )
+      self.assertIsNone(result.errors)
+      return result.data['placeReviews'][0]['images']
+
+    self.assertEqual(query(), ['https://cdn/photo_original.jpg'])
+    self.assertEqual(query('(size: THUMBNAIL)'), ['https://cdn/photo_thumbnail.webp'])
+    # 기록되지 않은 크기는 original로 대신합니다.
+    self.assertEqual(query('(size: MEDIUM)'), ['https://cdn/photo_original.jpg'])
+
+  def test_variants_are_not_exposed(self):
+    review_type = schema.graphql_schema.get_type('PlaceReviewByUserType')
+
+    self.assertNotIn('imageVariants', review_type.fields)
+    self.assertEqual(review_type.fields['images'].args['size'].type.name, 'ReviewImageSize')
+
+
+class ReviewImageUploadTests(TestCase):
+  def setUp(self):
+    self.user = User.objects.create_user('upload@example.com', 'upload', 'password')
+    self.place_info = PlaceInfo.objects.create(name='upload')
+    self.s3 = FakeS3({})
+
+  def encoded(self, body, content_type='image/png'):
+    return f'data:{content_type};base64,' + base64.b64encode(body).decode()
+
+  def create_review(self, images):
+    query = '''
+      mutation($placeInfoId: ID!, $images: [String]) {
+        createPlaceReview(placeInfoId: $placeInfoId, text: "good", rating: 5, images: $images) {
+          review { id } failedImages { index message } message
+        }
+      }
+    '''
+    with mock.patch.object(storage, 'get_s3_client', return_value=self.s3), \
+         mock.patch('back.place.schema.schedule_review_image_processing') as schedule:
+      response = self.client.post(
+        '/graphql/', json.dumps({'query': query, 'variables': {'placeInfoId': self.place_info.id, 'images': images}}),
+        content_type='application/json', headers={'Authorization': f'JWT {get_token(self.user)}'}
+      )
+    return json.loads(response.content)['data']['createPlaceReview'], schedule
+
+  def test_failed_uploads_are_reported_by_index(self):
+    result, schedule = self.create_review([
+      self.encoded(b'first'), self.encoded(b'broken'), self.encoded(b'third', 'image/webp'),
+    ])
+
+    self.assertEqual(result['failedImages'], [{'index': 1, 'message': 'Access Denied'}])
+    self.assertIn('1 image(s) failed', result['message'])
+    review = PlaceReviewByUser.objects.get(id=result['review']['id'])
+    self.assertEqual([url.rsplit('.', 1)[1] for url in review.images], ['png', 'webp'])
+    self.assertEqual(sorted(self.s3.bodies.values()), [b'first', b'third'])
+    schedule.assert_called_once_with(review.id)
+
+  def test_review_is_created_when_every_upload_fails(self):
+    result, schedule = self.create_review([self.encoded(b'broken')])
+
+    self.assertEqual([failure['index'] for failure in result['failedImages']], [0])
+    self.assertIsNone(PlaceReviewByUser.objects.get(id=result['review']['id']).images)
+    schedule.assert_not_called()
+
+  def test_uploads_run_concurrently(self):
+    # 업로드가 하나씩 실행되면 두 번째 업로드가 시작되지 않아 첫 번째 업로드가 기다리다 실패합니다.
+    started = threading.Barrier(2, timeout=5)
+
+    def upload(place_info_id, user_id, image_data):
+      started.wait()
+      return image_data
+
+    with mock.patch.object(storage, 'upload_review_image', side_effect=upload):
+      urls, failures = async_to_sync(storage.upload_review_images)(self.place_info.id, self.user.id, ['a', 'b'])
+
+    self.assertEqual((urls, failures), (['a', 'b'], []))
+
+
+@override_settings(AWS_STORAGE_BUCKET_NAME='review-bucket')
+class ReviewImageUploadUrlTests(TestCase):
+  def setUp(self):
+    import boto3
+
+    self.user = User.objects.create_user('presign@example.com', 'presign', 'password')
+    self.place_info = PlaceInfo.objects.create(name='presign')
+    # 서명은 로컬에서 계산되므로 네트워크 없이 실제 클라이언트를 씁니다.
+    self.s3 = boto3.client('s3', region_name='ap-northeast-2', aws_access_key_id='test', aws_secret_access_key='test')
+
+  def create_urls(self, content_types):
+    query = '''
+      mutation($placeInfoId: ID!, $contentTypes: [String]!) {
+        createReviewImageUploadUrls(placeInfoId: $placeInfoId, contentTypes: $contentTypes) {
+          uploads { key url fields contentType expiresIn }
+        }
+      }
+    '''
+    with mock.patch.object(storage, 'get_s3_client', return_value=self.s3):
+      return post_graphql(self.client, self.user, query, {
+        'placeInfoId': self.place_info.id, 'contentTypes': content_types,
+      })
+
+  def test_policy_limits_size_and_content_type(self):
+    result = self.create_urls(['image/png', 'image/webp'])
+
+    uploads = result['data']['createReviewImageUploadUrls']['uploads']
+    self.assertEqual([upload['contentType'] for upload in uploads], ['image/png', 'image/webp'])
+    for upload in uploads:
+      self.assertTrue(upload['key'].startswith(storage.review_image_prefix(self.place_info.id, self.user.id)))
+      self.assertIn('review-bucket', upload['url'])
+      fields = upload['fields']
+      self.assertEqual((fields['key'], fields['Content-Type']), (upload['key'], upload['contentType']))
+      policy = json.loads(base64.b64decode(fields['policy']))
+      self.assertIn(['content-length-range', 1, storage.REVIEW_IMAGE_MAX_BYTES], policy['conditions'])
+      self.assertIn({'Content-Type': upload['contentType']}, policy['conditions'])
+      self.assertIn({'key': upload['key']}, policy['conditions'])
+
+  def test_rejects_unsupported_content_type(self):
+    result = self.create_urls(['application/pdf'])
+
+    self.assertEqual(result['errors'][0]['message'], 'Unsupported image type: application/pdf')
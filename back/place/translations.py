@@ -0,0 +1,89 @@
+import hashlib
+import logging
+
+from asgiref.sync import sync_to_async
+
+from back.place.clients import deepl_translate_many
+from back.place.places import canonical_language
+
+logger = logging.getLogger(__name__)
+
+# DeepL 한 번의 요청에 보낼 수 있는 최대 문장 수
+DEEPL_MAX_TEXTS = 50
+# 정규화된 언어 코드 중 DeepL 대상 언어 코드가 다른 것
+DEEPL_TARGET_LANGUAGES = {
+  'ZH-CN': 'ZH-HANS',
+  'ZH-TW': 'ZH-HANT',
+}
+
+
+def source_hash(text):
+  return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+
+def cached_translations(review_ids, language):
+  from back.place.models import PlaceReviewTranslation
+  return {
+    review_id: (text_hash, text)
+    for review_id, text_hash, text in PlaceReviewTranslation.objects
+    .filter(review_id__in=review_ids, language=language)
+    .values_list('review_id', 'source_hash', 'text')
+  }
+
+
+def save_translations(reviews, translated, language):
+  from back.place.models import PlaceReviewTranslation
+
+  PlaceReviewTranslation.objects.filter(review__in=reviews, language=language).delete()
+  PlaceReviewTranslation.objects.bulk_create([
+    PlaceReviewTranslation(review=review, language=language, source_hash=source_hash(review.text), text=text)
+    for review, text in zip(reviews, translated)
+  ], ignore_conflicts=True)
+
+
+async def translate_reviews(reviews, language):
+  """
+  리뷰 목록의 translated_text를 읽는 사람의 언어로 채웁니다. 저장된 번역이 있으면 그대로 쓰고,
+  없거나 원문이 바뀐 리뷰만 모아 DeepL 요청 한 번(50개 단위, 차례로)으로 번역한 뒤 저장합니다.
+  번역에 실패하면 원문을 그대로 반환합니다. placeReviews는 한 페이지(최대 50개)만 넘기므로 요청 한 번입니다.
+  """
+  language = canonical_language(language)
+  cached = await sync_to_async(cached_translations)([review.id for review in reviews], language)
+
+  missing = []
+  for review in reviews:
+    text_hash, text = cached.get(review.id, (None, None))
+    if not review.text:
+      review.translated_text = review.text
+    elif text_hash == source_hash(review.text):
+      review.translated_text = text
+    else:
+      review.translated_text = review.text
+      missing.append(review)
+
+  if missing:
+    target_lang = DEEPL_TARGET_LANGUAGES.get(language, language)
+    translated = []
+    try:
+      for start in range(0, len(missing), DEEPL_MAX_TEXTS):
+        chunk = missing[start:start + DEEPL_MAX_TEXTS]
+        translated += await deepl_translate_many([review.text for review in chunk], None, target_lang)
+    except Exception:
+      logger.exception('Failed to translate %d review(s) to %s', len(missing), language)
+    else:
+      for review, text in zip(missing, translated):
+        review.translated_text = text
+      await sync_to_async(save_translations)(missing, translated, language)
+
+  return reviews
+
+
+def review_text_changed(sender, instance, created, raw=False, **kwargs):
+  """
+  리뷰 원문이 바뀌면 이전 원문으로 만든 번역을 삭제합니다.
+  """
+  from back.place.models import PlaceReviewTranslation
+
+  if created or raw:
+    return
+  PlaceReviewTranslation.objects.filter(review=instance).exclude(source_hash=source_hash(instance.text)).delete()
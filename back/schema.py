@@ -1,4 +1,5 @@
 import graphene
+from graphql import validate_schema
 
 from back.core import schema as core_schema
 from back.place import schema as place_schema
@@ -20,3 +21,13 @@ class Mutation(
   pass
 
 schema = graphene.Schema(query=Query, mutation=Mutation)
+
+
+def warm_up():
+  """
+  URLconf를 불러오고 스키마 검증 결과를 미리 캐시합니다. 첫 요청이 이 비용을 치르지 않도록 앱 로드 시 호출하며,
+  gunicorn --preload에서는 fork 전에 만들어진 스키마를 워커들이 copy-on-write로 공유합니다.
+  """
+  from django.urls import get_resolver
+  get_resolver().url_patterns
+  validate_schema(schema.graphql_schema)
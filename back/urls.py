@@ -16,14 +16,14 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path
-from graphene_django.views import GraphQLView
 from django.views.decorators.csrf import csrf_exempt
 from django.http import HttpResponse
 from . import schema 
+from .views import AsyncGraphQLView
 
 urlpatterns = [
     path('', lambda request: HttpResponse("OK")),
     path('favicon.ico', lambda request: HttpResponse(status=204)),
     path('admin/', admin.site.urls),
-    path('graphql/', csrf_exempt(GraphQLView.as_view(graphiql=True, schema=schema.schema))),
+    path('graphql/', csrf_exempt(AsyncGraphQLView.as_view(graphiql=True, schema=schema.schema))),
 ]
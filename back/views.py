@@ -0,0 +1,205 @@
+import inspect
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Manager, QuerySet
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseNotAllowed
+from django.utils.functional import LazyObject, empty
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.utils.utils import set_rollback
+from graphene_django.views import GraphQLView as BaseGraphQLView, HttpError
+from graphql import GraphQLObjectType, MiddlewareManager, get_named_type
+
+from back.common.profiling import operation_name_for, profile_operation
+from back.place.clients import close_clients
+
+BATCH_MAX_OPERATIONS = getattr(settings, 'GRAPHQL_BATCH_MAX_OPERATIONS', 20)
+
+
+class GraphQLView(BaseGraphQLView):
+  """
+  AsyncGraphQLView가 쓰는 배치 요청(JSON 배열) 파싱과 operation 프로파일링을 담은 기반 뷰.
+  배치 실행은 AsyncGraphQLView.dispatch에만 있으므로 이 뷰를 직접 라우팅하지 않습니다.
+  """
+
+  def get_response(self, request, data, show_graphiql=False):
+    # GraphiQL 페이지 요청처럼 동기 dispatch로 넘기는 경우에도 operation을 집계합니다.
+    query, variables, operation_name, id = self.get_graphql_params(request, data)
+    if not query:
+      return super().get_response(request, data, show_graphiql)
+
+    with profile_operation(operation_name_for(query, operation_name)) as profile:
+      result, status_code = super().get_response(request, data, show_graphiql)
+      # 문법/검증 오류(경로가 없는 오류)는 400이 되며 집계하지 않습니다.
+      profile.valid = status_code == 200
+      return result, status_code
+
+  def is_batch_request(self, request):
+    if request.method.lower() != 'post' or self.get_content_type(request) != 'application/json':
+      return False
+    try:
+      return request.body.lstrip()[:1] == b'['
+    except Exception:
+      return False
+
+  def parse_body(self, request):
+    if not self.batch:
+      return super().parse_body(request)
+
+    try:
+      request_json = json.loads(request.body.decode('utf-8'))
+    except (TypeError, ValueError):
+      raise HttpError(HttpResponseBadRequest('POST body sent invalid JSON.'))
+
+    if not isinstance(request_json, list) or not request_json:
+      raise HttpError(HttpResponseBadRequest('Received an empty list in the batch request.'))
+    return request_json
+
+
+def _evaluate(next, root, info, **args):
+  result = next(root, info, **args)
+  # 지연 평가되는 값은 이벤트 루프로 넘어가기 전에 이 스레드에서 DB 조회를 끝냅니다.
+  if isinstance(result, Manager):
+    result = result.all()
+  if isinstance(result, QuerySet):
+    result = list(result)
+  elif isinstance(result, LazyObject):
+    if result._wrapped is empty:
+      result._setup()
+    result = result._wrapped
+  return result
+
+
+class SyncResolverMiddleware:
+  """
+  비동기 실행 중 동기 resolver(ORM 접근)를 sync_to_async로 스레드에서 실행하는 middleware.
+
+  루트 필드와 객체 타입을 반환하는 필드(외래키, 역참조 등 DB 조회가 일어날 수 있는 필드)만 스레드로 넘기고,
+  스칼라 필드는 이벤트 루프에서 바로 처리합니다. async resolver가 반환한 코루틴은 이벤트 루프에서 await됩니다.
+  반드시 middleware 목록의 마지막(가장 바깥)에 두어야 JWT 인증 같은 DB 작업도 스레드에서 실행됩니다.
+  """
+
+  def resolve(self, next, root, info, **args):
+    if root is not None and not isinstance(get_named_type(info.return_type), GraphQLObjectType):
+      return next(root, info, **args)
+    return self.resolve_in_thread(next, root, info, **args)
+
+  async def resolve_in_thread(self, next, root, info, **args):
+    result = await sync_to_async(_evaluate)(next, root, info, **args)
+    if inspect.isawaitable(result):
+      result = await result
+    return result
+
+
+class AsyncGraphQLView(GraphQLView):
+  """
+  ASGI용 비동기 GraphQL 뷰.
+
+  Perplexity, DeepL, S3 같은 외부 호출은 async resolver에서 await되고 ORM 작업은 sync_to_async로 실행되므로,
+  느린 외부 호출이 워커를 점유하지 않습니다.
+
+  배치 요청(JSON 배열)의 operation들은 보낸 순서대로 하나씩 실행되므로 앞선 mutation의 결과를 뒤의 operation이
+  볼 수 있습니다. 모든 operation은 같은 request를 context로 공유하므로 JWT 인증은 한 번만 이뤄지고, request에 붙은
+  캐시나 DataLoader도 재사용됩니다. 각 operation의 오류는 해당 결과에만 담기지만 operation마다 savepoint를 두지
+  않으므로, 실패한 mutation이 이미 저장한 내용은 롤백되지 않고 앞선 operation의 변경도 그대로 남습니다.
+  WSGI(runserver)에서도 Django가 요청마다 이벤트 루프를 만들어 동작하지만 동시성 이점은 ASGI에서만 얻습니다.
+  ATOMIC_REQUESTS, ATOMIC_MUTATIONS는 비동기 뷰에서 지원되지 않습니다.
+  """
+
+  view_is_async = True
+
+  async def dispatch(self, request, *args, **kwargs):
+    try:
+      if request.method.lower() not in ('get', 'post'):
+        raise HttpError(
+          HttpResponseNotAllowed(['GET', 'POST'], 'GraphQL only supports GET and POST requests.')
+        )
+
+      self.batch = self.is_batch_request(request)
+      data = self.parse_body(request)
+
+      if self.batch:
+        if len(data) > BATCH_MAX_OPERATIONS:
+          raise HttpError(HttpResponseBadRequest(
+            f'A batch request may contain at most {BATCH_MAX_OPERATIONS} operations.'
+          ))
+        responses = [await self.get_batch_response_async(request, entry) for entry in data]
+        return HttpResponse(
+          status=200,
+          content='[{}]'.format(','.join(responses)),
+          content_type='application/json'
+        )
+
+      if self.graphiql and self.can_display_graphiql(request, data):
+        return await sync_to_async(super().dispatch)(request, *args, **kwargs)
+
+      result, status_code = await self.get_response_async(request, data)
+      return HttpResponse(status=status_code, content=result, content_type='application/json')
+
+    except HttpError as e:
+      response = e.response
+      response['Content-Type'] = 'application/json'
+      response.content = self.json_encode(request, {'errors': [self.format_error(e)]})
+      return response
+
+    finally:
+      # WSGI에서는 이 요청의 이벤트 루프가 곧 닫히므로 루프에 묶인 외부 API 클라이언트도 닫습니다.
+      if not hasattr(request, 'scope'):
+        await close_clients()
+
+  async def get_batch_response_async(self, request, entry):
+    if not isinstance(entry, dict):
+      return self.json_encode(request, {
+        'errors': [{'message': 'Each batch entry must be a JSON object.'}],
+        'status': 400,
+      })
+
+    # 앞선 operation의 mutation 오류 플래그가 다음 operation에 영향을 주지 않도록 초기화
+    setattr(request, MUTATION_ERRORS_FLAG, False)
+    try:
+      result, status_code = await self.get_response_async(request, entry)
+    except HttpError as e:
+      return self.json_encode(request, {
+        'id': entry.get('id'),
+        'errors': [self.format_error(e)],
+        'status': e.response.status_code,
+      })
+    return result
+
+  async def get_response_async(self, request, data):
+    query, variables, operation_name, id = self.get_graphql_params(request, data)
+
+    with profile_operation(operation_name_for(query, operation_name)) as profile:
+      execution_result = self.execute_graphql_request(
+        request, data, query, variables, operation_name
+      )
+      if inspect.isawaitable(execution_result):
+        execution_result = await execution_result
+      profile.valid = not any(not getattr(e, 'path', None) for e in execution_result.errors or [])
+
+    status_code = 200
+    response = {}
+
+    if execution_result.errors:
+      set_rollback()
+      response['errors'] = [self.format_error(e) for e in execution_result.errors]
+
+    if execution_result.errors and any(
+      not getattr(e, 'path', None) for e in execution_result.errors
+    ):
+      status_code = 400
+    else:
+      response['data'] = execution_result.data
+
+    if self.batch:
+      response['id'] = id
+      response['status'] = status_code
+
+    return self.json_encode(request, response), status_code
+
+  def get_middleware(self, request):
+    middleware = self.middleware
+    if isinstance(middleware, MiddlewareManager):
+      middleware = middleware.middlewares
+    return list(middleware or []) + [SyncResolverMiddleware()]
@@ -15,4 +15,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'back.settings')
 
 application = get_wsgi_application()
+
+from back.schema import warm_up  # noqa: E402
+warm_up()
+
 application = WhiteNoise(application)
\ No newline at end of file
@@ -0,0 +1,15 @@
+import gc
+
+# 앱(URLconf, GraphQL 스키마 포함)을 마스터에서 한 번만 불러오고 워커들이 copy-on-write로 공유합니다.
+# 외부 API 클라이언트와 DB 커넥션은 워커에서 처음 사용할 때 만들어지므로 fork 후에도 공유되지 않습니다.
+preload_app = True
+
+
+def when_ready(server):
+  # 미리 불러온 객체를 GC 추적 대상에서 빼 두어, 워커의 GC가 공유 메모리 페이지를 건드려 복사되는 것을 막습니다.
+  gc.freeze()
+
+
+def post_fork(server, worker):
+  from django.db import connections
+  connections.close_all()